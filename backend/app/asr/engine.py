@@ -0,0 +1,68 @@
+"""
+ASR Engines
+
+An ASR engine turns a batch of audio chunks into one transcript string per
+chunk. Engines run inside ASR worker processes (see ``worker_pool``), so they
+must be constructible from their registered name and plain keyword options.
+"""
+
+import time
+import zlib
+from typing import Dict, List, Type, Any
+
+
+class ASREngine:
+    """
+    Base class for speech recognition engines.
+
+    Subclasses implement ``transcribe_batch``; it is called in a worker process
+    or thread, never on the event loop, so blocking model inference is fine.
+    """
+    name = "base"
+
+    def transcribe_batch(self, chunks: List[bytes]) -> List[str]:
+        raise NotImplementedError
+
+
+class StubASREngine(ASREngine):
+    """
+    Deterministic offline engine for development and load testing.
+
+    The same chunk always produces the same text. ``cost_ms`` burns CPU per
+    chunk to imitate model inference without any external dependency.
+    """
+    name = "stub"
+
+    def __init__(self, cost_ms: float = 0.0):
+        self.cost_ms = float(cost_ms)
+
+    def _burn(self) -> None:
+        deadline = time.perf_counter() + self.cost_ms / 1000
+        while time.perf_counter() < deadline:
+            pass
+
+    def transcribe_batch(self, chunks: List[bytes]) -> List[str]:
+        results = []
+        for chunk in chunks:
+            if self.cost_ms > 0:
+                self._burn()
+            results.append(f"transcribed {len(chunk)} bytes [{zlib.crc32(chunk):08x}]")
+        return results
+
+
+ENGINES: Dict[str, Type[ASREngine]] = {
+    StubASREngine.name: StubASREngine,
+}
+
+
+def create_engine(name: str, **options: Any) -> ASREngine:
+    """
+    Build a registered engine by name.
+
+    Raises:
+        ValueError: If no engine is registered under ``name``
+    """
+    engine_cls = ENGINES.get(name)
+    if engine_cls is None:
+        raise ValueError(f"Unknown ASR engine '{name}'. Available: {', '.join(sorted(ENGINES))}")
+    return engine_cls(**options)
@@ -0,0 +1,68 @@
+"""
+Offline ASR load test.
+
+Drives the ASR worker pool with simulated meetings sending audio chunks
+concurrently, using whatever ASR_* settings are in the environment (the stub
+engine by default), and prints throughput and latency.
+
+Usage:
+    python -m app.asr.loadtest --meetings 20 --chunks 50 --chunk-bytes 16000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from .worker_pool import ASRWorkerPool
+
+
+async def _meeting(pool: ASRWorkerPool, index: int, chunks: int, chunk_bytes: int, latencies: list) -> None:
+    payload = bytes((index + i) % 256 for i in range(chunk_bytes))
+    for _ in range(chunks):
+        started = time.perf_counter()
+        await pool.transcribe(payload)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def run(meetings: int, chunks: int, chunk_bytes: int) -> dict:
+    pool = ASRWorkerPool()
+    pool.start()
+    latencies: list = []
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(_meeting(pool, i, chunks, chunk_bytes, latencies) for i in range(meetings)))
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics = pool.metrics()
+        await pool.shutdown()
+    latencies.sort()
+    return {
+        "engine": pool.settings.engine,
+        "backend": pool.settings.backend,
+        "meetings": meetings,
+        "chunks": len(latencies),
+        "seconds": round(elapsed, 3),
+        "chunks_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 3),
+        "avg_batch_size": metrics["avg_batch_size"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline load test for the ASR worker pool")
+    parser.add_argument("--meetings", type=int, default=20)
+    parser.add_argument("--chunks", type=int, default=50, help="chunks per meeting")
+    parser.add_argument("--chunk-bytes", type=int, default=16000)
+    parser.add_argument("--stub-cost-ms", type=float, default=None, help="override ASR_STUB_COST_MS")
+    args = parser.parse_args()
+    if args.stub_cost_ms is not None:
+        os.environ["ASR_STUB_COST_MS"] = str(args.stub_cost_ms)
+    print(json.dumps(asyncio.run(run(args.meetings, args.chunks, args.chunk_bytes)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+ASR Worker Pool
+
+Runs an ASR engine off the event loop. Audio chunks from every meeting socket
+go into one bounded queue; a dispatcher drains it into batches (up to
+``ASR_BATCH_SIZE`` chunks, waiting at most ``ASR_BATCH_WAIT_MS`` to fill one)
+and runs each batch on a process pool (``ASR_BACKEND=process``) or a thread
+pool (``ASR_BACKEND=thread``).
+
+When the queue is full, ``transcribe`` waits for space, which in turn stops
+the calling WebSocket from reading more frames: backpressure reaches the
+client instead of piling up in server memory.
+
+If a worker process dies (e.g. killed for memory), the process pool is broken
+for good: the batches on it fail, and the pool is replaced so later batches
+run on fresh workers.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from .engine import ASREngine, create_engine
+
+logger = logging.getLogger(__name__)
+
+
+# ----- Worker side (runs inside the pool's processes / threads) -----
+
+_worker_engine: Optional[ASREngine] = None
+
+
+def _init_worker(engine_name: str, options: Dict[str, Any]) -> None:
+    global _worker_engine
+    _worker_engine = create_engine(engine_name, **options)
+
+
+def _run_batch(chunks: List[bytes]) -> List[str]:
+    return _worker_engine.transcribe_batch(chunks)
+
+
+# ----- Event-loop side -----
+
+class ASRPoolSettings:
+    def __init__(self):
+        self.engine = os.getenv("ASR_ENGINE", "stub")
+        self.backend = os.getenv("ASR_BACKEND", "process")
+        self.workers = max(1, int(os.getenv("ASR_WORKERS", "2")))
+        self.queue_size = max(1, int(os.getenv("ASR_QUEUE_SIZE", "64")))
+        self.batch_size = max(1, int(os.getenv("ASR_BATCH_SIZE", "8")))
+        self.batch_wait = max(0.0, float(os.getenv("ASR_BATCH_WAIT_MS", "10"))) / 1000
+        self.engine_options: Dict[str, Any] = {}
+        if self.engine == "stub":
+            self.engine_options["cost_ms"] = float(os.getenv("ASR_STUB_COST_MS", "0"))
+
+
+class ASRWorkerPool:
+    """
+    Bounded, batching front-end for an ASR engine.
+
+    The pool starts on first use and is shut down from the app lifespan.
+    At most ``workers`` batches run at once; everything else waits in the queue.
+    """
+    def __init__(self, settings: Optional[ASRPoolSettings] = None):
+        self._settings = settings
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[Executor] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._batch_tasks: set = set()
+        self.batches = 0
+        self.chunks = 0
+        self.failures = 0
+        self.executor_restarts = 0
+        self.total_batch_ms = 0.0
+        self.max_batch_ms = 0.0
+
+    @property
+    def settings(self) -> ASRPoolSettings:
+        if self._settings is None:
+            self._settings = ASRPoolSettings()
+        return self._settings
+
+    @property
+    def running(self) -> bool:
+        return self._dispatcher is not None and not self._dispatcher.done()
+
+    def _create_executor(self) -> Executor:
+        settings = self.settings
+        init_args = (settings.engine, settings.engine_options)
+        if settings.backend == "process":
+            return ProcessPoolExecutor(
+                max_workers=settings.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=init_args,
+            )
+        if settings.backend == "thread":
+            # Threads share the module-level engine, built once here
+            _init_worker(*init_args)
+            return ThreadPoolExecutor(max_workers=settings.workers, thread_name_prefix="asr")
+        raise ValueError(f"Unknown ASR_BACKEND '{settings.backend}' (expected 'process' or 'thread')")
+
+    def start(self) -> None:
+        if self.running:
+            return
+        settings = self.settings
+        if self._executor is not None:
+            # Left over from a dispatcher whose event loop has gone away
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._create_executor()
+        self._queue = asyncio.Queue(maxsize=settings.queue_size)
+        self._slots = asyncio.Semaphore(settings.workers)
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+        logger.info(
+            f"ASR pool started: engine={settings.engine}, backend={settings.backend}, "
+            f"workers={settings.workers}, queue={settings.queue_size}, batch={settings.batch_size}"
+        )
+
+    async def transcribe(self, chunk: bytes) -> str:
+        """Queue one chunk and wait for its transcript; waits for queue space when saturated."""
+        if not self.running:
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((chunk, future))
+        return await future
+
+    async def _next_batch(self) -> List[Tuple[bytes, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.settings.batch_wait
+        try:
+            while len(batch) < self.settings.batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("ASR pool shut down"))
+            raise
+        return batch
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._next_batch()
+            except BaseException:
+                self._slots.release()
+                raise
+            task = asyncio.create_task(self._run(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    def _replace_executor(self, broken: Executor) -> None:
+        # Batches in flight on the broken pool all fail with it; only the first one replaces it
+        if self._executor is not broken:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._create_executor()
+        self.executor_restarts += 1
+        logger.warning("ASR process pool was broken by a dead worker; started a new one")
+
+    async def _run(self, batch: List[Tuple[bytes, asyncio.Future]]) -> None:
+        started = time.perf_counter()
+        executor = self._executor
+        try:
+            loop = asyncio.get_running_loop()
+            try:
+                texts = await loop.run_in_executor(executor, _run_batch, [chunk for chunk, _ in batch])
+            except BrokenProcessPool:
+                self._replace_executor(executor)
+                raise
+            for (_, future), text in zip(batch, texts):
+                if not future.done():
+                    future.set_result(text)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.batches += 1
+            self.chunks += len(batch)
+            self.total_batch_ms += elapsed_ms
+            self.max_batch_ms = max(self.max_batch_ms, elapsed_ms)
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"ASR batch of {len(batch)} chunk(s) failed: {e}", exc_info=True)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._slots.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_capacity": self.settings.queue_size,
+            "in_flight_batches": len(self._batch_tasks),
+            "batches": self.batches,
+            "chunks": self.chunks,
+            "failures": self.failures,
+            "executor_restarts": self.executor_restarts,
+            "avg_batch_size": round(self.chunks / self.batches, 3) if self.batches else 0.0,
+            "avg_batch_ms": round(self.total_batch_ms / self.batches, 3) if self.batches else 0.0,
+            "max_batch_ms": round(self.max_batch_ms, 3),
+        }
+
+    async def shutdown(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("ASR pool shut down"))
+            self._queue = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            logger.info("ASR pool stopped.")
+
+
+asr_pool = ASRWorkerPool()
@@ -0,0 +1,232 @@
+"""
+Application Container
+
+Owns what the app needs at runtime and builds it on first use instead of at
+import time, so importing any module (routers, handlers, the pipeline) never
+reads ``.env``, opens a connection or fails on missing configuration.
+
+``startup`` runs from the FastAPI lifespan. It loads the configuration, then
+starts the warm-up in the background and returns, so the worker is serving
+(live) straight away. The warm-up steps run concurrently:
+
+    mongo             ping the database (opens the first pooled connection)
+    indexes           reconcile the declared indexes
+    views_and_cdc     seed the materialised views, then start the CDC consumer
+                      and this worker's broadcast consumer
+    handlers          build the database handlers (checks their configuration)
+    session_registry  open the streaming session store
+
+The worker reports ready once every required step has succeeded. Each step's
+start, duration and outcome go into the startup report (``/admin/startup``,
+and one log line when the warm-up ends).
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .asr.worker_pool import asr_pool
+from .config.configloader import load_config
+from .database.applications_handler import ApplicationsHandler
+from .database.indexes import ensure_indexes
+from .database.meetingHandler import MeetingHandler
+from .database.mongo_client import mongo_registry
+from .database.startups_handler import StartupsHandler
+from .database.transcript_buffer import transcript_buffers
+from .database.transcript_handler import TranscriptHandler
+from .monitoring.tracing import tracer
+from .pathway_pipeline.consumer import cdc_broadcast, cdc_consumer
+from .pathway_pipeline.pipeline import check_record, process_record
+from .pathway_pipeline.views import seed_views
+from .pathway_pipeline.workers import cdc_workers, dead_letters
+from .streaming.recording import recording_sink
+from .streaming.sessions import session_registry
+
+logger = logging.getLogger(__name__)
+
+# Set when this module is imported, i.e. while app.main is being imported
+_imported_at = time.perf_counter()
+
+
+class StartupStep:
+    __slots__ = ("name", "required", "start_ms", "duration_ms", "ok", "error")
+
+    def __init__(self, name: str, required: bool):
+        self.name = name
+        self.required = required
+        self.start_ms: Optional[float] = None
+        self.duration_ms: Optional[float] = None
+        self.ok: Optional[bool] = None
+        self.error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "required": self.required,
+            "start_ms": self.start_ms,
+            "duration_ms": self.duration_ms,
+            "ok": self.ok,
+            "error": self.error,
+        }
+
+
+class StartupReport:
+    def __init__(self):
+        self.started_at: Optional[str] = None
+        self.import_to_startup_ms: Optional[float] = None
+        self.startup_ms: Optional[float] = None
+        self.warmup_ms: Optional[float] = None
+        self.steps: List[StartupStep] = []
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "import_to_startup_ms": self.import_to_startup_ms,
+            "startup_ms": self.startup_ms,
+            "warmup_ms": self.warmup_ms,
+            "steps": [step.as_dict() for step in self.steps],
+        }
+
+
+class AppContainer:
+    def __init__(self):
+        self._handlers: Dict[str, Any] = {}
+        self._warmup: Optional[asyncio.Task] = None
+        self._t0 = 0.0
+        self.report = StartupReport()
+        self.started = False
+        self.warmed_up = False
+
+    # ----- lazily built handlers -----
+
+    def _handler(self, name: str, factory: Callable[[], Any]):
+        handler = self._handlers.get(name)
+        if handler is None:
+            handler = self._handlers[name] = factory()
+        return handler
+
+    @property
+    def applications_handler(self) -> ApplicationsHandler:
+        return self._handler("applications", ApplicationsHandler)
+
+    @property
+    def startups_handler(self) -> StartupsHandler:
+        return self._handler("startups", StartupsHandler)
+
+    @property
+    def meeting_handler(self) -> MeetingHandler:
+        return self._handler("meetings", MeetingHandler)
+
+    @property
+    def transcript_handler(self) -> TranscriptHandler:
+        return self._handler("transcripts", TranscriptHandler)
+
+    # ----- lifecycle -----
+
+    @property
+    def ready(self) -> bool:
+        """True once the warm-up finished and every required step succeeded."""
+        return self.warmed_up and all(step.ok for step in self.report.steps if step.required)
+
+    async def _step(self, name: str, action: Callable[[], Awaitable[Any]], required: bool = True) -> bool:
+        step = StartupStep(name, required)
+        self.report.steps.append(step)
+        started = time.perf_counter()
+        step.start_ms = round((started - self._t0) * 1000, 3)
+        try:
+            await action()
+            step.ok = True
+        except asyncio.CancelledError:
+            step.error = "cancelled"
+            raise
+        except Exception as e:
+            step.ok = False
+            step.error = f"{type(e).__name__}: {e}"
+            logger.error(f"Startup step '{name}' failed: {e}", exc_info=True)
+        finally:
+            step.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        return step.ok
+
+    async def _ping_mongo(self) -> None:
+        await mongo_registry.get_database().command("ping")
+
+    async def _views_and_cdc(self) -> None:
+        # Current state first, so CDC events are applied on top of it
+        await seed_views()
+        # With the broadcast consumer on it alone applies events to this worker's
+        # views and cache; the group consumer only commits and dead-letters
+        dead_letters.handler = check_record if cdc_broadcast.settings.broadcast else process_record
+        cdc_consumer.start()
+        # Starts at the end of the log, so only after the views were seeded
+        if cdc_broadcast.settings.broadcast:
+            cdc_broadcast.start()
+
+    async def _build_handlers(self) -> None:
+        for name in ("applications_handler", "startups_handler", "meeting_handler", "transcript_handler"):
+            getattr(self, name)
+
+    async def _open_session_registry(self) -> None:
+        await session_registry.metrics()
+
+    async def _warm_up(self) -> None:
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(
+                self._step("mongo", self._ping_mongo),
+                self._step("indexes", ensure_indexes, required=False),
+                self._step("views_and_cdc", self._views_and_cdc),
+                self._step("handlers", self._build_handlers),
+                self._step("session_registry", self._open_session_registry, required=False),
+            )
+        finally:
+            self.report.warmup_ms = round((time.perf_counter() - started) * 1000, 3)
+            self.warmed_up = True
+            failed = [step.name for step in self.report.steps if step.ok is False]
+            logger.info(
+                f"Startup {'complete' if self.ready else 'degraded'} in {self.report.warmup_ms} ms"
+                f"{f' (failed: {failed})' if failed else ''}: {self.report.as_dict()}"
+            )
+
+    async def startup(self, env_file: str = ".env") -> None:
+        """Load configuration and start the warm-up; returns without waiting for it."""
+        self._t0 = time.perf_counter()
+        self.report = StartupReport()
+        self.report.started_at = datetime.now(timezone.utc).isoformat()
+        self.report.import_to_startup_ms = round((self._t0 - _imported_at) * 1000, 3)
+        self.warmed_up = False
+        await self._step("config", lambda: asyncio.to_thread(load_config, env_file))
+        # Creates the pooled client only; connections are opened by the warm-up
+        await self._step("mongo_client", mongo_registry.connect)
+        self.report.startup_ms = round((time.perf_counter() - self._t0) * 1000, 3)
+        self._warmup = asyncio.create_task(self._warm_up())
+        self.started = True
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        if self._warmup is not None:
+            await asyncio.wait_for(asyncio.shield(self._warmup), timeout)
+        return self.ready
+
+    async def shutdown(self) -> None:
+        if self._warmup is not None and not self._warmup.done():
+            self._warmup.cancel()
+            try:
+                await self._warmup
+            except asyncio.CancelledError:
+                pass
+        # Finish the in-flight batch before anything it writes to goes away
+        await asyncio.to_thread(cdc_broadcast.stop)
+        await asyncio.to_thread(cdc_consumer.stop)
+        await asyncio.to_thread(cdc_workers.shutdown)
+        await asr_pool.shutdown()
+        await recording_sink.close_all()
+        await session_registry.close()
+        # Write out buffered transcript chunks before the pool goes away
+        await transcript_buffers.flush_all()
+        await mongo_registry.close()
+        tracer.close()
+        self.started = False
+
+
+container = AppContainer()
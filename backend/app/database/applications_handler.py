@@ -2,20 +2,33 @@ import os
 import logging
 import datetime
 import uuid
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, AsyncIterator, Type, Dict, Any
 
-from pymongo import AsyncMongoClient, ReturnDocument
+from pydantic import BaseModel
+
+from pymongo import AsyncMongoClient, ReturnDocument, UpdateOne
 from pymongo.client_session import ClientSession
-from pymongo.errors import PyMongoError
+from pymongo.errors import PyMongoError, BulkWriteError
 
 from ..models.application_model import (
     ApplicationCreate,
     ApplicationUpdate,
     Application,
+    ApplicationFilter,
+    ApplicationQuery,
+    ApplicationBulkUpdateItem,
+    BulkItemResult,
 )
 from ..models.startup_model import Startup
+from ..models.projection import build_projection, slim_model
+from .cache import model_caches
+from ..monitoring.metrics import instrument_handler
+from ..monitoring.tracing import span
+from .mongo_client import mongo_registry
+from .pagination import fetch_page, keyset_sort
 
 
+@instrument_handler("applications")
 class ApplicationsHandler:
     def __init__(self):
         self.logger = logging.getLogger("ApplicationsHandler")
@@ -28,67 +41,121 @@ class ApplicationsHandler:
             self.logger.error("Configuration error: MONGO_URI or MONGO_DB_NAME not set.")
             raise ValueError("Environment variables MONGO_URI and MONGO_DB_NAME must be set.")
 
-        self.client = AsyncMongoClient(self.uri)
-        self.db = self.client[self.db_name]
-        self.applications_collection = self.db[self.applications_collection_name]
-        self.startups_collection = self.db[self.startups_collection_name]
+    # Collections resolve through the shared registry so every handler uses one pool
+    @property
+    def client(self) -> AsyncMongoClient:
+        return mongo_registry.get_client(self.uri)
+
+    @property
+    def db(self):
+        return self.client[self.db_name]
+
+    @property
+    def applications_collection(self):
+        return self.db[self.applications_collection_name]
+
+    @property
+    def startups_collection(self):
+        return self.db[self.startups_collection_name]
+
+    @staticmethod
+    def _build_application(data: ApplicationCreate, now: datetime.datetime) -> Application:
+        # Map legacy fields to new schema where present
+        company_name = data.companyName or data.startupName or ""
+        description = data.description or data.startupDescription
+        founder_contact = data.founderContact or (data.email if hasattr(data, "email") else None)
+
+        return Application(
+            _id=str(uuid.uuid4()),
+            companyName=company_name,
+            industry=data.industry,
+            location=data.location,
+            founderName=data.founderName,
+            founderContact=founder_contact,
+            roundType=data.roundType,
+            amountRaising=data.amountRaising,
+            valuation=data.valuation,
+            stage=data.stage,
+            dealLeadVCId=data.dealLeadVCId,
+            dateAdded=now,
+            source=data.source,
+            description=description,
+            pitchDeckPath=data.pitchDeckPath or None,
+            keyInsight=data.keyInsight,
+            reminders=data.reminders,
+            dueDiligenceSummary=data.dueDiligenceSummary,
+            status="pending",
+            createdAt=now,
+            updatedAt=now,
+        )
 
     async def create_application(self, data: ApplicationCreate) -> Optional[Application]:
         try:
             now = datetime.datetime.now(datetime.timezone.utc)
-            # Map legacy fields to new schema where present
-            company_name = data.companyName or data.startupName or ""
-            description = data.description or data.startupDescription
-            founder_contact = data.founderContact or (data.email if hasattr(data, "email") else None)
-
-            new_app = Application(
-                _id=str(uuid.uuid4()),
-                companyName=company_name,
-                industry=data.industry,
-                location=data.location,
-                founderName=data.founderName,
-                founderContact=founder_contact,
-                roundType=data.roundType,
-                amountRaising=data.amountRaising,
-                valuation=data.valuation,
-                stage=data.stage,
-                dealLeadVCId=data.dealLeadVCId,
-                dateAdded=now,
-                source=data.source,
-                description=description,
-                pitchDeckPath=data.pitchDeckPath or None,
-                keyInsight=data.keyInsight,
-                reminders=data.reminders,
-                dueDiligenceSummary=data.dueDiligenceSummary,
-                status="pending",
-                createdAt=now,
-                updatedAt=now,
-            )
+            new_app = self._build_application(data, now)
             await self.applications_collection.insert_one(new_app.model_dump(by_alias=True))
             return new_app
         except Exception as e:
             self.logger.error(f"Failed to create application: {e}", exc_info=True)
             return None
 
-    async def get_application_by_id(self, application_id: str) -> Optional[Application]:
+    @staticmethod
+    def _read_shape(fields: Optional[Tuple[str, ...]]) -> Tuple[Type[BaseModel], Optional[dict]]:
+        # Full documents by default; a field selection reads a projection into a slim model
+        if fields is None:
+            return Application, None
+        return slim_model(Application, fields), build_projection(fields)
+
+    async def get_application_by_id(self, application_id: str, fields: Optional[Tuple[str, ...]] = None) -> Optional[Application]:
         try:
-            doc = await self.applications_collection.find_one({"_id": application_id})
+            # Read-through: cached models are shared, callers must not mutate them
+            cache = model_caches.get("applications") if model_caches.enabled else None
+            if cache is not None:
+                cached = cache.get(application_id, fields)
+                if cached is not None:
+                    return cached
+                token = cache.token()
+            model, projection = self._read_shape(fields)
+            doc = await self.applications_collection.find_one({"_id": application_id}, projection)
             if doc:
-                return Application.model_validate(doc)
+                application = model.model_validate(doc)
+                if cache is not None:
+                    cache.set(application_id, fields, application, token)
+                return application
             return None
         except Exception as e:
             self.logger.error(f"Failed to fetch application: {e}", exc_info=True)
             return None
 
-    async def get_all_applications(self) -> Optional[List[Application]]:
+    async def get_all_applications(self, fields: Optional[Tuple[str, ...]] = None) -> Optional[List[Application]]:
         try:
-            cursor = self.applications_collection.find({})
-            results = [Application.model_validate(doc) async for doc in cursor]
+            model, projection = self._read_shape(fields)
+            cursor = self.applications_collection.find({}, projection)
+            results = [model.model_validate(doc) async for doc in cursor]
             return results
         except Exception as e:
             self.logger.error(f"Failed to fetch applications: {e}", exc_info=True)
             return None
 
+    async def get_applications_page(self, limit: int, cursor: Optional[str] = None, fields: Optional[Tuple[str, ...]] = None) -> Optional[Tuple[List[Application], Optional[str]]]:
+        """Keyset page ordered by (createdAt, _id); returns the models and the next cursor."""
+        try:
+            model, projection = self._read_shape(fields)
+            docs, next_cursor = await fetch_page(self.applications_collection, "createdAt", limit, cursor, projection=projection)
+            return [model.model_validate(doc) for doc in docs], next_cursor
+        except ValueError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Failed to fetch applications page: {e}", exc_info=True)
+            return None
+
+    async def iter_applications(self, fields: Optional[Tuple[str, ...]] = None) -> AsyncIterator[Application]:
+        """Yield every application straight from the cursor without buffering the collection."""
+        model, projection = self._read_shape(fields)
+        cursor = self.applications_collection.find({}, projection).sort(keyset_sort("createdAt"))
+        async for doc in cursor:
+            yield model.model_validate(doc)
+
     async def get_pending_applications(self) -> Optional[List[Application]]:
         try:
             cursor = self.applications_collection.find({"status": "pending"})
@@ -98,9 +165,63 @@ class ApplicationsHandler:
             self.logger.error(f"Failed to fetch pending applications: {e}", exc_info=True)
             return None
 
+    async def query_applications(self, query: ApplicationQuery, fields: Optional[Tuple[str, ...]] = None) -> Optional[List[Application]]:
+        """Filter, sort and limit applications in a single aggregation that can use the compound indexes."""
+        try:
+            model, projection = self._read_shape(fields)
+            direction = 1 if query.sortOrder == "asc" else -1
+            pipeline: List[Dict[str, Any]] = [
+                {"$match": query.to_match()},
+                {"$sort": {query.sortBy: direction, "_id": direction}},
+                {"$limit": query.limit},
+            ]
+            if projection is not None:
+                pipeline.append({"$project": projection})
+            cursor = await self.applications_collection.aggregate(pipeline)
+            return [model.model_validate(doc) async for doc in cursor]
+        except Exception as e:
+            self.logger.error(f"Failed to query applications: {e}", exc_info=True)
+            return None
+
+    async def get_application_stats(self, filters: Optional[ApplicationFilter] = None) -> Optional[Dict[str, Any]]:
+        """Pipeline counts by status and stage, computed entirely in MongoDB."""
+        try:
+            match = filters.to_match() if filters else {}
+            pipeline: List[Dict[str, Any]] = [
+                {"$match": match},
+                {"$project": {"_id": 0, "status": 1, "stage": 1}},
+                {"$facet": {
+                    "total": [{"$count": "count"}],
+                    "byStatus": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+                    "byStage": [{"$group": {"_id": {"$ifNull": ["$stage", "unspecified"]}, "count": {"$sum": 1}}}],
+                }},
+            ]
+            cursor = await self.applications_collection.aggregate(pipeline)
+            facets = await cursor.to_list(length=1)
+            result = facets[0] if facets else {}
+            total = result.get("total") or [{"count": 0}]
+            return {
+                "total": total[0]["count"],
+                "byStatus": {row["_id"]: row["count"] for row in result.get("byStatus", [])},
+                "byStage": {row["_id"]: row["count"] for row in result.get("byStage", [])},
+            }
+        except Exception as e:
+            self.logger.error(f"Failed to compute application stats: {e}", exc_info=True)
+            return None
+
+    @staticmethod
+    def _update_payload(data: ApplicationUpdate) -> Dict[str, Any]:
+        return {k: v for k, v in data.model_dump(exclude_unset=True).items() if v is not None}
+
+    @staticmethod
+    def _invalidate(*application_ids: str) -> None:
+        # Local writes drop their cache entries at once; other workers catch up from the CDC events
+        for application_id in application_ids:
+            model_caches.invalidate("applications", application_id)
+
     async def update_application(self, application_id: str, data: ApplicationUpdate) -> Optional[Application]:
         try:
-            payload = {k: v for k, v in data.model_dump(exclude_unset=True).items() if v is not None}
+            payload = self._update_payload(data)
             if not payload:
                 return await self.get_application_by_id(application_id)
             payload["updatedAt"] = datetime.datetime.now(datetime.timezone.utc)
@@ -109,6 +230,7 @@ class ApplicationsHandler:
                 {"$set": payload},
                 return_document=ReturnDocument.AFTER,
             )
+            self._invalidate(application_id)
             if updated:
                 return Application.model_validate(updated)
             return None
@@ -119,6 +241,7 @@ class ApplicationsHandler:
     async def delete_application(self, application_id: str) -> bool:
         try:
             result = await self.applications_collection.delete_one({"_id": application_id})
+            self._invalidate(application_id)
             return result.deleted_count == 1
         except Exception as e:
             self.logger.error(f"Failed to delete application: {e}", exc_info=True)
@@ -139,18 +262,23 @@ class ApplicationsHandler:
         if not updated:
             return None, None
 
-        accepted_application = Application.model_validate(updated)
+        with span("validate", model="Application"):
+            accepted_application = Application.model_validate(updated)
+            startup_doc = self._startup_for(accepted_application, now)
+        await self.startups_collection.insert_one(startup_doc.model_dump(by_alias=True), session=session)
+        return accepted_application, startup_doc
+
+    @staticmethod
+    def _startup_for(application: Application, now: datetime.datetime) -> Startup:
         # Create Startup with minimal validated info and reference application
         # startups → only accepted applications, minimal doc
-        startup_doc = Startup(
+        return Startup(
             _id=str(uuid.uuid4()),
-            applicationId=accepted_application.id,
-            companyName=accepted_application.companyName,
+            applicationId=application.id,
+            companyName=application.companyName,
             dateAccepted=now,
             context=None,  # TODO: AI/Pathway pipeline enrichment hooks
         )
-        await self.startups_collection.insert_one(startup_doc.model_dump(by_alias=True), session=session)
-        return accepted_application, startup_doc
 
     async def accept_application(self, application_id: str) -> Tuple[Optional[Application], Optional[Startup]]:
         """
@@ -158,17 +286,23 @@ class ApplicationsHandler:
         Uses MongoDB transactions when available; falls back to best-effort if not supported.
         """
         try:
-            async with await self.client.start_session() as session:
+            async with self.client.start_session() as session:
                 try:
-                    async with session.start_transaction():
-                        return await self._accept_flow(application_id, session)
+                    with span("applications.accept.transaction"):
+                        async with await session.start_transaction():
+                            result = await self._accept_flow(application_id, session)
                 except PyMongoError:
                     self.logger.warning("Transaction failed or unsupported; attempting non-transactional accept.", exc_info=True)
                     # Fallback: try without transaction; may be non-atomic in standalone deployments
-                    return await self._accept_flow(application_id, None)
+                    with span("applications.accept.fallback"):
+                        result = await self._accept_flow(application_id, None)
+            return result
         except Exception as e:
             self.logger.error(f"Failed to accept application: {e}", exc_info=True)
             return None, None
+        finally:
+            # After the commit (or the failure), so a concurrent read cannot re-cache the old document
+            self._invalidate(application_id)
 
     async def reject_application(self, application_id: str) -> Optional[Application]:
         try:
@@ -178,9 +312,167 @@ class ApplicationsHandler:
                 {"$set": {"status": "rejected", "updatedAt": now}},
                 return_document=ReturnDocument.AFTER,
             )
+            self._invalidate(application_id)
             return Application.model_validate(updated) if updated else None
         except Exception as e:
             self.logger.error(f"Failed to reject application: {e}", exc_info=True)
             return None
 
 
+
+    # ----- Bulk operations -----
+
+    @staticmethod
+    def _bulk_errors(e: BulkWriteError) -> Dict[int, str]:
+        """Map operation index -> error message from an unordered bulk failure."""
+        return {err["index"]: err.get("errmsg", "write error") for err in e.details.get("writeErrors", [])}
+
+    async def _existing_ids(self, ids: List[str], query: Optional[Dict[str, Any]] = None) -> set:
+        cursor = self.applications_collection.find({"_id": {"$in": ids}, **(query or {})}, {"_id": 1})
+        return {doc["_id"] async for doc in cursor}
+
+    async def create_applications(self, items: List[ApplicationCreate]) -> Optional[List[BulkItemResult]]:
+        """Insert many applications with one unordered insert_many; failures are reported per item."""
+        try:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            apps = [self._build_application(item, now) for item in items]
+            errors: Dict[int, str] = {}
+            try:
+                await self.applications_collection.insert_many(
+                    [app.model_dump(by_alias=True) for app in apps], ordered=False
+                )
+            except BulkWriteError as e:
+                errors = self._bulk_errors(e)
+            return [
+                BulkItemResult(index=i, id=app.id, ok=i not in errors, error=errors.get(i))
+                for i, app in enumerate(apps)
+            ]
+        except Exception as e:
+            self.logger.error(f"Failed to bulk create applications: {e}", exc_info=True)
+            return None
+
+    async def update_applications(self, items: List[ApplicationBulkUpdateItem]) -> Optional[List[BulkItemResult]]:
+        """Apply many partial updates with one unordered bulk_write; failures are reported per item."""
+        try:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            existing = await self._existing_ids([item.id for item in items])
+            results: List[BulkItemResult] = []
+            operations: List[UpdateOne] = []
+            op_to_item: List[int] = []
+            for i, item in enumerate(items):
+                if item.id not in existing:
+                    results.append(BulkItemResult(index=i, id=item.id, ok=False, error="Application not found"))
+                    continue
+                results.append(BulkItemResult(index=i, id=item.id, ok=True))
+                payload = self._update_payload(item.data)
+                if payload:
+                    payload["updatedAt"] = now
+                    operations.append(UpdateOne({"_id": item.id}, {"$set": payload}))
+                    op_to_item.append(i)
+
+            if operations:
+                try:
+                    await self.applications_collection.bulk_write(operations, ordered=False)
+                except BulkWriteError as e:
+                    for op_index, message in self._bulk_errors(e).items():
+                        result = results[op_to_item[op_index]]
+                        result.ok, result.error = False, message
+                finally:
+                    self._invalidate(*(items[i].id for i in op_to_item))
+            return results
+        except Exception as e:
+            self.logger.error(f"Failed to bulk update applications: {e}", exc_info=True)
+            return None
+
+    async def _accept_batch_flow(self, application_ids: List[str], session: ClientSession) -> Dict[str, Startup]:
+        """Accept every pending application in the batch with one update_many and one insert_many."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cursor = self.applications_collection.find(
+            {"_id": {"$in": application_ids}, "status": "pending"}, session=session
+        )
+        pending = [doc async for doc in cursor]
+        if not pending:
+            return {}
+
+        pending_ids = [doc["_id"] for doc in pending]
+        await self.applications_collection.update_many(
+            {"_id": {"$in": pending_ids}, "status": "pending"},
+            {"$set": {"status": "accepted", "updatedAt": now}},
+            session=session,
+        )
+        startups = {
+            doc["_id"]: self._startup_for(
+                Application.model_validate({**doc, "status": "accepted", "updatedAt": now}), now
+            )
+            for doc in pending
+        }
+        await self.startups_collection.insert_many(
+            [startup.model_dump(by_alias=True) for startup in startups.values()], session=session
+        )
+        return startups
+
+    async def accept_applications(self, application_ids: List[str]) -> Optional[List[BulkItemResult]]:
+        """
+        Accept many applications, one transaction per chunk of BULK_ACCEPT_CHUNK_SIZE ids.
+        Chunks whose transaction fails fall back to the per-application non-transactional flow.
+        """
+        try:
+            chunk_size = max(1, int(os.getenv("BULK_ACCEPT_CHUNK_SIZE", "100")))
+            accepted: Dict[str, Startup] = {}
+            for start in range(0, len(application_ids), chunk_size):
+                chunk = list(dict.fromkeys(application_ids[start:start + chunk_size]))
+                async with self.client.start_session() as session:
+                    try:
+                        async with await session.start_transaction():
+                            batch = await self._accept_batch_flow(chunk, session)
+                        # Only a committed transaction's startups exist
+                        accepted.update(batch)
+                        self._invalidate(*batch)
+                        continue
+                    except PyMongoError:
+                        self.logger.warning("Bulk accept transaction failed or unsupported; accepting chunk one by one.", exc_info=True)
+                for application_id in chunk:
+                    try:
+                        _, startup = await self._accept_flow(application_id, None)
+                    finally:
+                        self._invalidate(application_id)
+                    if startup is not None:
+                        accepted[application_id] = startup
+
+            return [
+                BulkItemResult(
+                    index=i,
+                    id=application_id,
+                    ok=application_id in accepted,
+                    error=None if application_id in accepted else "Application not in pending state or not found",
+                    startupId=accepted[application_id].id if application_id in accepted else None,
+                )
+                for i, application_id in enumerate(application_ids)
+            ]
+        except Exception as e:
+            self.logger.error(f"Failed to bulk accept applications: {e}", exc_info=True)
+            return None
+
+    async def reject_applications(self, application_ids: List[str]) -> Optional[List[BulkItemResult]]:
+        """Reject many applications with a single update_many."""
+        try:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            rejectable = await self._existing_ids(application_ids, {"status": {"$ne": "rejected"}})
+            if rejectable:
+                await self.applications_collection.update_many(
+                    {"_id": {"$in": list(rejectable)}, "status": {"$ne": "rejected"}},
+                    {"$set": {"status": "rejected", "updatedAt": now}},
+                )
+                self._invalidate(*rejectable)
+            return [
+                BulkItemResult(
+                    index=i,
+                    id=application_id,
+                    ok=application_id in rejectable,
+                    error=None if application_id in rejectable else "Application not found or already rejected",
+                )
+                for i, application_id in enumerate(application_ids)
+            ]
+        except Exception as e:
+            self.logger.error(f"Failed to bulk reject applications: {e}", exc_info=True)
+            return None
@@ -0,0 +1,205 @@
+"""
+Model Cache
+
+In-process read-through cache of validated models for the single-document
+fetches (``get_application_by_id``, ``get_startup_by_id``,
+``get_meeting_by_id``). Entries are keyed by document id and read shape (the
+``fields`` selection), bounded by ``MODEL_CACHE_MAX_ENTRIES`` per collection
+(least recently used first out) and expire after ``MODEL_CACHE_TTL_SECONDS``.
+
+Writes made by this process invalidate their documents directly; writes made
+by other workers or other services reach every worker through the Debezium
+change events (``pipeline.process_event`` invalidates on ``u`` and ``d``), with
+the TTL as the upper bound on staleness if the CDC consumer is down.
+
+A fetch that raced with an invalidation must not put the old document back:
+``token()`` is taken before the database read and ``set`` refuses to store the
+result if the document was invalidated after that token.
+
+Cached models are shared between requests and must be treated as read-only.
+"""
+
+import os
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, Hashable]
+
+
+class CacheSettings:
+    def __init__(self):
+        self.enabled = os.getenv("MODEL_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.max_entries = max(1, int(os.getenv("MODEL_CACHE_MAX_ENTRIES", "1000")))
+        self.ttl = max(0.0, float(os.getenv("MODEL_CACHE_TTL_SECONDS", "300")))
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_skips = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "stale_skips": self.stale_skips,
+        }
+
+
+class ModelCache:
+    """
+    LRU + TTL cache for one collection.
+
+    Args:
+        max_entries (int): Entries kept before the least recently used is evicted
+        ttl (float): Seconds an entry stays valid; 0 disables expiry
+    """
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._keys_by_id: Dict[str, Set[CacheKey]] = {}
+        # Sequence number of the last invalidation per document, for the race guard.
+        # Only the most recent ones are remembered; anything older is covered by _floor.
+        self._invalidated: "OrderedDict[str, int]" = OrderedDict()
+        self._seq = 0
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, key: CacheKey) -> None:
+        self._entries.pop(key, None)
+        keys = self._keys_by_id.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_id[key[0]]
+
+    def get(self, doc_id: str, variant: Hashable = None) -> Optional[Any]:
+        key = (doc_id, variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and entry[0] <= time.monotonic():
+                self._drop(key)
+                self.stats.expirations += 1
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[1]
+
+    def token(self) -> int:
+        """Take before reading from the database; pass to ``set`` with the result."""
+        with self._lock:
+            return self._seq
+
+    def set(self, doc_id: str, variant: Hashable, value: Any, token: int) -> bool:
+        """Store ``value`` unless the document was invalidated after ``token`` was taken."""
+        key = (doc_id, variant)
+        with self._lock:
+            if token < self._floor or self._invalidated.get(doc_id, 0) > token:
+                self.stats.stale_skips += 1
+                return False
+            expires = time.monotonic() + self.ttl if self.ttl else float("inf")
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            self._keys_by_id.setdefault(doc_id, set()).add(key)
+            self.stats.stores += 1
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.stats.evictions += 1
+            return True
+
+    def invalidate(self, doc_id: str) -> None:
+        with self._lock:
+            self._seq += 1
+            self._invalidated[doc_id] = self._seq
+            self._invalidated.move_to_end(doc_id)
+            while len(self._invalidated) > self.max_entries:
+                _, seq = self._invalidated.popitem(last=False)
+                self._floor = max(self._floor, seq)
+            keys = self._keys_by_id.pop(doc_id, ())
+            for key in keys:
+                self._entries.pop(key, None)
+            self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._seq += 1
+            self._floor = self._seq
+            self._entries.clear()
+            self._keys_by_id.clear()
+            self._invalidated.clear()
+
+
+class ModelCacheRegistry:
+    """One ``ModelCache`` per collection (``applications``, ``startups``, ``meetings``)."""
+    def __init__(self, settings: Optional[CacheSettings] = None):
+        self._settings = settings
+        self._caches: Dict[str, ModelCache] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def settings(self) -> CacheSettings:
+        if self._settings is None:
+            self._settings = CacheSettings()
+        return self._settings
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.enabled
+
+    def get(self, collection: str) -> ModelCache:
+        with self._lock:
+            cache = self._caches.get(collection)
+            if cache is None:
+                cache = ModelCache(self.settings.max_entries, self.settings.ttl)
+                self._caches[collection] = cache
+            return cache
+
+    def invalidate(self, collection: str, doc_id: str) -> None:
+        self.get(collection).invalidate(doc_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            caches = list(self._caches.values())
+        for cache in caches:
+            cache.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            caches = dict(self._caches)
+        return {
+            "enabled": self.settings.enabled,
+            "max_entries": self.settings.max_entries,
+            "ttl_seconds": self.settings.ttl,
+            "collections": {
+                name: {"entries": len(cache), **cache.stats.as_dict()}
+                for name, cache in caches.items()
+            },
+        }
+
+
+model_caches = ModelCacheRegistry()
@@ -0,0 +1,117 @@
+"""
+Index Registry
+
+Declarative list of the indexes each collection needs, reconciled against the
+database at application startup. Indexes are named explicitly so the report can
+tell which declared indexes exist and which are missing.
+
+To add an index, append an ``IndexModel`` to the collection's entry in
+``INDEX_REGISTRY``; it will be created on the next startup.
+"""
+
+import os
+import logging
+from typing import Dict, List, Any
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import PyMongoError
+
+from .mongo_client import mongo_registry
+
+logger = logging.getLogger(__name__)
+
+
+# Registry key -> (environment variable holding the collection name, default name)
+COLLECTION_ENV = {
+    "applications": ("APPLICATIONS_COLLECTION_NAME", "applications"),
+    "meetings": ("MEETING_COLLECTION_NAME", "meetings"),
+    "startups": ("STARTUPS_COLLECTION_NAME", "startups"),
+    "transcripts": ("TRANSCRIPT_COLLECTION_NAME", "transcripts"),
+}
+
+INDEX_REGISTRY: Dict[str, List[IndexModel]] = {
+    "applications": [
+        # get_pending_applications and status-filtered listings
+        IndexModel([("status", ASCENDING), ("createdAt", ASCENDING)], name="status_createdAt"),
+        # keyset pagination on /fetch/all
+        IndexModel([("createdAt", ASCENDING), ("_id", ASCENDING)], name="createdAt_id"),
+        # /query filters combined with the default createdAt sort
+        IndexModel([("industry", ASCENDING), ("createdAt", ASCENDING)], name="industry_createdAt"),
+        IndexModel([("stage", ASCENDING), ("createdAt", ASCENDING)], name="stage_createdAt"),
+        IndexModel([("dealLeadVCId", ASCENDING), ("createdAt", ASCENDING)], name="dealLeadVCId_createdAt"),
+    ],
+    "meetings": [
+        # get_meetings_by_vc_id
+        IndexModel([("vc_id", ASCENDING), ("start_time", ASCENDING)], name="vc_id_start_time"),
+        # keyset pagination on /fetch/all
+        IndexModel([("start_time", ASCENDING), ("_id", ASCENDING)], name="start_time_id"),
+    ],
+    "startups": [
+        # startup lookups by the application they were created from
+        IndexModel([("applicationId", ASCENDING)], name="applicationId"),
+        # keyset pagination on /fetch/all
+        IndexModel([("dateAccepted", ASCENDING), ("_id", ASCENDING)], name="dateAccepted_id"),
+    ],
+    "transcripts": [
+        # ranged transcript reads per meeting
+        IndexModel([("meeting_id", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)], name="meeting_id_timestamp_id"),
+    ],
+}
+
+
+def collection_name(key: str) -> str:
+    env_name, default = COLLECTION_ENV[key]
+    return os.getenv(env_name, default)
+
+
+async def _existing_index_names(collection) -> List[str]:
+    names = []
+    cursor = await collection.list_indexes()
+    async for index in cursor:
+        names.append(index["name"])
+    return names
+
+
+async def ensure_indexes() -> Dict[str, List[str]]:
+    """
+    Create every declared index that does not exist yet.
+
+    Failures are logged per collection and do not stop startup; the report
+    endpoint will keep listing the index as missing.
+
+    Returns:
+        Dict[str, List[str]]: Names of the indexes created, per collection
+    """
+    db = mongo_registry.get_database()
+    created: Dict[str, List[str]] = {}
+    for key, indexes in INDEX_REGISTRY.items():
+        collection = db[collection_name(key)]
+        try:
+            # list_indexes on a collection that does not exist yet returns no indexes
+            existing = set(await _existing_index_names(collection))
+            missing = [index for index in indexes if index.document["name"] not in existing]
+            if not missing:
+                continue
+            created[key] = await collection.create_indexes(missing)
+            logger.info(f"Created indexes on {collection.name}: {created[key]}")
+        except PyMongoError as e:
+            logger.error(f"Failed to reconcile indexes on {collection.name}: {e}")
+    return created
+
+
+async def index_report() -> Dict[str, Any]:
+    """Compare the declared indexes with the ones present in the database."""
+    db = mongo_registry.get_database()
+    report: Dict[str, Any] = {}
+    for key, indexes in INDEX_REGISTRY.items():
+        collection = db[collection_name(key)]
+        declared = [index.document["name"] for index in indexes]
+        existing = await _existing_index_names(collection)
+        report[key] = {
+            "collection": collection.name,
+            "declared": declared,
+            "present": [name for name in declared if name in existing],
+            "missing": [name for name in declared if name not in existing],
+            "undeclared": [name for name in existing if name != "_id_" and name not in declared],
+        }
+    return report
@@ -8,14 +8,21 @@ update, and deletion.
 
 import datetime
 import uuid
-from typing import Optional, List
+from typing import Optional, List, Tuple, AsyncIterator
 
 from pymongo import AsyncMongoClient
 import os
 import logging
 
 from ..models.meeting import MeetingCreationData, Meeting, MeetingMiniData
+from .cache import model_caches
+from ..monitoring.metrics import instrument_handler
+from .mongo_client import mongo_registry
+from .pagination import fetch_page, keyset_sort
 
+MEETING_MINI_PROJECTION = {"_id": 1, "vc_id": 1, "start_time": 1, "end_time": 1, "status": 1}
+
+@instrument_handler("meetings")
 class MeetingHandler:
     """    
     Handler class for meeting database operations.
@@ -29,7 +36,7 @@ class MeetingHandler:
         uri (str): MongoDB connection URI
         db_name (str): Name of the MongoDB database
         meeting_collection_name (str): Name of the meetings collection
-        client (AsyncMongoClient): MongoDB async client instance
+        client (AsyncMongoClient): Shared pooled client from the mongo_registry
         db: Database reference
         meetings_collection: Collection reference for meetings
     
@@ -51,20 +58,28 @@ class MeetingHandler:
 
         self.logger.debug(f"MongoDB URI: {self.uri}, Database: {self.db_name}")
 
-        # Initialize MongoDB Client
-        self.client = AsyncMongoClient(self.uri)
-        self.db = self.client[self.db_name]
-        self.meetings_collection = self.db[self.meeting_collection_name]
-
-        self.logger.info("MongoDB client initialized successfully.")
+        # MongoDB client is shared process-wide; see mongo_client.MongoClientRegistry
         self.logger.debug(f"Meeting collection: {self.meeting_collection_name}")
 
+    @property
+    def client(self) -> AsyncMongoClient:
+        return mongo_registry.get_client(self.uri)
+
+    @property
+    def db(self):
+        return self.client[self.db_name]
+
+    @property
+    def meetings_collection(self):
+        return self.db[self.meeting_collection_name]
+
     async def create_meeting(self, meeting_data: MeetingCreationData) -> Optional[Meeting]:
         """        
         Create a new meeting record in the database.
         
         Generates a new meeting with a unique UUID, sets the start time to current UTC time,
-        initializes an empty transcript, and sets status to "in_progress".
+        and sets status to "in_progress". Transcript chunks are stored separately by
+        TranscriptHandler.
         
         Args:
             meeting_data (MeetingCreationData): Data object containing VC ID and other meeting info
@@ -86,7 +101,6 @@ class MeetingHandler:
                 _id=str(uuid.uuid4()), # generate UUID
                 vc_id=meeting_data.vc_id,  # set VC ID
                 start_time=datetime.datetime.now(datetime.timezone.utc),  # set start time (timezone-aware UTC)
-                transcript=[],  # start empty
                 status="in_progress"  # initial status
             )
 
@@ -104,7 +118,14 @@ class MeetingHandler:
         Retrieve a meeting by its unique ID.
         
         Queries the MongoDB collection for a meeting with the specified ID and
-        returns a fully populated Meeting object.
+        returns its metadata. Legacy embedded transcript arrays are never loaded;
+        use TranscriptHandler.get_transcript for transcript ranges, which falls
+        back to the embedded array for meetings stored before the transcripts
+        collection.
+
+        Reads go through the model cache (see ``database/cache.py``); the
+        returned meeting may be shared with other requests and must not be
+        modified in place.
         
         Args:
             meeting_id (str): The unique identifier of the meeting
@@ -115,17 +136,27 @@ class MeetingHandler:
         Example:
             >>> meeting = await handler.get_meeting_by_id("meeting-uuid-123")
             >>> if meeting:
-            ...     print(f"Meeting with {len(meeting.transcript)} transcript chunks")
+            ...     print(f"Meeting status: {meeting.status}")
         """
         try:
             self.logger.debug(f"Fetching meeting with ID: {meeting_id}")
 
+            cache = model_caches.get("meetings") if model_caches.enabled else None
+            if cache is not None:
+                cached = cache.get(meeting_id)
+                if cached is not None:
+                    return cached
+                token = cache.token()
+
             # Query MongoDB
-            meeting_data = await self.meetings_collection.find_one({"_id": meeting_id})
+            meeting_data = await self.meetings_collection.find_one({"_id": meeting_id}, {"transcript": 0})
 
             if meeting_data:
                 self.logger.info(f"Meeting found with ID: {meeting_id}")
-                return Meeting.model_validate(meeting_data)
+                meeting = Meeting.model_validate(meeting_data)
+                if cache is not None:
+                    cache.set(meeting_id, None, meeting, token)
+                return meeting
             else:
                 self.logger.warning(f"No meeting found with ID: {meeting_id}")
                 return None
@@ -176,7 +207,7 @@ class MeetingHandler:
         """        
         Update an existing meeting in the database.
         
-        Replaces the entire meeting document with the provided meeting object.
+        Sets the meeting's metadata fields from the provided meeting object.
         Uses the meeting's ID to locate the document to update.
         
         Args:
@@ -194,11 +225,12 @@ class MeetingHandler:
             self.logger.debug(f"Updating meeting with ID: {meeting.id}")
 
             # Update MongoDB
-            result = await self.meetings_collection.replace_one(
+            result = await self.meetings_collection.update_one(
                 {"_id": meeting.id},
-                meeting.model_dump(by_alias=True)
+                {"$set": meeting.model_dump(by_alias=True, exclude={"id"})}
             )
-            if result.modified_count == 1:
+            model_caches.invalidate("meetings", meeting.id)
+            if result.matched_count == 1:
                 self.logger.info(f"Meeting updated with ID: {meeting.id}")
                 return True
             else:
@@ -231,6 +263,7 @@ class MeetingHandler:
 
             # Delete from MongoDB
             result = await self.meetings_collection.delete_one({"_id": meeting.id})
+            model_caches.invalidate("meetings", meeting.id)
             if result.deleted_count == 1:
                 self.logger.info(f"Meeting deleted with ID: {meeting.id}")
                 return True
@@ -259,7 +292,7 @@ class MeetingHandler:
         try:
             self.logger.debug("Fetching all meetings base info.")
 
-            meetings_cursor = self.meetings_collection.find({}, {"_id": 1, "vc_id": 1, "start_time": 1, "end_time": 1, "status": 1})
+            meetings_cursor = self.meetings_collection.find({}, MEETING_MINI_PROJECTION)
             meetings = []
             async for meeting_data in meetings_cursor:
                 meetings.append(MeetingMiniData.model_validate(meeting_data))
@@ -271,4 +304,41 @@ class MeetingHandler:
             self.logger.error(f"Failed to fetch meetings: {e}", exc_info=True)
             return []
 
+    async def get_meetings_page(self, limit: int, cursor: Optional[str] = None) -> Optional[Tuple[List[MeetingMiniData], Optional[str]]]:
+        """        
+        Retrieve one page of meetings using keyset pagination.
+        
+        Pages are ordered by (start_time, _id) and contain minimal meeting data.
+        
+        Args:
+            limit (int): Maximum number of meetings in the page
+            cursor (Optional[str]): Opaque token returned as ``next`` by the previous page
+            
+        Returns:
+            Optional[Tuple[List[MeetingMiniData], Optional[str]]]: The page and the next cursor
+            (None on the last page), or None on database error
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            docs, next_cursor = await fetch_page(
+                self.meetings_collection, "start_time", limit, cursor, projection=MEETING_MINI_PROJECTION
+            )
+            return [MeetingMiniData.model_validate(doc) for doc in docs], next_cursor
+        except ValueError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Failed to fetch meetings page: {e}", exc_info=True)
+            return None
 
+    async def iter_meetings(self) -> AsyncIterator[MeetingMiniData]:
+        """        
+        Stream minimal data for every meeting directly from the database cursor.
+        
+        Yields:
+            MeetingMiniData: One meeting at a time, ordered by (start_time, _id)
+        """
+        cursor = self.meetings_collection.find({}, MEETING_MINI_PROJECTION).sort(keyset_sort("start_time"))
+        async for meeting_data in cursor:
+            yield MeetingMiniData.model_validate(meeting_data)
@@ -0,0 +1,123 @@
+"""
+Mongo Client Registry
+
+Owns the process-wide ``AsyncMongoClient`` instances shared by every handler.
+A single pooled client is created per URI (normally just ``MONGO_URI``) so the
+meetings, applications and startups handlers no longer open three separate
+connection pools per worker.
+
+The registry is opened and closed from the FastAPI lifespan in ``app.main``;
+handlers only ever resolve collections through it.
+"""
+
+import os
+import logging
+from typing import Dict, Optional, Any
+
+from pymongo import AsyncMongoClient
+
+from ..monitoring.tracing import tracer
+
+
+def _int_env(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return int(value)
+
+
+class MongoPoolSettings:
+    """
+    Connection pool settings applied to every client created by the registry.
+
+    Attributes:
+        max_pool_size (int): Maximum connections per server (MONGO_MAX_POOL_SIZE)
+        min_pool_size (int): Connections kept warm per server (MONGO_MIN_POOL_SIZE)
+        max_idle_time_ms (int): Idle time before a pooled connection is closed (MONGO_MAX_IDLE_TIME_MS)
+        server_selection_timeout_ms (int): Time to wait for a suitable server (MONGO_SERVER_SELECTION_TIMEOUT_MS)
+        connect_timeout_ms (int): Socket connect timeout (MONGO_CONNECT_TIMEOUT_MS)
+        wait_queue_timeout_ms (Optional[int]): Time to wait for a free pooled connection (MONGO_WAIT_QUEUE_TIMEOUT_MS)
+    """
+    def __init__(self):
+        self.max_pool_size = _int_env("MONGO_MAX_POOL_SIZE", 50)
+        self.min_pool_size = _int_env("MONGO_MIN_POOL_SIZE", 0)
+        self.max_idle_time_ms = _int_env("MONGO_MAX_IDLE_TIME_MS", 60000)
+        self.server_selection_timeout_ms = _int_env("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000)
+        self.connect_timeout_ms = _int_env("MONGO_CONNECT_TIMEOUT_MS", 10000)
+        self.wait_queue_timeout_ms = _int_env("MONGO_WAIT_QUEUE_TIMEOUT_MS", None)
+
+    def client_kwargs(self) -> Dict[str, Any]:
+        kwargs = {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": self.min_pool_size,
+            "maxIdleTimeMS": self.max_idle_time_ms,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+            "connectTimeoutMS": self.connect_timeout_ms,
+        }
+        if self.wait_queue_timeout_ms is not None:
+            kwargs["waitQueueTimeoutMS"] = self.wait_queue_timeout_ms
+        return kwargs
+
+
+class MongoClientRegistry:
+    """
+    Process-wide registry of pooled MongoDB clients.
+
+    Clients are created lazily on first use and keyed by URI, so every handler
+    asking for the default ``MONGO_URI`` shares one connection pool.
+    """
+    def __init__(self):
+        self.logger = logging.getLogger("MongoClientRegistry")
+        self._clients: Dict[str, AsyncMongoClient] = {}
+        self._settings: Optional[MongoPoolSettings] = None
+
+    @property
+    def settings(self) -> MongoPoolSettings:
+        # Read lazily so values loaded from .env by load_config() are honoured
+        if self._settings is None:
+            self._settings = MongoPoolSettings()
+        return self._settings
+
+    def get_client(self, uri: Optional[str] = None) -> AsyncMongoClient:
+        uri = uri or os.getenv("MONGO_URI")
+        if uri is None:
+            self.logger.error("Configuration error: MONGO_URI not set.")
+            raise ValueError("Environment variable MONGO_URI must be set.")
+
+        client = self._clients.get(uri)
+        if client is None:
+            # Command timings feed the spans of sampled request traces
+            client = AsyncMongoClient(uri, event_listeners=[tracer.mongo_listener], **self.settings.client_kwargs())
+            self._clients[uri] = client
+            self.logger.info(
+                f"MongoDB client created (maxPoolSize={self.settings.max_pool_size}, "
+                f"maxIdleTimeMS={self.settings.max_idle_time_ms})"
+            )
+        return client
+
+    def get_database(self, db_name: Optional[str] = None, uri: Optional[str] = None):
+        db_name = db_name or os.getenv("MONGO_DB_NAME")
+        if db_name is None:
+            self.logger.error("Configuration error: MONGO_DB_NAME not set.")
+            raise ValueError("Environment variable MONGO_DB_NAME must be set.")
+        return self.get_client(uri)[db_name]
+
+    async def connect(self) -> None:
+        """Create the default client eagerly (called from the app lifespan)."""
+        self.get_client()
+
+    async def close(self) -> None:
+        """Close every pooled client; safe to call more than once."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._settings = None
+        for client in clients:
+            try:
+                await client.close()
+            except Exception as e:
+                self.logger.error(f"Failed to close MongoDB client: {e}", exc_info=True)
+        if clients:
+            self.logger.info(f"Closed {len(clients)} MongoDB client(s).")
+
+
+mongo_registry = MongoClientRegistry()
@@ -0,0 +1,115 @@
+"""
+Keyset Pagination Helpers
+
+Cursor (keyset) pagination over a ``(sort_field, _id)`` pair. Pages are read
+with a range filter on the sort key instead of ``skip``, so every page costs
+the same regardless of how deep into the collection the client is.
+
+The ``next`` token handed to clients is opaque: a urlsafe base64 encoding of
+the last document's sort value and ``_id``.
+
+MongoDB sorts a null or missing sort key before every other value, so a
+cursor whose sort value is null continues with the remaining null-keyed
+documents (by ``_id``) and then every document with a key.
+"""
+
+import base64
+import datetime
+import json
+from typing import Any, Dict, Optional, Tuple, List
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
+
+def encode_cursor(sort_value: Any, doc_id: str) -> str:
+    if sort_value is None:
+        value = {"t": "null"}
+    elif isinstance(sort_value, datetime.datetime):
+        value = {"t": "dt", "v": sort_value.isoformat()}
+    else:
+        value = {"t": "raw", "v": sort_value}
+    raw = json.dumps({"s": value, "id": doc_id}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[Any, str]:
+    """
+    Decode a ``next`` token produced by ``encode_cursor``.
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value = payload["s"]
+        doc_id = payload["id"]
+        if value["t"] == "null":
+            sort_value = None
+        elif value["t"] == "dt":
+            sort_value = datetime.datetime.fromisoformat(value["v"])
+        else:
+            sort_value = value["v"]
+        return sort_value, doc_id
+    except Exception as e:
+        raise ValueError(f"Invalid pagination cursor: {e}") from e
+
+
+def keyset_filter(sort_field: str, cursor: Optional[str]) -> Dict[str, Any]:
+    """Build the range filter selecting documents strictly after ``cursor``."""
+    if not cursor:
+        return {}
+    sort_value, doc_id = decode_cursor(cursor)
+    if sort_value is None:
+        # {$gt: null} matches nothing; nulls sort first, so everything with a key follows
+        return {
+            "$or": [
+                {sort_field: None, "_id": {"$gt": doc_id}},
+                {sort_field: {"$ne": None}},
+            ]
+        }
+    return {
+        "$or": [
+            {sort_field: {"$gt": sort_value}},
+            {sort_field: sort_value, "_id": {"$gt": doc_id}},
+        ]
+    }
+
+
+def keyset_sort(sort_field: str) -> List[Tuple[str, int]]:
+    return [(sort_field, 1), ("_id", 1)]
+
+
+async def fetch_page(
+    collection,
+    sort_field: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    query: Optional[Dict[str, Any]] = None,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Read one page of raw documents and the token for the following page.
+
+    One extra document is requested to learn whether another page exists, so
+    the last page returns ``None`` as its token instead of an empty page.
+    """
+    filters = [f for f in (query or {}, keyset_filter(sort_field, cursor)) if f]
+    mongo_query = {"$and": filters} if len(filters) > 1 else (filters[0] if filters else {})
+
+    if projection is not None and not any(v == 0 for v in projection.values()):
+        # The sort key is needed to build the next token even if not requested
+        projection = {**projection, sort_field: 1}
+
+    docs = await collection.find(mongo_query, projection) \
+        .sort(keyset_sort(sort_field)) \
+        .limit(limit + 1) \
+        .to_list(length=limit + 1)
+
+    next_token = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_token = encode_cursor(last.get(sort_field), last["_id"])
+    return docs, next_token
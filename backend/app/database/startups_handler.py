@@ -2,13 +2,20 @@ import os
 import logging
 import datetime
 import uuid
-from typing import Optional, List
+from typing import Optional, List, Tuple, AsyncIterator, Type
 
+from pydantic import BaseModel
 from pymongo import AsyncMongoClient, ReturnDocument
 
 from ..models.startup_model import Startup, StartupCreate, StartupUpdate
+from ..models.projection import build_projection, slim_model
+from .cache import model_caches
+from ..monitoring.metrics import instrument_handler
+from .mongo_client import mongo_registry
+from .pagination import fetch_page, keyset_sort
 
 
+@instrument_handler("startups")
 class StartupsHandler:
     def __init__(self):
         self.logger = logging.getLogger("StartupsHandler")
@@ -20,9 +27,18 @@ class StartupsHandler:
             self.logger.error("Configuration error: MONGO_URI or MONGO_DB_NAME not set.")
             raise ValueError("Environment variables MONGO_URI and MONGO_DB_NAME must be set.")
 
-        self.client = AsyncMongoClient(self.uri)
-        self.db = self.client[self.db_name]
-        self.startups_collection = self.db[self.startups_collection_name]
+    # Collections resolve through the shared registry so every handler uses one pool
+    @property
+    def client(self) -> AsyncMongoClient:
+        return mongo_registry.get_client(self.uri)
+
+    @property
+    def db(self):
+        return self.client[self.db_name]
+
+    @property
+    def startups_collection(self):
+        return self.db[self.startups_collection_name]
 
     async def create_startup(self, data: StartupCreate) -> Optional[Startup]:
         try:
@@ -40,22 +56,62 @@ class StartupsHandler:
             self.logger.error(f"Failed to create startup: {e}", exc_info=True)
             return None
 
-    async def get_startup_by_id(self, startup_id: str) -> Optional[Startup]:
+    @staticmethod
+    def _read_shape(fields: Optional[Tuple[str, ...]]) -> Tuple[Type[BaseModel], Optional[dict]]:
+        # Full documents by default; a field selection reads a projection into a slim model
+        if fields is None:
+            return Startup, None
+        return slim_model(Startup, fields), build_projection(fields)
+
+    async def get_startup_by_id(self, startup_id: str, fields: Optional[Tuple[str, ...]] = None) -> Optional[Startup]:
         try:
-            doc = await self.startups_collection.find_one({"_id": startup_id})
-            return Startup.model_validate(doc) if doc else None
+            # Read-through: cached models are shared, callers must not mutate them
+            cache = model_caches.get("startups") if model_caches.enabled else None
+            if cache is not None:
+                cached = cache.get(startup_id, fields)
+                if cached is not None:
+                    return cached
+                token = cache.token()
+            model, projection = self._read_shape(fields)
+            doc = await self.startups_collection.find_one({"_id": startup_id}, projection)
+            if not doc:
+                return None
+            startup = model.model_validate(doc)
+            if cache is not None:
+                cache.set(startup_id, fields, startup, token)
+            return startup
         except Exception as e:
             self.logger.error(f"Failed to fetch startup: {e}", exc_info=True)
             return None
 
-    async def get_all_startups(self) -> Optional[List[Startup]]:
+    async def get_all_startups(self, fields: Optional[Tuple[str, ...]] = None) -> Optional[List[Startup]]:
         try:
-            cursor = self.startups_collection.find({})
-            return [Startup.model_validate(doc) async for doc in cursor]
+            model, projection = self._read_shape(fields)
+            cursor = self.startups_collection.find({}, projection)
+            return [model.model_validate(doc) async for doc in cursor]
         except Exception as e:
             self.logger.error(f"Failed to fetch startups: {e}", exc_info=True)
             return None
 
+    async def get_startups_page(self, limit: int, cursor: Optional[str] = None, fields: Optional[Tuple[str, ...]] = None) -> Optional[Tuple[List[Startup], Optional[str]]]:
+        """Keyset page ordered by (dateAccepted, _id); returns the models and the next cursor."""
+        try:
+            model, projection = self._read_shape(fields)
+            docs, next_cursor = await fetch_page(self.startups_collection, "dateAccepted", limit, cursor, projection=projection)
+            return [model.model_validate(doc) for doc in docs], next_cursor
+        except ValueError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Failed to fetch startups page: {e}", exc_info=True)
+            return None
+
+    async def iter_startups(self, fields: Optional[Tuple[str, ...]] = None) -> AsyncIterator[Startup]:
+        """Yield every startup straight from the cursor without buffering the collection."""
+        model, projection = self._read_shape(fields)
+        cursor = self.startups_collection.find({}, projection).sort(keyset_sort("dateAccepted"))
+        async for doc in cursor:
+            yield model.model_validate(doc)
+
     async def update_startup(self, startup_id: str, data: StartupUpdate) -> Optional[Startup]:
         try:
             payload = {k: v for k, v in data.model_dump(exclude_unset=True).items()}
@@ -66,6 +122,7 @@ class StartupsHandler:
                 {"$set": payload},
                 return_document=ReturnDocument.AFTER,
             )
+            model_caches.invalidate("startups", startup_id)
             return Startup.model_validate(updated) if updated else None
         except Exception as e:
             self.logger.error(f"Failed to update startup: {e}", exc_info=True)
@@ -74,6 +131,7 @@ class StartupsHandler:
     async def delete_startup(self, startup_id: str) -> bool:
         try:
             result = await self.startups_collection.delete_one({"_id": startup_id})
+            model_caches.invalidate("startups", startup_id)
             return result.deleted_count == 1
         except Exception as e:
             self.logger.error(f"Failed to delete startup: {e}", exc_info=True)
@@ -0,0 +1,218 @@
+"""
+Transcript Write-Behind Buffer
+
+Coalesces transcript chunks per meeting and writes them with a single
+``insert_many`` once ``TRANSCRIPT_FLUSH_MAX_CHUNKS`` chunks are pending or
+``TRANSCRIPT_FLUSH_INTERVAL_MS`` has passed since the first pending chunk,
+so database latency no longer gates how fast a WebSocket can ingest audio.
+
+While the database is failing, a buffer retries with exponential backoff
+(``TRANSCRIPT_RETRY_INITIAL_MS`` doubling up to ``TRANSCRIPT_RETRY_MAX_MS``)
+instead of on every new chunk, and holds at most
+``TRANSCRIPT_MAX_PENDING_CHUNKS``; chunks arriving beyond that are dropped and
+counted in ``dropped_chunks``. Each chunk gets its id when it is queued and
+inserts skip ids that are already stored, so retrying a batch that was
+partly (or entirely) written never duplicates chunks.
+
+Buffers are obtained from ``transcript_buffers`` and must be released when
+the socket closes; releasing the last reference flushes whatever is pending.
+"""
+
+import asyncio
+import os
+import time
+import logging
+from typing import Dict, List, Optional
+
+from ..models.meeting import TranscriptChunk, TranscriptRecord
+from .transcript_handler import TranscriptHandler, transcript_record
+
+logger = logging.getLogger(__name__)
+
+
+class FlushStats:
+    """Flush counters shared by every buffer in the process."""
+    def __init__(self):
+        self.flushes = 0
+        self.chunks_flushed = 0
+        self.failures = 0
+        self.dropped_chunks = 0
+        self.last_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self.total_latency_ms = 0.0
+
+    def record(self, chunks: int, latency_ms: float, ok: bool) -> None:
+        if not ok:
+            self.failures += 1
+            return
+        self.flushes += 1
+        self.chunks_flushed += chunks
+        self.last_latency_ms = latency_ms
+        self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+        self.total_latency_ms += latency_ms
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "flushes": self.flushes,
+            "chunks_flushed": self.chunks_flushed,
+            "failures": self.failures,
+            "dropped_chunks": self.dropped_chunks,
+            "last_flush_latency_ms": round(self.last_latency_ms, 3),
+            "max_flush_latency_ms": round(self.max_latency_ms, 3),
+            "avg_flush_latency_ms": round(self.total_latency_ms / self.flushes, 3) if self.flushes else 0.0,
+        }
+
+
+class TranscriptWriteBuffer:
+    """
+    Write-behind buffer for one meeting's transcript chunks.
+
+    Args:
+        handler (TranscriptHandler): Storage used for flushes
+        meeting_id (str): Meeting the chunks belong to
+        max_chunks (int): Flush as soon as this many chunks are pending
+        max_delay (float): Flush at most this many seconds after the first pending chunk
+        stats (FlushStats): Shared counters updated on every flush
+        max_pending (int): Chunks held while flushes fail; further chunks are dropped
+        retry_initial (float): Seconds to wait after the first failed flush
+        retry_max (float): Longest wait between failed flushes
+    """
+    def __init__(
+        self,
+        handler: TranscriptHandler,
+        meeting_id: str,
+        max_chunks: int,
+        max_delay: float,
+        stats: FlushStats,
+        max_pending: int = 1000,
+        retry_initial: float = 0.5,
+        retry_max: float = 30.0,
+    ):
+        self.handler = handler
+        self.meeting_id = meeting_id
+        self.max_chunks = max_chunks
+        self.max_delay = max_delay
+        self.stats = stats
+        self.max_pending = max(max_chunks, max_pending)
+        self.retry_initial = retry_initial
+        self.retry_max = retry_max
+        self._pending: List[TranscriptRecord] = []
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._failures = 0
+        self._retry_at = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    async def add(self, chunk: TranscriptChunk) -> None:
+        if len(self._pending) >= self.max_pending:
+            self.stats.dropped_chunks += 1
+            if self.stats.dropped_chunks == 1 or self.stats.dropped_chunks % 100 == 0:
+                logger.error(f"Transcript buffer for meeting {self.meeting_id} is full; dropped {self.stats.dropped_chunks} chunk(s) so far")
+            return
+        # The id is fixed here, so every retry of this chunk inserts the same document
+        self._pending.append(transcript_record(self.meeting_id, chunk))
+        wait = self._retry_at - time.monotonic()
+        if wait > 0:
+            # Backing off after a failed flush; the scheduled retry picks this chunk up
+            if self._timer is None:
+                self._timer = asyncio.create_task(self._flush_later(wait))
+        elif len(self._pending) >= self.max_chunks:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later(self.max_delay))
+
+    async def _flush_later(self, delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            return
+        self._timer = None
+        await self.flush()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+
+    async def flush(self) -> bool:
+        """Write every pending chunk; on failure the chunks stay queued and a retry is scheduled."""
+        self._cancel_timer()
+        async with self._lock:
+            if not self._pending:
+                return True
+            batch, self._pending = self._pending, []
+            started = time.perf_counter()
+            ok = await self.handler.append_chunks(self.meeting_id, batch)
+            self.stats.record(len(batch), (time.perf_counter() - started) * 1000, ok)
+            if ok:
+                self._failures = 0
+                self._retry_at = 0.0
+                return True
+            self._pending[:0] = batch
+            self._failures += 1
+            delay = min(self.retry_max, self.retry_initial * (2 ** (self._failures - 1)))
+            self._retry_at = time.monotonic() + delay
+            logger.warning(
+                f"Transcript flush failed for meeting {self.meeting_id}; {len(self._pending)} chunk(s) kept pending, "
+                f"retrying in {delay:.1f}s"
+            )
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later(delay))
+        return False
+
+
+class TranscriptBufferRegistry:
+    """Per-meeting buffers shared by every socket of that meeting in this worker."""
+    def __init__(self):
+        self.stats = FlushStats()
+        self._buffers: Dict[str, TranscriptWriteBuffer] = {}
+        self._refs: Dict[str, int] = {}
+
+    def acquire(self, meeting_id: str, handler: TranscriptHandler) -> TranscriptWriteBuffer:
+        buffer = self._buffers.get(meeting_id)
+        if buffer is None:
+            buffer = TranscriptWriteBuffer(
+                handler,
+                meeting_id,
+                max_chunks=max(1, int(os.getenv("TRANSCRIPT_FLUSH_MAX_CHUNKS", "20"))),
+                max_delay=max(0.0, float(os.getenv("TRANSCRIPT_FLUSH_INTERVAL_MS", "1000"))) / 1000,
+                stats=self.stats,
+                max_pending=max(1, int(os.getenv("TRANSCRIPT_MAX_PENDING_CHUNKS", "1000"))),
+                retry_initial=max(0.0, float(os.getenv("TRANSCRIPT_RETRY_INITIAL_MS", "500"))) / 1000,
+                retry_max=max(0.0, float(os.getenv("TRANSCRIPT_RETRY_MAX_MS", "30000"))) / 1000,
+            )
+            self._buffers[meeting_id] = buffer
+        self._refs[meeting_id] = self._refs.get(meeting_id, 0) + 1
+        return buffer
+
+    async def release(self, meeting_id: str) -> None:
+        """Drop one reference; the last one flushes and removes the buffer."""
+        refs = self._refs.get(meeting_id, 0) - 1
+        if refs > 0:
+            self._refs[meeting_id] = refs
+            return
+        self._refs.pop(meeting_id, None)
+        buffer = self._buffers.pop(meeting_id, None)
+        if buffer is not None and not await buffer.flush():
+            # No retries for a buffer nobody holds any more
+            buffer._cancel_timer()
+            logger.error(f"Dropping {buffer.depth} unflushed transcript chunk(s) for meeting {meeting_id}")
+
+    async def flush_all(self) -> None:
+        for buffer in list(self._buffers.values()):
+            await buffer.flush()
+
+    def metrics(self) -> Dict[str, object]:
+        depths = {meeting_id: buffer.depth for meeting_id, buffer in self._buffers.items()}
+        return {
+            "active_buffers": len(depths),
+            "buffered_chunks": sum(depths.values()),
+            "max_buffer_depth": max(depths.values(), default=0),
+            **self.stats.as_dict(),
+        }
+
+
+transcript_buffers = TranscriptBufferRegistry()
@@ -0,0 +1,227 @@
+"""
+Transcript Handler Module
+
+Provides append-only storage for meeting transcripts. Each transcript chunk is
+stored as its own document in the transcripts collection, ordered by
+timestamp within a meeting, instead of growing an embedded array on the
+meeting document.
+
+Chunks are read in ``(timestamp, _id)`` order with keyset pagination (see
+``pagination.py``), so chunks sharing a timestamp are neither skipped nor
+repeated across pages. Chunk ids are ObjectId strings; ids made by one
+process increase, so chunks a meeting's buffer writes with the same timestamp
+keep their order. Ties between chunks from different processes are ordered
+arbitrarily, but the same way on every read.
+
+Meetings recorded before that still carry their transcript in the meeting's
+``transcript`` array. ``get_transcript`` pages through that array first and
+then the meeting's chunk documents, so old transcripts stay readable, along
+with anything appended since, without a migration.
+"""
+
+from typing import Optional, List, Tuple
+
+from bson import ObjectId
+from pymongo import AsyncMongoClient
+from pymongo.errors import BulkWriteError
+import os
+import logging
+
+from ..models.meeting import TranscriptChunk, TranscriptRecord
+from ..monitoring.metrics import instrument_handler
+from .mongo_client import mongo_registry
+from .pagination import decode_cursor, encode_cursor, fetch_page
+
+DEFAULT_TRANSCRIPT_LIMIT = 200
+MAX_TRANSCRIPT_LIMIT = 1000
+
+DUPLICATE_KEY_ERROR = 11000
+LEGACY_ID_PREFIX = "legacy-"
+
+
+def transcript_record(meeting_id: str, chunk: TranscriptChunk) -> TranscriptRecord:
+    """
+    The stored form of a chunk, with its id. Assign it once, when the chunk is
+    queued, so a retried insert writes the same ids and cannot duplicate chunks.
+    """
+    if isinstance(chunk, TranscriptRecord):
+        return chunk
+    # ObjectIds made by this process increase, so this buffer's chunks sharing a timestamp keep their order
+    return TranscriptRecord(_id=str(ObjectId()), meeting_id=meeting_id, **chunk.model_dump())
+
+
+@instrument_handler("transcripts")
+class TranscriptHandler:
+    """
+    Handler class for transcript chunk storage.
+    
+    Attributes:
+        logger: Logger instance for this handler
+        uri (str): MongoDB connection URI
+        db_name (str): Name of the MongoDB database
+        transcript_collection_name (str): Name of the transcripts collection
+        meeting_collection_name (str): Name of the meetings collection (legacy transcripts)
+        transcripts_collection: Collection reference for transcript chunks
+    
+    Raises:
+        ValueError: If required environment variables are not set
+    """
+    def __init__(self):
+        self.logger = logging.getLogger("TranscriptHandler")
+        self.uri = os.getenv("MONGO_URI")
+        self.db_name = os.getenv("MONGO_DB_NAME")
+        self.transcript_collection_name = os.getenv("TRANSCRIPT_COLLECTION_NAME", "transcripts")
+        self.meeting_collection_name = os.getenv("MEETING_COLLECTION_NAME", "meetings")
+
+        if self.uri is None or self.db_name is None:
+            self.logger.error("Configuration error: MONGO_URI or MONGO_DB_NAME not set.")
+            raise ValueError("Environment variables MONGO_URI and MONGO_DB_NAME must be set.")
+
+    @property
+    def client(self) -> AsyncMongoClient:
+        return mongo_registry.get_client(self.uri)
+
+    @property
+    def transcripts_collection(self):
+        return self.client[self.db_name][self.transcript_collection_name]
+
+    @property
+    def meetings_collection(self):
+        return self.client[self.db_name][self.meeting_collection_name]
+
+    async def append_chunks(self, meeting_id: str, chunks: List[TranscriptChunk]) -> bool:
+        """        
+        Append transcript chunks to a meeting.
+
+        Chunks that already carry an id (``transcript_record``) keep it, and
+        chunks found already stored under their id count as written, so a
+        batch can be retried after a partial insert or a timeout.
+        
+        Args:
+            meeting_id (str): The meeting the chunks belong to
+            chunks (List[TranscriptChunk]): Chunks in arrival order
+            
+        Returns:
+            bool: True if every chunk was stored, False otherwise
+        """
+        if not chunks:
+            return True
+        try:
+            records = [transcript_record(meeting_id, chunk) for chunk in chunks]
+            await self.transcripts_collection.insert_many(
+                [record.model_dump(by_alias=True) for record in records],
+                ordered=False,
+            )
+            self.logger.debug(f"Stored {len(records)} transcript chunk(s) for meeting {meeting_id}")
+            return True
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if errors and all(error.get("code") == DUPLICATE_KEY_ERROR for error in errors):
+                self.logger.debug(f"{len(errors)} transcript chunk(s) for meeting {meeting_id} were already stored")
+                return True
+            self.logger.error(f"Failed to store transcript for meeting {meeting_id}: {e}", exc_info=True)
+            return False
+        except Exception as e:
+            self.logger.error(f"Failed to store transcript for meeting {meeting_id}: {e}", exc_info=True)
+            return False
+
+    async def get_transcript(
+        self,
+        meeting_id: str,
+        since: Optional[float] = None,
+        limit: int = DEFAULT_TRANSCRIPT_LIMIT,
+        cursor: Optional[str] = None,
+    ) -> Optional[Tuple[List[TranscriptRecord], Optional[str]]]:
+        """        
+        Read a time range of a meeting's transcript, one keyset page at a time.
+        
+        Args:
+            meeting_id (str): The meeting to read
+            since (Optional[float]): Only return chunks with a timestamp strictly after this value
+            limit (int): Maximum number of chunks to return
+            cursor (Optional[str]): Opaque token returned as ``next`` by the previous page
+
+        A meeting's legacy embedded ``transcript`` array is read ahead of its
+        chunk documents; a cursor into the array continues there.
+            
+        Returns:
+            Optional[Tuple[List[TranscriptRecord], Optional[str]]]: Chunks in (timestamp, _id)
+            order and the next cursor (None on the last page), or None on database error
+
+        Raises:
+            ValueError: If the cursor is malformed
+            
+        Example:
+            >>> chunks, next_cursor = await handler.get_transcript("meeting-uuid-123", since=0, limit=100)
+            >>> more, next_cursor = await handler.get_transcript("meeting-uuid-123", since=0, limit=100, cursor=next_cursor)
+        """
+        try:
+            query = {"meeting_id": meeting_id}
+            if since is not None:
+                query["timestamp"] = {"$gt": since}
+            docs: List[dict] = []
+            if not cursor or decode_cursor(cursor)[1].startswith(LEGACY_ID_PREFIX):
+                docs, next_cursor = await self._legacy_page(meeting_id, since, limit, cursor)
+                if next_cursor is None and len(docs) == limit and await self._has_chunks(query):
+                    # The array ended exactly on this page; chunk documents follow
+                    next_cursor = encode_cursor(docs[-1]["timestamp"], docs[-1]["_id"])
+                # The chunk documents start from the beginning after the array
+                cursor = None
+            else:
+                next_cursor = None
+            if next_cursor is None and len(docs) < limit:
+                chunks, next_cursor = await fetch_page(
+                    self.transcripts_collection, "timestamp", limit - len(docs), cursor, query
+                )
+                docs.extend(chunks)
+            return [TranscriptRecord.model_validate(doc) for doc in docs], next_cursor
+        except ValueError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Failed to fetch transcript for meeting {meeting_id}: {e}", exc_info=True)
+            return None
+
+    async def _has_chunks(self, query: dict) -> bool:
+        return await self.transcripts_collection.find_one(query, {"_id": 1}) is not None
+
+    async def _legacy_chunks(self, meeting_id: str) -> List[dict]:
+        """The meeting's embedded ``transcript`` array as chunk documents, in (timestamp, position) order."""
+        meeting = await self.meetings_collection.find_one({"_id": meeting_id}, {"transcript": 1})
+        chunks = (meeting or {}).get("transcript") or []
+        docs = [
+            # Zero-padded so ids sort by position among chunks sharing a timestamp
+            {**chunk, "_id": f"{LEGACY_ID_PREFIX}{index:06d}", "meeting_id": meeting_id}
+            for index, chunk in enumerate(chunks)
+            if isinstance(chunk, dict) and chunk.get("timestamp") is not None
+        ]
+        docs.sort(key=lambda doc: (doc["timestamp"], doc["_id"]))
+        return docs
+
+    async def _legacy_page(
+        self, meeting_id: str, since: Optional[float], limit: int, cursor: Optional[str]
+    ) -> Tuple[List[dict], Optional[str]]:
+        """One page of the legacy array, with the same bounds and cursor as the collection."""
+        docs = await self._legacy_chunks(meeting_id)
+        if since is not None:
+            docs = [doc for doc in docs if doc["timestamp"] > since]
+        if cursor:
+            after = decode_cursor(cursor)
+            docs = [doc for doc in docs if (doc["timestamp"], doc["_id"]) > after]
+        if len(docs) <= limit:
+            return docs, None
+        docs = docs[:limit]
+        return docs, encode_cursor(docs[-1]["timestamp"], docs[-1]["_id"])
+
+    async def delete_transcript(self, meeting_id: str) -> int:
+        """        
+        Delete every transcript chunk of a meeting.
+        
+        Returns:
+            int: Number of chunks deleted (0 on error)
+        """
+        try:
+            result = await self.transcripts_collection.delete_many({"meeting_id": meeting_id})
+            return result.deleted_count
+        except Exception as e:
+            self.logger.error(f"Failed to delete transcript for meeting {meeting_id}: {e}", exc_info=True)
+            return 0
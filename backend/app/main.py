@@ -1,36 +1,59 @@
-from fastapi import FastAPI
-import uvicorn
-import asyncio
+from contextlib import asynccontextmanager
 
-from .pathway_pipeline.consumer import start_consumer
-from .config.configloader import load_config
-load_config(".env")
+from fastapi import FastAPI
 
+from .container import container
 from .routers.meetingRouter import router as meeting_router
 from .routers.applications_router import router as applications_router
 from .routers.startups_router import router as startups_router
 from .routers.streaming_router import router as streaming_router
-import os
+from .routers.admin_router import router as admin_router
+from .routers.views_router import router as views_router
+from .routers.metrics_router import router as metrics_router
+from .routers.health_router import router as health_router
+from .monitoring.http import RequestMetricsMiddleware
+from .monitoring.tracing import TracingMiddleware
 import logging
 
 logger = logging.getLogger(__name__)
-app = FastAPI()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Loads .env and starts the warm-up (Mongo, indexes, views + CDC, handlers) in the
+    # background; /health/ready turns 200 when it is done. Nothing runs at import time.
+    await container.startup(".env")
+
+    yield
+
+    await container.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+# Request latency per router and route template, served at /metrics
+app.add_middleware(RequestMetricsMiddleware)
+# Added last so it runs first: request ids and sampled traces cover the whole request
+app.add_middleware(TracingMiddleware)
 app.include_router(meeting_router, tags=["Meetings"])
 app.include_router(applications_router, tags=["Applications"])
 app.include_router(startups_router, tags=["Startups"])
 app.include_router(streaming_router, tags=["Streaming"])
+app.include_router(admin_router, tags=["Admin"])
+app.include_router(views_router, tags=["Views"])
+app.include_router(metrics_router, tags=["Metrics"])
+app.include_router(health_router, tags=["Health"])
 
 @app.get("/")
 async def read_root():
     logger.debug("Root endpoint hit.")
     return {"Hello": "World"}
 
-@app.on_event("startup")
-async def start_pathway_consumer():
-    loop = asyncio.get_event_loop()
-    loop.run_in_executor(None, start_consumer)
-
 if __name__ == "__main__":
+    import uvicorn
+    from .config.configloader import load_config
+
+    # Logging for the launcher itself; the lifespan loads the configuration again for the app
+    load_config(".env")
     host = "0.0.0.0"
     port = 8000
     logger.info(f"Starting FastAPI server on {host}:{port}")
@@ -88,3 +88,53 @@ class ApplicationUpdate(BaseModel):
     status: Optional[Literal["pending", "accepted", "rejected"]] = None
 
 
+
+
+# Server-side filters for /api/applications/query and /api/applications/stats
+class ApplicationFilter(BaseModel):
+    industry: Optional[str] = None
+    stage: Optional[str] = None
+    location: Optional[str] = None
+    dealLeadVCId: Optional[str] = None
+    status: Optional[Literal["pending", "accepted", "rejected"]] = None
+    createdFrom: Optional[datetime] = None  # inclusive, on createdAt
+    createdTo: Optional[datetime] = None  # exclusive, on createdAt
+
+    def to_match(self) -> Dict[str, Any]:
+        match: Dict[str, Any] = {}
+        for field in ("industry", "stage", "location", "dealLeadVCId", "status"):
+            value = getattr(self, field)
+            if value is not None:
+                match[field] = value
+        created: Dict[str, Any] = {}
+        if self.createdFrom is not None:
+            created["$gte"] = self.createdFrom
+        if self.createdTo is not None:
+            created["$lt"] = self.createdTo
+        if created:
+            match["createdAt"] = created
+        return match
+
+
+class ApplicationQuery(ApplicationFilter):
+    sortBy: Literal["createdAt", "updatedAt", "dateAdded", "companyName"] = "createdAt"
+    sortOrder: Literal["asc", "desc"] = "desc"
+    limit: int = Field(100, ge=1, le=1000)
+
+
+# Bulk endpoints: request bodies and per-item results
+class ApplicationBulkUpdateItem(BaseModel):
+    id: str
+    data: ApplicationUpdate
+
+
+class ApplicationBulkIds(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=1000)
+
+
+class BulkItemResult(BaseModel):
+    index: int  # position in the request array
+    id: Optional[str] = None
+    ok: bool
+    error: Optional[str] = None
+    startupId: Optional[str] = None  # set by bulk accept
@@ -9,13 +9,21 @@ class TranscriptChunk(BaseModel):
     text: str
 
 
+# transcript chunks live in their own collection, one document per chunk, keyed by meeting
+class TranscriptRecord(TranscriptChunk):
+    id: str = Field(alias="_id")
+    meeting_id: str
+
+    class Config:
+        validate_by_name = True
+
+
 class Meeting(BaseModel):
     id: str = Field(alias="_id")
     vc_id: str
     start_time: datetime
     end_time: Optional[datetime] = None
     status: str = "in_progress"  # in_progress | completed | canceled
-    transcript: List[TranscriptChunk] = []
     summary: Optional[str] = None
     vc_notes: Optional[str] = None
 
@@ -0,0 +1,52 @@
+from functools import lru_cache
+from typing import Optional, Tuple, Type, Dict, Any
+
+from pydantic import BaseModel, ConfigDict, Field, create_model
+
+
+# field selection → Mongo projection + slim response model (generalises MeetingMiniData)
+def parse_fields(model: Type[BaseModel], fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a comma-separated ``fields=`` query value into a sorted tuple of model field names.
+
+    ``id`` / ``_id`` is always returned and need not be listed. Returns None when no
+    selection was requested.
+
+    Raises:
+        ValueError: If a requested field does not exist on the model
+    """
+    if fields is None:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    requested.discard("id")
+    requested.discard("_id")
+    unknown = sorted(requested - set(model.model_fields))
+    if unknown:
+        raise ValueError(f"Unknown field(s) for {model.__name__}: {', '.join(unknown)}")
+    return tuple(sorted(requested))
+
+
+def build_projection(fields: Tuple[str, ...]) -> Dict[str, Any]:
+    projection = {name: 1 for name in fields}
+    projection["_id"] = 1
+    return projection
+
+
+@lru_cache(maxsize=128)
+def slim_model(model: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    Build (and cache) a response model holding only ``id`` and the selected fields.
+
+    Selected fields keep their annotation but default to None, so documents missing
+    an optional field still validate.
+    """
+    definitions = {
+        name: (Optional[model.model_fields[name].annotation], None)
+        for name in fields
+    }
+    return create_model(
+        f"{model.__name__}Slim",
+        __config__=ConfigDict(validate_by_name=True),
+        id=(str, Field(alias="_id")),
+        **definitions,
+    )
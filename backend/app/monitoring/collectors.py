@@ -0,0 +1,112 @@
+"""
+Scrape-time collectors.
+
+Turn the stats the streaming engine, the recording sink, the WebSocket send
+queues, the CDC consumer and the model cache already keep into metric families, so ``/metrics``
+reads them only when Prometheus scrapes. Registered by ``register_collectors``
+when the metrics router is imported.
+"""
+
+from typing import List
+
+from ..database.cache import model_caches
+from ..pathway_pipeline.consumer import cdc_broadcast, cdc_consumer
+from ..pathway_pipeline.pipeline import broadcast_handler
+from ..pathway_pipeline.workers import cdc_workers, dead_letters
+from ..streaming.ingestion import ingestion_engine
+from ..streaming.outbound import outbound_queues
+from ..streaming.recording import recording_sink
+from .metrics import CollectedMetric, metrics_registry
+
+
+def streaming_metrics() -> List[CollectedMetric]:
+    connections = CollectedMetric("stream_connections_total", "counter", "Streaming WebSocket connections opened", ("stream",))
+    active = CollectedMetric("stream_connections_active", "gauge", "Open streaming WebSocket connections", ("stream",))
+    received = CollectedMetric("stream_bytes_total", "counter", "Bytes received on streaming WebSockets", ("stream",))
+    chunks = CollectedMetric("stream_chunks_total", "counter", "Chunks received on streaming WebSockets", ("stream",))
+    processed = CollectedMetric("stream_chunks_processed_total", "counter", "Chunks run through the stream processors", ("stream",))
+    errors = CollectedMetric("stream_processor_errors_total", "counter", "Stream processor failures", ("stream",))
+    for stream, stats in ingestion_engine.stats.items():
+        connections.add(stats.connections, stream)
+        active.add(stats.active, stream)
+        received.add(stats.bytes, stream)
+        chunks.add(stats.chunks, stream)
+        processed.add(stats.processed_chunks, stream)
+        errors.add(stats.processor_errors, stream)
+    return [connections, active, received, chunks, processed, errors]
+
+
+def recording_metrics() -> List[CollectedMetric]:
+    stats = recording_sink.stats
+    return [
+        CollectedMetric("recording_failed_writes_total", "counter", "Recording writes that failed").add(stats.failed_writes),
+        CollectedMetric("recording_lost_bytes_total", "counter", "Recorded bytes lost to failed writes").add(stats.lost_bytes),
+    ]
+
+
+def websocket_metrics() -> List[CollectedMetric]:
+    active = CollectedMetric("websocket_connections_active", "gauge", "Open WebSocket connections by endpoint", ("endpoint",))
+    depth = CollectedMetric("websocket_send_queue_depth", "gauge", "Messages waiting in WebSocket send queues by endpoint", ("endpoint",))
+    counts = {}
+    depths = {}
+    for name, queue in outbound_queues.snapshot()["connections"].items():
+        endpoint = name.split(":", 1)[0]
+        counts[endpoint] = counts.get(endpoint, 0) + 1
+        depths[endpoint] = depths.get(endpoint, 0) + queue["depth"]
+    for endpoint in ("meeting", "streaming"):
+        active.add(counts.get(endpoint, 0), endpoint)
+        depth.add(depths.get(endpoint, 0), endpoint)
+    closed = outbound_queues.closed_totals()
+    dropped = CollectedMetric("websocket_messages_dropped_total", "counter", "Messages dropped by closed send queues")
+    disconnected = CollectedMetric("websocket_slow_consumer_disconnects_total", "counter", "Connections closed as slow consumers")
+    return [active, depth, dropped.add(closed["dropped"]), disconnected.add(closed["disconnected"])]
+
+
+def cdc_metrics() -> List[CollectedMetric]:
+    stats = cdc_consumer.stats
+    families = [
+        CollectedMetric("cdc_consumer_running", "gauge", "Whether the CDC consumer thread is alive").add(int(cdc_consumer.running)),
+        CollectedMetric("cdc_events_total", "counter", "CDC events processed and committed").add(stats.events),
+        CollectedMetric("cdc_batches_total", "counter", "CDC batches processed and committed").add(stats.batches),
+        CollectedMetric("cdc_failed_batches_total", "counter", "CDC batches rewound for a retry").add(stats.failed_batches),
+        CollectedMetric("cdc_consumer_errors_total", "counter", "CDC consumer reconnects after an error").add(stats.errors),
+        CollectedMetric("cdc_batch_processing_seconds_total", "counter", "Time spent processing CDC batches").add(stats.total_batch_ms / 1000),
+        CollectedMetric("cdc_last_poll_timestamp_seconds", "gauge", "Time of the last CDC poll").add(stats.last_poll_at),
+        CollectedMetric("cdc_last_commit_timestamp_seconds", "gauge", "Time of the last CDC offset commit").add(stats.last_commit_at),
+    ]
+    lag = CollectedMetric("cdc_consumer_lag", "gauge", "Records behind the end of each partition", ("topic", "partition"))
+    for name, value in list(stats.lag.items()):
+        topic, _, partition = name.rstrip("]").rpartition("[")
+        lag.add(value, topic, partition)
+    events = CollectedMetric("cdc_topic_events_total", "counter", "CDC events handed to the worker lanes by topic", ("topic",))
+    failures = CollectedMetric("cdc_topic_lane_failures_total", "counter", "Worker lanes that failed by topic", ("topic",))
+    for topic, topic_stats in list(cdc_workers.stats.items()):
+        events.add(topic_stats.events, topic)
+        failures.add(topic_stats.failures, topic)
+    families += [
+        lag,
+        events,
+        failures,
+        CollectedMetric("cdc_event_retries_total", "counter", "CDC event retries").add(dead_letters.retries),
+        CollectedMetric("cdc_dead_letters_total", "counter", "CDC events written to the dead-letter file").add(dead_letters.store.written),
+        CollectedMetric("cdc_broadcast_running", "gauge", "Whether this worker's broadcast consumer thread is alive").add(int(cdc_broadcast.running)),
+        CollectedMetric("cdc_broadcast_events_total", "counter", "CDC events applied to this worker's cache and views by the broadcast consumer").add(broadcast_handler.applied),
+        CollectedMetric("cdc_broadcast_skipped_total", "counter", "CDC events the broadcast consumer could not apply").add(broadcast_handler.skipped),
+    ]
+    return families
+
+
+def cache_metrics() -> List[CollectedMetric]:
+    names = ("hits", "misses", "evictions", "expirations", "invalidations")
+    families = {name: CollectedMetric(f"model_cache_{name}_total", "counter", f"Model cache {name} by collection", ("collection",)) for name in names}
+    entries = CollectedMetric("model_cache_entries", "gauge", "Models held in the cache by collection", ("collection",))
+    for collection, stats in model_caches.metrics()["collections"].items():
+        for name in names:
+            families[name].add(stats[name], collection)
+        entries.add(stats["entries"], collection)
+    return [*families.values(), entries]
+
+
+def register_collectors() -> None:
+    for collector in (streaming_metrics, recording_metrics, websocket_metrics, cdc_metrics, cache_metrics):
+        metrics_registry.register_collector(collector)
@@ -0,0 +1,149 @@
+"""
+Readiness probes.
+
+``GET /health/ready`` asks the ``HealthChecker`` whether this worker should
+receive traffic. Each probe checks one dependency:
+
+    mongo             ``ping`` on the shared client
+    cdc_consumer      the consumer thread is alive and has polled recently
+                      (a thread still connecting counts from when it started)
+    session_registry  the streaming session store answers, and holds no more
+                      than ``HEALTH_MAX_SESSIONS`` sessions when that is set
+
+Results are cached for ``HEALTH_CACHE_TTL_MS`` and concurrent requests share
+one in-flight check, so load balancers polling every worker do not add load to
+the database. Only the probes listed in ``HEALTH_READY_PROBES`` decide
+readiness; the others are still run and reported.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..database.mongo_client import mongo_registry
+from ..pathway_pipeline.consumer import cdc_consumer
+from ..streaming.sessions import session_registry
+
+logger = logging.getLogger(__name__)
+
+PROBES = ("mongo", "cdc_consumer", "session_registry")
+
+
+class HealthSettings:
+    def __init__(self):
+        self.cache_ttl = max(0.0, float(os.getenv("HEALTH_CACHE_TTL_MS", "2000"))) / 1000
+        self.probe_timeout = max(0.001, float(os.getenv("HEALTH_PROBE_TIMEOUT_MS", "1000")) / 1000)
+        self.cdc_stale_after = max(1.0, float(os.getenv("HEALTH_CDC_STALE_S", "60")))
+        self.max_sessions = max(0, int(os.getenv("HEALTH_MAX_SESSIONS", "0")))
+        names = os.getenv("HEALTH_READY_PROBES", ",".join(PROBES))
+        self.required = tuple(name.strip() for name in names.split(",") if name.strip())
+
+
+class ProbeFailed(Exception):
+    """Raised by a probe when the dependency answered but is not healthy."""
+
+
+class HealthChecker:
+    def __init__(self, settings: Optional[HealthSettings] = None):
+        self._settings = settings
+        self._probes: Dict[str, Callable[[], Awaitable[Dict[str, Any]]]] = {
+            "mongo": self._probe_mongo,
+            "cdc_consumer": self._probe_cdc_consumer,
+            "session_registry": self._probe_session_registry,
+        }
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._inflight: Optional[asyncio.Future] = None
+        self._failed: tuple = ()
+        self.checks = 0
+
+    @property
+    def settings(self) -> HealthSettings:
+        if self._settings is None:
+            self._settings = HealthSettings()
+        return self._settings
+
+    async def _probe_mongo(self) -> Dict[str, Any]:
+        await mongo_registry.get_database().command("ping")
+        return {}
+
+    async def _probe_cdc_consumer(self) -> Dict[str, Any]:
+        stats = cdc_consumer.stats
+        if not cdc_consumer.running:
+            raise ProbeFailed("consumer thread is not running")
+        heartbeat = stats.last_poll_at or stats.started_at or 0.0
+        age = time.time() - heartbeat
+        detail = {"last_poll_at": stats.last_poll_at, "heartbeat_age_s": round(age, 3)}
+        if age > self.settings.cdc_stale_after:
+            raise ProbeFailed(f"no poll for {age:.0f}s (limit {self.settings.cdc_stale_after:.0f}s)", detail)
+        return detail
+
+    async def _probe_session_registry(self) -> Dict[str, Any]:
+        metrics = await session_registry.metrics()
+        limit = self.settings.max_sessions
+        detail = {"sessions": metrics["sessions"], "backend": metrics["backend"]}
+        if limit and metrics["sessions"] > limit:
+            raise ProbeFailed(f"{metrics['sessions']} sessions (limit {limit})", detail)
+        return detail
+
+    async def _run_probe(self, name: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        result: Dict[str, Any] = {"required": name in self.settings.required}
+        try:
+            detail = await asyncio.wait_for(self._probes[name](), self.settings.probe_timeout)
+            result["ok"] = True
+        except asyncio.TimeoutError:
+            result["ok"] = False
+            result["error"] = f"timed out after {self.settings.probe_timeout * 1000:.0f} ms"
+            detail = {}
+        except ProbeFailed as e:
+            result["ok"] = False
+            result["error"] = str(e.args[0])
+            detail = e.args[1] if len(e.args) > 1 else {}
+        except Exception as e:
+            result["ok"] = False
+            result["error"] = f"{type(e).__name__}: {e}"
+            detail = {}
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        result.update(detail)
+        return result
+
+    async def _check(self) -> Dict[str, Any]:
+        results = await asyncio.gather(*(self._run_probe(name) for name in self._probes))
+        probes = dict(zip(self._probes, results))
+        ready = all(probe["ok"] for probe in probes.values() if probe["required"])
+        failed = tuple(name for name, probe in probes.items() if not probe["ok"])
+        # Log transitions only; load balancers poll every few seconds
+        if failed != self._failed:
+            if failed:
+                reasons = ", ".join(name + " (" + probes[name]["error"] + ")" for name in failed)
+                logger.warning(f"Readiness probes failing: {reasons}")
+            else:
+                logger.info("Readiness probes recovered")
+            self._failed = failed
+        self.checks += 1
+        return {"ready": ready, "checked_at": time.time(), "probes": probes}
+
+    async def check(self) -> Dict[str, Any]:
+        """Probe results, at most ``HEALTH_CACHE_TTL_MS`` old; adds ``cached`` to say which."""
+        now = time.monotonic()
+        if self._result is not None and now - self._checked_at < self.settings.cache_ttl:
+            return {**self._result, "cached": True}
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._check())
+            inflight = self._inflight
+            try:
+                self._result = await asyncio.shield(inflight)
+                self._checked_at = time.monotonic()
+            finally:
+                if self._inflight is inflight:
+                    self._inflight = None
+            return {**self._result, "cached": False}
+        # Another request is already probing; share its result
+        result = await asyncio.shield(self._inflight)
+        return {**result, "cached": True}
+
+
+health_checker = HealthChecker()
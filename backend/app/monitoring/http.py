@@ -0,0 +1,60 @@
+"""
+Request latency middleware.
+
+Observes ``http_request_duration_seconds{router, method, route, status}`` for
+every HTTP request. ``router`` is the tag the router was included with
+(``Meetings``, ``Applications``, ...) and ``route`` the path template, so ids in
+the URL do not create new series; unmatched paths are grouped as
+``unmatched``. WebSockets are counted by the streaming and outbound queue
+collectors instead (see ``collectors.py``).
+
+Written as a plain ASGI middleware so streamed responses are not buffered.
+"""
+
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .metrics import metrics_registry
+
+http_request_seconds = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by router and route template",
+    ("router", "method", "route", "status"),
+)
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self._routes: Optional[Dict[Callable, Tuple[str, str]]] = None
+
+    def _route_of(self, scope: Dict[str, Any]) -> Tuple[str, str]:
+        # The router stores the matched endpoint in the scope; map it back to its route once
+        if self._routes is None:
+            self._routes = {}
+            for route in getattr(scope.get("app"), "routes", ()):
+                endpoint = getattr(route, "endpoint", None)
+                if endpoint is not None:
+                    tags = getattr(route, "tags", None) or ["root"]
+                    self._routes[endpoint] = (str(tags[0]), route.path)
+        return self._routes.get(scope.get("endpoint"), ("none", "unmatched"))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not metrics_registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            router, route = self._route_of(scope)
+            http_request_seconds.observe(time.perf_counter() - started, router, scope["method"], route, status_code)
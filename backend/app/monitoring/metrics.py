@@ -0,0 +1,313 @@
+"""
+Metrics Registry
+
+In-process counters, gauges and histograms, rendered in the Prometheus text
+format at ``GET /metrics``. There are two ways in:
+
+    push     - ``Counter`` / ``Gauge`` / ``Histogram`` updated where things
+               happen (request latency, Mongo operation timings)
+    collect  - functions registered with ``register_collector`` that turn the
+               stats the components already keep (streaming, CDC consumer,
+               model cache) into samples at scrape time, so hot paths are not
+               touched twice
+
+Metrics are per worker process; Prometheus aggregates across workers by the
+``instance`` it scrapes. ``METRICS_ENABLED=false`` turns off the request
+middleware, handler timings and the endpoint.
+"""
+
+import functools
+import inspect
+import logging
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Prometheus client defaults, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+class MetricsSettings:
+    def __init__(self):
+        self.enabled = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _check(self, labelvalues: Sequence[Any]) -> LabelValues:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {len(labelvalues)} value(s)")
+        return tuple(str(value) for value in labelvalues)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, *labelvalues: Any) -> None:
+        key = self._check(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labelvalues: Any) -> float:
+        return self._values.get(self._check(labelvalues), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in values]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, *labelvalues: Any) -> None:
+        key = self._check(labelvalues)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1.0, *labelvalues: Any) -> None:
+        self.inc(-amount, *labelvalues)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[LabelValues, List[Any]] = {}
+
+    def observe(self, value: float, *labelvalues: Any) -> None:
+        key = self._check(labelvalues)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *labelvalues: Any) -> int:
+        series = self._series.get(self._check(labelvalues))
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = [(key, list(counts), total) for key, (counts, total) in self._series.items()]
+        lines: List[str] = []
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class CollectedMetric:
+    """A metric family produced by a collector at scrape time."""
+    __slots__ = ("name", "kind", "help", "labelnames", "samples")
+
+    def __init__(self, name: str, kind: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.samples: List[Tuple[LabelValues, float]] = []
+
+    def add(self, value: Optional[float], *labelvalues: Any) -> "CollectedMetric":
+        if value is not None:
+            self.samples.append((tuple(str(v) for v in labelvalues), value))
+        return self
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in self.samples)
+        return lines
+
+
+Collector = Callable[[], Iterable[CollectedMetric]]
+
+
+class MetricsRegistry:
+    def __init__(self, settings: Optional[MetricsSettings] = None):
+        self._settings = settings
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+
+    @property
+    def settings(self) -> MetricsSettings:
+        if self._settings is None:
+            self._settings = MetricsSettings()
+        return self._settings
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.enabled
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help, labelnames, buckets)
+
+    def register_collector(self, collector: Collector) -> Collector:
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+        return collector
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        for collector in collectors:
+            try:
+                for family in collector():
+                    lines.extend(family.render())
+            except Exception as e:
+                logger.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+mongo_operation_seconds = metrics_registry.histogram(
+    "mongo_operation_duration_seconds",
+    "Time spent in database handler methods",
+    ("handler", "operation"),
+)
+mongo_operation_errors = metrics_registry.counter(
+    "mongo_operation_errors_total",
+    "Database handler methods that raised",
+    ("handler", "operation"),
+)
+
+
+def _timed_coroutine(handler: str, name: str, method):
+    span_name = f"{handler}.{name}"
+
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        with span(span_name):
+            if not metrics_registry.enabled:
+                return await method(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            except Exception:
+                # Not BaseException: a cancelled request is not a database error
+                mongo_operation_errors.inc(1, handler, name)
+                raise
+            finally:
+                mongo_operation_seconds.observe(time.perf_counter() - started, handler, name)
+    return wrapper
+
+
+def _timed_async_generator(handler: str, name: str, method):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        if not metrics_registry.enabled:
+            async for item in method(*args, **kwargs):
+                yield item
+            return
+        # Measures the whole iteration, including the time the consumer spends between items
+        started = time.perf_counter()
+        try:
+            async for item in method(*args, **kwargs):
+                yield item
+        except Exception:
+            # GeneratorExit (the consumer stopped early) and CancelledError pass through uncounted
+            mongo_operation_errors.inc(1, handler, name)
+            raise
+        finally:
+            mongo_operation_seconds.observe(time.perf_counter() - started, handler, name)
+    return wrapper
+
+
+def instrument_handler(handler: str):
+    """
+    Class decorator timing every public async method of a database handler
+    into ``mongo_operation_duration_seconds{handler, operation}``, and as a
+    ``<handler>.<method>`` span of sampled request traces (coroutines only).
+    """
+    def decorate(cls):
+        for name, member in list(vars(cls).items()):
+            if name.startswith("_"):
+                continue
+            if inspect.iscoroutinefunction(member):
+                setattr(cls, name, _timed_coroutine(handler, name, member))
+            elif inspect.isasyncgenfunction(member):
+                setattr(cls, name, _timed_async_generator(handler, name, member))
+        return cls
+    return decorate
@@ -0,0 +1,293 @@
+"""
+Request Tracing
+
+Gives every HTTP request an id and, for a sampled share of them, records a
+trace of where the time went:
+
+    request.parse       body parsing, dependencies and request validation
+    endpoint            the route function
+    <handler>.<method>  database handler methods (see ``instrument_handler``)
+    mongo.<command>     every MongoDB command, timed by the driver
+    response.encode     response model validation and JSON encoding
+
+plus any ``span(...)`` opened in the code (e.g. the accept transaction and its
+non-transactional fallback). Each trace also carries the total request time
+as seen by the middleware. Finished traces go to the exporter:
+
+    TRACE_EXPORTER     console (one JSON line on the ``app.tracing`` logger),
+                       file (JSONL at ``TRACE_FILE``) or none
+    TRACE_SAMPLE_RATE  share of requests traced, 0.0 - 1.0 (default 0.01)
+
+The request id is taken from an incoming ``X-Request-ID`` header or generated,
+and returned as ``X-Request-ID`` on every response, sampled or not. Sending
+``X-Trace: 1`` forces a request to be traced. When a request is not sampled,
+``span`` only reads a context variable, so tracing is cheap to leave on.
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from fastapi.routing import APIRoute
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+trace_logger = logging.getLogger("app.tracing")
+
+REQUEST_ID_HEADER = b"x-request-id"
+FORCE_TRACE_HEADER = b"x-trace"
+
+
+class TracingSettings:
+    def __init__(self):
+        self.exporter = os.getenv("TRACE_EXPORTER", "console").lower()
+        self.sample_rate = min(1.0, max(0.0, float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))))
+        self.file = os.getenv("TRACE_FILE", "traces.jsonl")
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter in ("console", "file")
+
+
+class Trace:
+    """Spans of one sampled request; times are milliseconds from the start of the request."""
+    __slots__ = ("request_id", "started", "spans", "mark", "_ids")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self.mark: Optional[float] = None
+        self._ids = 0
+
+    def offset(self, moment: float) -> float:
+        return round((moment - self.started) * 1000, 3)
+
+    def next_id(self) -> int:
+        self._ids += 1
+        return self._ids
+
+    def add(self, name: str, started: float, ended: float, parent: Optional[int], **attributes: Any) -> int:
+        span_id = self.next_id()
+        span = {"id": span_id, "parent": parent, "name": name, "start_ms": self.offset(started), "duration_ms": round((ended - started) * 1000, 3)}
+        if attributes:
+            span["attributes"] = attributes
+        self.spans.append(span)
+        return span_id
+
+
+_request_id: contextvars.ContextVar = contextvars.ContextVar("request_id", default=None)
+_trace: contextvars.ContextVar = contextvars.ContextVar("trace", default=None)
+_parent: contextvars.ContextVar = contextvars.ContextVar("trace_parent", default=None)
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any):
+    """Time the block as a child of the current span when the request is sampled."""
+    trace = _trace.get()
+    if trace is None:
+        yield
+        return
+    span_id = trace.next_id()
+    token = _parent.set(span_id)
+    started = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        ended = time.perf_counter()
+        _parent.reset(token)
+        record = {"id": span_id, "parent": _parent.get(), "name": name, "start_ms": trace.offset(started), "duration_ms": round((ended - started) * 1000, 3)}
+        if attributes or error:
+            record["attributes"] = {**attributes, **({"error": error} if error else {})}
+        trace.spans.append(record)
+
+
+class MongoCommandTracer(monitoring.CommandListener):
+    """Records every MongoDB command of a sampled request as a ``mongo.<command>`` span."""
+    def __init__(self):
+        self._pending: Dict[int, Any] = {}
+
+    def started(self, event) -> None:
+        trace = _trace.get()
+        if trace is None:
+            return
+        collection = event.command.get(event.command_name)
+        self._pending[event.request_id] = (trace, _parent.get(), time.perf_counter(), collection if isinstance(collection, str) else None)
+
+    def _finish(self, event, failure: Optional[str] = None) -> None:
+        pending = self._pending.pop(event.request_id, None)
+        if pending is None:
+            return
+        trace, parent, started, collection = pending
+        attributes = {"collection": collection} if collection else {}
+        if failure:
+            attributes["error"] = failure
+        trace.add(f"mongo.{event.command_name}", started, started + event.duration_micros / 1e6, parent, **attributes)
+
+    def succeeded(self, event) -> None:
+        self._finish(event)
+
+    def failed(self, event) -> None:
+        self._finish(event, str(event.failure.get("errmsg", "failed")) if isinstance(event.failure, dict) else "failed")
+
+
+class TraceExporter:
+    def __init__(self, settings: TracingSettings):
+        self.settings = settings
+        self._lock = threading.Lock()
+        self._file = None
+        self.exported = 0
+
+    def export(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, default=str)
+        if self.settings.exporter == "file":
+            with self._lock:
+                if self._file is None:
+                    self._file = open(self.settings.file, "a", encoding="utf-8")
+                self._file.write(line + "\n")
+                self._file.flush()
+        else:
+            trace_logger.info(line)
+        self.exported += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class Tracer:
+    def __init__(self, settings: Optional[TracingSettings] = None):
+        self._settings = settings
+        self._exporter: Optional[TraceExporter] = None
+        self.mongo_listener = MongoCommandTracer()
+
+    @property
+    def settings(self) -> TracingSettings:
+        if self._settings is None:
+            self._settings = TracingSettings()
+        return self._settings
+
+    @property
+    def exporter(self) -> TraceExporter:
+        if self._exporter is None:
+            self._exporter = TraceExporter(self.settings)
+        return self._exporter
+
+    def sampled(self, forced: bool) -> bool:
+        settings = self.settings
+        return settings.enabled and (forced or random.random() < settings.sample_rate)
+
+    def close(self) -> None:
+        if self._exporter is not None:
+            self._exporter.close()
+
+
+tracer = Tracer()
+
+
+class TracingMiddleware:
+    """Assigns request ids, opens the trace of sampled requests and exports it at the end."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or ())
+        request_id = headers.get(REQUEST_ID_HEADER, b"").decode("latin-1")[:128] or uuid.uuid4().hex
+        id_token = _request_id.set(request_id)
+        trace = Trace(request_id) if tracer.sampled(headers.get(FORCE_TRACE_HEADER) == b"1") else None
+        trace_token = _trace.set(trace)
+        status_code = 500
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", []), (REQUEST_ID_HEADER, request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            _trace.reset(trace_token)
+            _request_id.reset(id_token)
+            if trace is not None:
+                ended = time.perf_counter()
+                route = scope.get("route")
+                try:
+                    tracer.exporter.export({
+                        "request_id": request_id,
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "route": getattr(route, "path", None),
+                        "status": status_code,
+                        "duration_ms": round((ended - trace.started) * 1000, 3),
+                        "spans": sorted(trace.spans, key=lambda s: s["start_ms"]),
+                    })
+                except Exception as e:
+                    logger.warning(f"Could not export trace {request_id}: {e}")
+
+
+class TracedRoute(APIRoute):
+    """
+    Route class that splits a sampled request into request parsing, the endpoint
+    and response encoding. Used as ``APIRouter(route_class=TracedRoute)``.
+    """
+    def get_route_handler(self):
+        endpoint = self.dependant.call
+        # Only coroutine endpoints are wrapped; a sync one must keep running in the threadpool
+        if inspect.iscoroutinefunction(endpoint) and not getattr(endpoint, "_traced", False):
+            @functools.wraps(endpoint)
+            async def traced_endpoint(*args, **kwargs):
+                trace = _trace.get()
+                if trace is None:
+                    return await endpoint(*args, **kwargs)
+                parse_started, trace.mark = trace.mark, None
+                if parse_started is not None:
+                    trace.add("request.parse", parse_started, time.perf_counter(), _parent.get())
+                try:
+                    with span("endpoint", function=self.name):
+                        return await endpoint(*args, **kwargs)
+                finally:
+                    trace.mark = time.perf_counter()
+
+            traced_endpoint._traced = True
+            self.dependant.call = traced_endpoint
+        handler = super().get_route_handler()
+        route = self
+
+        async def traced_handler(request):
+            trace = _trace.get()
+            if trace is None:
+                return await handler(request)
+            request.scope["route"] = route
+            trace.mark = time.perf_counter()
+            response = await handler(request)
+            if trace.mark is not None:
+                trace.add("response.encode", trace.mark, time.perf_counter(), _parent.get())
+                trace.mark = None
+            return response
+
+        return traced_handler
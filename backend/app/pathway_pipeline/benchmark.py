@@ -0,0 +1,263 @@
+"""
+Offline pipeline benchmark.
+
+Drives Debezium-format change events for applications, meetings and startups
+through the pipeline without Kafka and prints throughput, per-event latency and
+peak memory as JSON. Events are generated from a seed (or loaded from JSONL
+files in the replay format), so two runs with the same arguments process the
+same events; save a run with ``--output`` and check a change against it with
+``--compare``.
+
+Modes:
+    inline  - ``process_record`` called event by event on one thread
+    lanes   - batches through a ``KeyedWorkerPool``, as the live consumer does
+
+Each repeat starts from empty views and caches. Throughput and latency come
+from untraced runs; peak memory from one extra run under ``tracemalloc``.
+
+Usage:
+    python -m app.pathway_pipeline.benchmark --events 50000 --seed 7
+    python -m app.pathway_pipeline.benchmark --mode lanes --output baseline.json
+    python -m app.pathway_pipeline.benchmark --mode lanes --compare baseline.json
+    python -m app.pathway_pipeline.benchmark --file events.jsonl --topic fullCRM.Pathway.applications
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from ..database.cache import model_caches
+from .memory_broker import BrokerRecord
+from .pipeline import process_record
+from .replay import load_records
+from .views import APPLICATIONS_TOPIC, MEETINGS_TOPIC, STARTUPS_TOPIC, materialized_views
+from .workers import KeyedWorkerPool, WorkerPoolSettings
+
+STATUSES = ("pending", "accepted", "rejected")
+STAGES = ("pre-seed", "seed", "series-a", "series-b")
+INDUSTRIES = ("fintech", "health", "climate", "ai", "consumer")
+TOPIC_WEIGHTS = ((APPLICATIONS_TOPIC, 0.6), (MEETINGS_TOPIC, 0.3), (STARTUPS_TOPIC, 0.1))
+
+
+def _document(topic: str, doc_id: str, rng: random.Random, moment: datetime) -> Dict[str, Any]:
+    if topic == APPLICATIONS_TOPIC:
+        return {
+            "_id": doc_id,
+            "companyName": f"Company {doc_id}",
+            "status": "pending",
+            "stage": rng.choice(STAGES),
+            "industry": rng.choice(INDUSTRIES),
+            "createdAt": {"$date": int(moment.timestamp() * 1000)},
+            "updatedAt": {"$date": int(moment.timestamp() * 1000)},
+        }
+    if topic == MEETINGS_TOPIC:
+        return {
+            "_id": doc_id,
+            "vc_id": f"vc-{rng.randrange(50)}",
+            "status": "scheduled",
+            "start_time": {"$date": int(moment.timestamp() * 1000)},
+        }
+    return {"_id": doc_id, "applicationId": f"app-{doc_id}", "companyName": f"Startup {doc_id}"}
+
+
+def generate_records(count: int, seed: int = 0, documents: int = 1000) -> List[BrokerRecord]:
+    """
+    ``count`` events over roughly ``documents`` documents, as the Debezium MongoDB
+    connector emits them: JSON-string documents, ``{"id": ...}`` keys, creates
+    first, then a mix of full updates, patch updates and deletes.
+    """
+    rng = random.Random(seed)
+    topics = [topic for topic, _ in TOPIC_WEIGHTS]
+    weights = [weight for _, weight in TOPIC_WEIGHTS]
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    live: Dict[str, Dict[str, Dict[str, Any]]] = {topic: {} for topic in topics}
+    created = 0
+    records: List[BrokerRecord] = []
+    for offset in range(count):
+        topic = rng.choices(topics, weights)[0]
+        docs = live[topic]
+        moment = start + timedelta(seconds=offset)
+        roll = rng.random()
+        if not docs or (roll < 0.3 and created < documents):
+            created += 1
+            doc_id = f"{topic.rsplit('.', 1)[-1][:3]}-{created}"
+            doc = docs[doc_id] = _document(topic, doc_id, rng, moment)
+            value = {"op": "c", "after": json.dumps(doc), "ts_ms": int(moment.timestamp() * 1000)}
+        else:
+            doc_id = rng.choice(list(docs))
+            doc = docs[doc_id]
+            if roll > 0.97:
+                del docs[doc_id]
+                value = {"op": "d", "before": None, "filter": json.dumps({"_id": doc_id})}
+            elif topic == APPLICATIONS_TOPIC and roll > 0.6:
+                # status change delivered as a patch, without the full document
+                doc["status"] = rng.choice(STATUSES)
+                value = {"op": "u", "patch": json.dumps({"$set": {"status": doc["status"]}}), "filter": json.dumps({"_id": doc_id})}
+            else:
+                if topic == MEETINGS_TOPIC:
+                    doc["status"] = rng.choice(("scheduled", "live", "ended"))
+                else:
+                    doc["companyName"] = f"{doc['companyName'].split(' v')[0]} v{offset}"
+                value = {"op": "u", "after": json.dumps(doc)}
+            value["ts_ms"] = int(moment.timestamp() * 1000)
+        key = json.dumps({"id": json.dumps(doc_id)})
+        records.append(BrokerRecord(topic, 0, offset, int(moment.timestamp() * 1000), key, {"payload": value}))
+    return records
+
+
+def _reset() -> None:
+    materialized_views.reset()
+    model_caches.clear()
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, int(len(sorted_values) * fraction) - 1))]
+
+
+def run_once(records: List[Any], mode: str, batch_size: int, lanes: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+
+    def timed(record: Any) -> None:
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            process_record(record)
+        except Exception:
+            errors += 1
+        finally:
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    _reset()
+    started = time.perf_counter()
+    if mode == "inline":
+        for record in records:
+            timed(record)
+    else:
+        settings = WorkerPoolSettings()
+        settings.default_concurrency, settings.topic_concurrency = lanes, {}
+        pool = KeyedWorkerPool(handler=timed, settings=settings)
+        try:
+            for start in range(0, len(records), batch_size):
+                pool.process_batch(records[start:start + batch_size])
+        finally:
+            pool.shutdown()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "seconds": elapsed,
+        "events_per_sec": len(records) / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) if latencies else 0.0,
+        "p99_ms": _percentile(latencies, 0.99),
+        "max_ms": latencies[-1] if latencies else 0.0,
+        "errors": errors,
+    }
+
+
+def peak_memory(records: List[Any], mode: str, batch_size: int, lanes: int) -> int:
+    """Peak bytes allocated while processing ``records`` (traced, so much slower than ``run_once``)."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        run_once(records, mode, batch_size, lanes)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(records: List[Any], mode: str = "inline", batch_size: int = 500, lanes: int = 2, repeat: int = 3, warmup: int = 1, memory: bool = True) -> Dict[str, Any]:
+    for _ in range(warmup):
+        run_once(records, mode, batch_size, lanes)
+    runs = [run_once(records, mode, batch_size, lanes) for _ in range(max(1, repeat))]
+    result = {
+        "mode": mode,
+        "events": len(records),
+        "repeat": len(runs),
+        "events_per_sec": round(statistics.median(r["events_per_sec"] for r in runs), 1),
+        "events_per_sec_min": round(min(r["events_per_sec"] for r in runs), 1),
+        "p50_ms": round(statistics.median(r["p50_ms"] for r in runs), 4),
+        "p99_ms": round(statistics.median(r["p99_ms"] for r in runs), 4),
+        "max_ms": round(max(r["max_ms"] for r in runs), 4),
+        "errors": runs[-1]["errors"],
+        # Final view sizes; identical across runs of the same events
+        "views": {name: value for name, value in materialized_views.metrics().items() if name != "last_event_at"},
+    }
+    if mode == "lanes":
+        result.update(batch_size=batch_size, lanes=lanes)
+    if memory:
+        result["peak_memory_bytes"] = peak_memory(records, mode, batch_size, lanes)
+    return result
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> Dict[str, Any]:
+    """Relative change per metric; ``regressed`` when any metric is worse by more than ``tolerance``."""
+    checks = {"events_per_sec": 1, "p50_ms": -1, "p99_ms": -1, "peak_memory_bytes": -1}  # 1: higher is better
+    changes: Dict[str, Optional[float]] = {}
+    regressed = []
+    for name, direction in checks.items():
+        old, new = baseline.get(name), result.get(name)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        changes[name] = round(change, 4)
+        if change * direction < -tolerance:
+            regressed.append(name)
+    return {"baseline": {name: baseline.get(name) for name in changes}, "change": changes, "regressed": regressed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline benchmark for the CDC pipeline")
+    parser.add_argument("--events", type=int, default=20000, help="events to generate")
+    parser.add_argument("--documents", type=int, default=2000, help="distinct documents to spread the events over")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--file", action="append", default=[], help="JSONL events to load instead of generating (repeatable)")
+    parser.add_argument("--topic", default=None, help="topic for bare events in --file")
+    parser.add_argument("--mode", choices=("inline", "lanes"), default="inline")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--lanes", type=int, default=2, help="lanes per topic in lanes mode")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--output", default=None, help="write the result to this file")
+    parser.add_argument("--compare", default=None, help="baseline result to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression for --compare")
+    args = parser.parse_args()
+    # Per-event INFO logging would dominate the measurement
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING"))
+    logging.getLogger("app.pathway_pipeline").setLevel(logging.WARNING)
+
+    if args.file:
+        records = list(load_records(args.file, args.topic))
+        source = {"files": args.file}
+    else:
+        records = generate_records(args.events, args.seed, args.documents)
+        source = {"seed": args.seed, "documents": args.documents}
+
+    result = run(records, args.mode, max(1, args.batch_size), max(1, args.lanes), args.repeat, max(0, args.warmup), not args.no_memory)
+    result.update(source=source, python=platform.python_version())
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            result["comparison"] = compare(result, json.load(f), args.tolerance)
+        exit_code = 1 if result["comparison"]["regressed"] else 0
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    print(json.dumps(result, indent=2))
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
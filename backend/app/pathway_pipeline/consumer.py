@@ -1,21 +1,334 @@
-import os
+"""
+CDC Consumer
+
+Reads the Debezium topics in batches and hands each batch to the pipeline
+through the keyed worker pool (see ``workers.py``).
+Offsets are committed only after a batch has been processed, so a crash or
+restart redelivers the unfinished batch (at-least-once). Failing events are
+retried and dead-lettered per record (see ``dead_letter.py``); a batch that
+still fails is rewound to its first offset and retried after
+``CDC_RETRY_BACKOFF_MS``. If the Kafka connection itself fails, the loop
+reconnects after the same backoff instead of ending the thread.
+
+The consumer runs on its own thread, started and stopped from the FastAPI
+lifespan; the Kafka connection is only opened once that thread starts.
+
+All workers share one consumer group (``KAFKA_GROUP_ID``, default
+``fastapi-pathway``), so each event is processed and dead-lettered once across
+the fleet, and a restarted worker resumes from the committed offsets.
+
+The dashboard views and the model cache live in each worker's memory, so every
+worker also runs a broadcast consumer (``cdc_broadcast``, on unless
+``CDC_BROADCAST_ENABLED=false``). It joins no group: it is assigned every
+partition, starts at the end of the log (the views were just seeded) and only
+applies events to the local cache and views, without commits or dead letters.
+While it runs it is the only writer of that state: the group consumer then
+uses ``pipeline.check_record`` and only parses, commits and dead-letters. The
+group consumer lags behind and retries with backoff, so letting both apply
+events could apply an older snapshot after a newer one and roll a view back.
+
+Both consumers also read ``CDC_REPLAY_TOPIC`` (default
+``fullCRM.Pathway.replay``), where ``python -m app.pathway_pipeline.replay
+--kafka`` publishes re-fed events as ``{"topic", "key", "value"}`` envelopes
+instead of writing into the Debezium-owned topics. ``unwrap_replay`` turns
+each envelope back into a record of its original topic before the batch is
+handled.
+"""
+
 import json
-from kafka import KafkaConsumer
-from .pipeline import process_event
-
-KAFKA_BROKER = os.getenv("KAFKA_BROKER", "kafka:9092")
-
-consumer = KafkaConsumer(
-    'fullCRM.Pathway.applications',             # USE THESE TOPICS FOR PATHWAY PIPELINE
-    'fullCRM.Pathway.meetings',                     #
-    'fullCRM.Pathway.startups',                     #
-    bootstrap_servers=KAFKA_BROKER,
-    group_id='fastapi-pathway',
-    value_deserializer=lambda m: json.loads(m.decode('utf-8'))
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .pipeline import broadcast_handler
+from .workers import cdc_workers
+
+logger = logging.getLogger(__name__)
+
+TOPICS = (
+    "fullCRM.Pathway.applications",  # USE THESE TOPICS FOR PATHWAY PIPELINE
+    "fullCRM.Pathway.meetings",
+    "fullCRM.Pathway.startups",
 )
 
+
+def _deserialize(value: Optional[bytes]) -> Any:
+    # Debezium follows deletes with a tombstone whose value is null
+    if value is None:
+        return None
+    try:
+        return json.loads(value.decode("utf-8"))
+    except ValueError:
+        # Raising here would fail the poll itself; hand the raw text on so the
+        # pipeline rejects it as malformed and it ends up in the dead letters
+        return value.decode("utf-8", errors="replace")
+
+
+class ConsumerSettings:
+    def __init__(self):
+        self.broker = os.getenv("KAFKA_BROKER", "kafka:9092")
+        self.group_id = os.getenv("KAFKA_GROUP_ID", "fastapi-pathway")
+        self.broadcast = os.getenv("CDC_BROADCAST_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.replay_topic = os.getenv("CDC_REPLAY_TOPIC", "fullCRM.Pathway.replay")
+        self.topics = TOPICS + ((self.replay_topic,) if self.replay_topic else ())
+        self.max_records = max(1, int(os.getenv("CDC_MAX_RECORDS", "500")))
+        self.poll_timeout_ms = max(1, int(os.getenv("CDC_POLL_TIMEOUT_MS", "1000")))
+        self.retry_backoff = max(0.0, float(os.getenv("CDC_RETRY_BACKOFF_MS", "1000"))) / 1000
+        self.lag_interval = max(0.0, float(os.getenv("CDC_LAG_INTERVAL_S", "10")))
+
+
+def unwrap_replay(record: Any, replay_topic: Optional[str]) -> Any:
+    """A record from the replay topic as a record of the topic it was replayed for."""
+    if not replay_topic or record.topic != replay_topic:
+        return record
+    envelope = record.value
+    if not isinstance(envelope, dict) or not isinstance(envelope.get("topic"), str) or "value" not in envelope:
+        # Left as is; the pipeline rejects it as malformed and dead-letters it
+        return record
+    key = envelope.get("key")
+    return record._replace(
+        topic=envelope["topic"],
+        key=key.encode("utf-8") if isinstance(key, str) else key,
+        value=envelope["value"],
+    )
+
+
+def create_kafka_consumer(settings: ConsumerSettings):
+    from kafka import KafkaConsumer
+
+    return KafkaConsumer(
+        *settings.topics,
+        bootstrap_servers=settings.broker,
+        group_id=settings.group_id,
+        enable_auto_commit=False,
+        max_poll_records=settings.max_records,
+        value_deserializer=_deserialize,
+    )
+
+
+def create_broadcast_consumer(settings: ConsumerSettings):
+    """A group-less consumer assigned every partition of the topics, positioned at the end."""
+    from kafka import KafkaConsumer, TopicPartition
+
+    consumer = KafkaConsumer(
+        bootstrap_servers=settings.broker,
+        group_id=None,
+        enable_auto_commit=False,
+        max_poll_records=settings.max_records,
+        value_deserializer=_deserialize,
+    )
+    try:
+        partitions = []
+        for topic in settings.topics:
+            ids = consumer.partitions_for_topic(topic)
+            if not ids and topic == settings.replay_topic:
+                # Created on first replay; picked up when the consumer reconnects
+                logger.warning(f"Replay topic {topic} does not exist yet; broadcast consumer skips it")
+                continue
+            if not ids:
+                raise RuntimeError(f"no partitions found for {topic}")
+            partitions.extend(TopicPartition(topic, partition) for partition in ids)
+        consumer.assign(partitions)
+        consumer.seek_to_end(*partitions)
+    except Exception:
+        consumer.close()
+        raise
+    return consumer
+
+
+class ConsumerStats:
+    def __init__(self):
+        self.batches = 0
+        self.events = 0
+        self.failed_batches = 0
+        self.errors = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+        self.last_batch_ms = 0.0
+        self.max_batch_ms = 0.0
+        self.total_batch_ms = 0.0
+        self.last_commit_at: Optional[float] = None
+        self.last_poll_at: Optional[float] = None
+        self.started_at: Optional[float] = None
+        self.lag: Dict[str, int] = {}
+
+    def record_batch(self, size: int, elapsed_ms: float) -> None:
+        self.batches += 1
+        self.events += size
+        self.last_batch_size = size
+        self.max_batch_size = max(self.max_batch_size, size)
+        self.last_batch_ms = elapsed_ms
+        self.max_batch_ms = max(self.max_batch_ms, elapsed_ms)
+        self.total_batch_ms += elapsed_ms
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "events": self.events,
+            "failed_batches": self.failed_batches,
+            "errors": self.errors,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_size,
+            "avg_batch_size": round(self.events / self.batches, 3) if self.batches else 0.0,
+            "last_batch_ms": round(self.last_batch_ms, 3),
+            "max_batch_ms": round(self.max_batch_ms, 3),
+            "avg_batch_ms": round(self.total_batch_ms / self.batches, 3) if self.batches else 0.0,
+            "last_commit_at": self.last_commit_at,
+            "last_poll_at": self.last_poll_at,
+            "started_at": self.started_at,
+            "lag": dict(self.lag),
+            "total_lag": sum(self.lag.values()),
+        }
+
+
+class CDCConsumer:
+    """
+    Batching consumer loop with manual commits.
+
+    Args:
+        consumer_factory: Builds the Kafka (or in-memory) consumer from the settings
+        batch_handler: Called with the records of each polled batch; raising fails the batch
+        settings (ConsumerSettings): Defaults to the environment
+        commit (bool): Commit offsets after each batch; False for group-less consumers
+        name (str): Thread and log name
+    """
+    def __init__(
+        self,
+        consumer_factory: Callable[[ConsumerSettings], Any] = create_kafka_consumer,
+        batch_handler: Callable[[List[Any]], None] = cdc_workers.process_batch,
+        settings: Optional[ConsumerSettings] = None,
+        commit: bool = True,
+        name: str = "cdc-consumer",
+    ):
+        self.consumer_factory = consumer_factory
+        self.batch_handler = batch_handler
+        self._settings = settings
+        self.commits = commit
+        self.name = name
+        self.stats = ConsumerStats()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_lag_check = 0.0
+
+    @property
+    def settings(self) -> ConsumerSettings:
+        if self._settings is None:
+            self._settings = ConsumerSettings()
+        return self._settings
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self.stats.started_at = time.time()
+        self._thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Ask the loop to finish its current batch and wait for the thread to exit."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout if timeout is not None else self.settings.poll_timeout_ms / 1000 + 10)
+            if self._thread.is_alive():
+                logger.warning(f"{self.name} did not stop in time")
+            self._thread = None
+
+    def _connect(self):
+        while not self._stop.is_set():
+            try:
+                return self.consumer_factory(self.settings)
+            except Exception as e:
+                logger.error(f"Could not connect {self.name} to {self.settings.broker}: {e}")
+                self._stop.wait(max(self.settings.retry_backoff, 1.0))
+        return None
+
+    def run(self) -> None:
+        """Consume until ``stop`` is called. Blocks; ``start`` runs it on a thread."""
+        while not self._stop.is_set():
+            consumer = self._connect()
+            if consumer is None:
+                return
+            group = self.settings.group_id if self.commits else None
+            logger.info(f"{self.name} started on {', '.join(self.settings.topics)} (group {group})")
+            try:
+                while not self._stop.is_set():
+                    polled = consumer.poll(timeout_ms=self.settings.poll_timeout_ms, max_records=self.settings.max_records)
+                    self.stats.last_poll_at = time.time()
+                    if polled:
+                        self._handle(consumer, polled)
+                    self._update_lag(consumer)
+            except Exception as e:
+                self.stats.errors += 1
+                logger.error(f"{self.name} failed, reconnecting: {e}", exc_info=True)
+                self._stop.wait(max(self.settings.retry_backoff, 1.0))
+            finally:
+                try:
+                    consumer.close(autocommit=False)
+                except Exception as e:
+                    logger.warning(f"Error closing CDC consumer: {e}")
+        logger.info(f"{self.name} stopped.")
+
+    def _handle(self, consumer, polled: Dict[Any, List[Any]]) -> None:
+        replay_topic = self.settings.replay_topic
+        records = [unwrap_replay(record, replay_topic) for partition_records in polled.values() for record in partition_records]
+        started = time.perf_counter()
+        try:
+            self.batch_handler(records)
+        except Exception as e:
+            self.stats.failed_batches += 1
+            logger.error(f"CDC batch of {len(records)} record(s) failed, retrying: {e}", exc_info=True)
+            # Rewind so the same batch is polled again
+            for tp, partition_records in polled.items():
+                consumer.seek(tp, partition_records[0].offset)
+            self._stop.wait(self.settings.retry_backoff)
+            return
+        self.stats.record_batch(len(records), (time.perf_counter() - started) * 1000)
+        if self.commits:
+            consumer.commit()
+            self.stats.last_commit_at = time.time()
+
+    def _update_lag(self, consumer) -> None:
+        now = time.monotonic()
+        if now - self._last_lag_check < self.settings.lag_interval:
+            return
+        self._last_lag_check = now
+        try:
+            partitions = consumer.assignment()
+            if not partitions:
+                return
+            end_offsets = consumer.end_offsets(partitions)
+            self.stats.lag = {
+                f"{tp.topic}[{tp.partition}]": max(0, end_offsets[tp] - consumer.position(tp))
+                for tp in partitions
+            }
+        except Exception as e:
+            logger.debug(f"Could not read CDC consumer lag: {e}")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "group_id": self.settings.group_id if self.commits else None,
+            "topics": list(self.settings.topics),
+            "max_records": self.settings.max_records,
+            **self.stats.as_dict(),
+        }
+
+
+cdc_consumer = CDCConsumer()
+cdc_broadcast = CDCConsumer(
+    consumer_factory=create_broadcast_consumer,
+    batch_handler=broadcast_handler,
+    commit=False,
+    name="cdc-broadcast",
+)
+
+
 def start_consumer():
-    print("Pathway consumer started...")
-    for message in consumer:
-        payload = message.value
-        process_event(payload)
+    """Run the consumer in the calling thread (blocks until ``cdc_consumer.stop()``)."""
+    cdc_consumer.run()
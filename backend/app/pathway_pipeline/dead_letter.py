@@ -0,0 +1,205 @@
+"""
+Dead Letters
+
+Keeps one bad event from stalling its partition. Every record handled by the
+worker lanes goes through ``DeadLetterGuard``:
+
+    MalformedEventError  - the event can never be processed (not JSON, no
+                           ``op``, no document id); dead-lettered at once
+    any other exception  - retried up to ``CDC_MAX_ATTEMPTS`` times with
+                           exponential backoff (``CDC_RETRY_INITIAL_MS``
+                           doubling up to ``CDC_RETRY_MAX_MS``), then
+                           dead-lettered
+
+A dead-lettered record is appended to ``CDC_DEAD_LETTER_PATH`` (one JSON object
+per line, with its topic, partition, offset, key, value, error and attempt
+count) and the batch carries on, so its offsets are committed. Only a failure
+to write the dead letter itself fails the batch, which the consumer then
+rewinds and retries as before, so no event is dropped silently.
+
+Dead letters are re-fed through the pipeline with
+``python -m app.pathway_pipeline.replay --dead-letters``.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MalformedEventError(ValueError):
+    """An event that cannot be processed however often it is retried."""
+
+
+class DeadLetterSettings:
+    def __init__(self):
+        self.path = os.getenv("CDC_DEAD_LETTER_PATH", "cdc_dead_letters.jsonl")
+        self.max_attempts = max(1, int(os.getenv("CDC_MAX_ATTEMPTS", "3")))
+        self.retry_initial = max(0.0, float(os.getenv("CDC_RETRY_INITIAL_MS", "100"))) / 1000
+        self.retry_max = max(0.0, float(os.getenv("CDC_RETRY_MAX_MS", "5000"))) / 1000
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait after failed attempt ``attempt`` (1-based)."""
+        return min(self.retry_max, self.retry_initial * (2 ** (attempt - 1)))
+
+
+def _text(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return value
+
+
+class DeadLetterStore:
+    """
+    Append-only JSONL file of records that could not be processed.
+
+    Args:
+        path (str): File the dead letters are appended to
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.written = 0
+        self.last_error: Optional[str] = None
+        self.last_written_at: Optional[float] = None
+
+    def write(self, record: Any, error: BaseException, attempts: int) -> None:
+        entry = {
+            "topic": record.topic,
+            "partition": getattr(record, "partition", None),
+            "offset": getattr(record, "offset", None),
+            "key": _text(record.key),
+            "value": _text(record.value),
+            "error": str(error),
+            "error_type": type(error).__name__,
+            "attempts": attempts,
+            "failed_at": datetime.now(timezone.utc).isoformat(),
+        }
+        line = json.dumps(entry, default=str)
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+            self.written += 1
+            self.last_error = entry["error"]
+            self.last_written_at = time.time()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return read_jsonl(self.path)
+
+    def count(self) -> int:
+        try:
+            with open(self.path, "rb") as f:
+                return sum(1 for line in f if line.strip())
+        except FileNotFoundError:
+            return 0
+
+    def take(self) -> Optional[str]:
+        """
+        Move the current file aside (``<path>.<timestamp>``) and return its new path,
+        so a replay can read it while new dead letters go to a fresh file.
+        """
+        with self._lock:
+            if not os.path.exists(self.path):
+                return None
+            taken = f"{self.path}.{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}"
+            os.replace(self.path, taken)
+            return taken
+
+
+def read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.warning(f"Skipping unreadable line {number} of {path}")
+
+
+class DeadLetterGuard:
+    """
+    Wraps the per-record handler with retries and dead-lettering.
+
+    Args:
+        handler: Processes one record
+        settings (DeadLetterSettings): Defaults to the environment
+        store (DeadLetterStore): Defaults to a store on ``settings.path``
+    """
+    def __init__(self, handler: Callable[[Any], None], settings: Optional[DeadLetterSettings] = None, store: Optional[DeadLetterStore] = None):
+        self.handler = handler
+        self._settings = settings
+        self._store = store
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.recovered = 0
+        self.malformed = 0
+        self.exhausted = 0
+
+    @property
+    def settings(self) -> DeadLetterSettings:
+        if self._settings is None:
+            self._settings = DeadLetterSettings()
+        return self._settings
+
+    @property
+    def store(self) -> DeadLetterStore:
+        if self._store is None:
+            self._store = DeadLetterStore(self.settings.path)
+        return self._store
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def __call__(self, record: Any) -> None:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                self.handler(record)
+                if attempt > 1:
+                    self._count("recovered")
+                return
+            except MalformedEventError as e:
+                self._count("malformed")
+                logger.error(f"Dead-lettering malformed event {record.topic}[{getattr(record, 'partition', '?')}]@{getattr(record, 'offset', '?')}: {e}")
+                self.store.write(record, e, attempt)
+                return
+            except Exception as e:
+                if attempt >= self.settings.max_attempts:
+                    self._count("exhausted")
+                    logger.error(
+                        f"Dead-lettering event {record.topic}[{getattr(record, 'partition', '?')}]@{getattr(record, 'offset', '?')} "
+                        f"after {attempt} attempt(s): {e}",
+                        exc_info=True,
+                    )
+                    self.store.write(record, e, attempt)
+                    return
+                self._count("retries")
+                delay = self.settings.backoff(attempt)
+                logger.warning(f"CDC event failed (attempt {attempt}/{self.settings.max_attempts}), retrying in {delay:.3f}s: {e}")
+                time.sleep(delay)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "path": self.settings.path,
+            "max_attempts": self.settings.max_attempts,
+            "retries": self.retries,
+            "recovered": self.recovered,
+            "malformed": self.malformed,
+            "exhausted": self.exhausted,
+            "dead_lettered": self.store.written,
+            "last_error": self.store.last_error,
+            "last_dead_letter_at": self.store.last_written_at,
+        }
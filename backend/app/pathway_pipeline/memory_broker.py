@@ -0,0 +1,123 @@
+"""
+In-memory stand-in for the Kafka broker.
+
+Implements the part of ``KafkaConsumer`` that ``CDCConsumer`` uses (``poll``,
+``commit``, ``seek``, ``assignment``, ``position``, ``end_offsets``, ``close``)
+on top of per-partition lists, with committed offsets kept per consumer
+group. Lets the CDC consumer run in tests, replays and benchmarks without
+Kafka or Debezium:
+
+    broker = InMemoryBroker(partitions=3)
+    broker.produce("fullCRM.Pathway.meetings", {"op": "c", "after": {...}}, key="abc")
+    consumer = CDCConsumer(consumer_factory=lambda settings: broker.consumer(settings.topics, settings.group_id))
+
+A consumer created with ``group_id=None`` behaves like the broadcast consumer:
+it starts at the end of every partition and ``commit`` does nothing.
+"""
+
+import threading
+import time
+import zlib
+from collections import namedtuple
+from typing import Any, Dict, Iterable, List, Optional
+
+# Same field names as kafka.TopicPartition / kafka.consumer.fetcher.ConsumerRecord
+TopicPartition = namedtuple("TopicPartition", ["topic", "partition"])
+BrokerRecord = namedtuple("BrokerRecord", ["topic", "partition", "offset", "timestamp", "key", "value"])
+
+
+class InMemoryBroker:
+    def __init__(self, partitions: int = 1):
+        self.partitions = max(1, partitions)
+        self._logs: Dict[TopicPartition, List[BrokerRecord]] = {}
+        self._committed: Dict[str, Dict[TopicPartition, int]] = {}
+        self._cond = threading.Condition()
+
+    def _log(self, tp: TopicPartition) -> List[BrokerRecord]:
+        return self._logs.setdefault(tp, [])
+
+    def produce(self, topic: str, value: Any, key: Optional[str] = None, partition: Optional[int] = None) -> BrokerRecord:
+        """Append a record; without an explicit partition, records with the same key share one."""
+        if partition is None:
+            partition = zlib.crc32(key.encode("utf-8")) % self.partitions if key is not None else 0
+        with self._cond:
+            log = self._log(TopicPartition(topic, partition))
+            record = BrokerRecord(topic, partition, len(log), int(time.time() * 1000), key, value)
+            log.append(record)
+            self._cond.notify_all()
+        return record
+
+    def consumer(self, topics: Iterable[str], group_id: Optional[str]) -> "InMemoryConsumer":
+        return InMemoryConsumer(self, list(topics), group_id)
+
+    def committed(self, group_id: str) -> Dict[TopicPartition, int]:
+        with self._cond:
+            return dict(self._committed.get(group_id, {}))
+
+
+class InMemoryConsumer:
+    """A single group member that is assigned every partition of its topics."""
+    def __init__(self, broker: InMemoryBroker, topics: List[str], group_id: Optional[str]):
+        self.broker = broker
+        self.topics = topics
+        self.group_id = group_id
+        if group_id is None:
+            self._positions: Dict[TopicPartition, int] = self.end_offsets(self.assignment())
+        else:
+            committed = broker.committed(group_id)
+            self._positions = {tp: committed.get(tp, 0) for tp in self.assignment()}
+        self.closed = False
+
+    def assignment(self) -> set:
+        return {
+            TopicPartition(topic, partition)
+            for topic in self.topics
+            for partition in range(self.broker.partitions)
+        }
+
+    def _take(self, max_records: int) -> Dict[TopicPartition, List[BrokerRecord]]:
+        batch: Dict[TopicPartition, List[BrokerRecord]] = {}
+        taken = 0
+        for tp in sorted(self._positions):
+            if taken >= max_records:
+                break
+            log = self.broker._log(tp)
+            position = self._positions[tp]
+            records = log[position:position + max_records - taken]
+            if records:
+                batch[tp] = records
+                self._positions[tp] = position + len(records)
+                taken += len(records)
+        return batch
+
+    def poll(self, timeout_ms: int = 0, max_records: int = 500) -> Dict[TopicPartition, List[BrokerRecord]]:
+        deadline = time.monotonic() + timeout_ms / 1000
+        with self.broker._cond:
+            while True:
+                batch = self._take(max_records)
+                remaining = deadline - time.monotonic()
+                if batch or remaining <= 0:
+                    return batch
+                self.broker._cond.wait(remaining)
+
+    def commit(self) -> None:
+        """Commit the current position of every assigned partition, like ``KafkaConsumer.commit()``."""
+        if self.group_id is None:
+            return
+        with self.broker._cond:
+            self.broker._committed.setdefault(self.group_id, {}).update(self._positions)
+
+    def seek(self, tp: TopicPartition, offset: int) -> None:
+        self._positions[tp] = offset
+
+    def position(self, tp: TopicPartition) -> int:
+        return self._positions[tp]
+
+    def end_offsets(self, partitions: Iterable[TopicPartition]) -> Dict[TopicPartition, int]:
+        with self.broker._cond:
+            return {tp: len(self.broker._log(tp)) for tp in partitions}
+
+    def close(self, autocommit: bool = False) -> None:
+        if autocommit:
+            self.commit()
+        self.closed = True
@@ -1,8 +1,68 @@
 import logging
 
+from ..database.cache import model_caches
+from .views import ChangeEvent, materialized_views
+
 logger = logging.getLogger(__name__)
 
-def process_event(event: dict):
-    op = event.get('op')  # c=create, u=update, d=delete
-    data = event.get('after') or event.get('before')
-    logger.info(f"[Pathway] {op} operation detected on _id={data.get('_id')}")
+def apply_change(change: ChangeEvent):
+    """Apply a change to this process's state: drop cached models and update the views."""
+    if change.op in ("u", "d") and change.topic:
+        # Topics are <server>.<db>.<collection>; the cache is keyed by collection
+        model_caches.invalidate(change.topic.rsplit(".", 1)[-1], change.doc_id)
+    materialized_views.apply(change)
+
+def process_event(event: dict, topic: str = None, key=None):
+    change = ChangeEvent.from_message(event, topic, key)  # op: c=create, r=read, u=update, d=delete
+    logger.info(f"[Pathway] {change.op} operation detected on _id={change.doc_id}")
+    apply_change(change)
+
+def process_record(record):
+    """Process one Kafka record; Debezium tombstones (null value after a delete) are skipped."""
+    if record.value is None:
+        return
+    process_event(record.value, record.topic, record.key)
+
+def check_record(record):
+    """
+    Group-consumer handler while the broadcast consumer owns this worker's views
+    and cache: parses the record (malformed events raise and are dead-lettered)
+    without applying it, so the two consumers never race on the same state.
+    """
+    if record.value is None:
+        return
+    ChangeEvent.from_message(record.value, record.topic, record.key)
+
+def process_batch(records: list):
+    """Process one polled batch of Kafka records in offset order; raising fails the whole batch."""
+    for record in records:
+        process_record(record)
+
+
+class BroadcastHandler:
+    """
+    Batch handler of the per-process broadcast consumer: the only thing that
+    applies events to this worker's cache and views while it runs, in log order.
+    Events that cannot be applied are skipped and counted; the shared consumer
+    group dead-letters them.
+    """
+    def __init__(self):
+        self.applied = 0
+        self.skipped = 0
+
+    def __call__(self, records: list):
+        for record in records:
+            if record.value is None:
+                continue
+            try:
+                apply_change(ChangeEvent.from_message(record.value, record.topic, record.key))
+                self.applied += 1
+            except Exception as e:
+                self.skipped += 1
+                logger.debug(f"Broadcast skipped a {record.topic} event: {e}")
+
+    def metrics(self) -> dict:
+        return {"applied": self.applied, "skipped": self.skipped}
+
+
+broadcast_handler = BroadcastHandler()
@@ -0,0 +1,171 @@
+"""
+CDC replay.
+
+Re-feeds change events from local JSONL files, either to the running service
+through Kafka (``--kafka``) or through a local copy of the pipeline (the same
+keyed worker lanes and dead letter guard as the live consumer). Used for
+backfills, for retrying dead letters once the cause is fixed, and for
+benchmarking the pipeline.
+
+Each line is either a dead letter / exported record (an object with ``topic``
+and ``value``) or a bare Debezium event. Bare events take their topic from
+``--topic`` or from their ``source`` block (``<name>.<db>.<collection>``).
+
+Usage:
+    python -m app.pathway_pipeline.replay --dead-letters --kafka
+    python -m app.pathway_pipeline.replay events.jsonl --kafka
+    python -m app.pathway_pipeline.replay events.jsonl --topic fullCRM.Pathway.applications   # local dry run
+
+``--kafka`` publishes each event to ``CDC_REPLAY_TOPIC`` as a ``{"topic",
+"key", "value"}`` envelope, never to the Debezium topics. The service's
+consumers unwrap it and process it as an event of its original topic: once
+through the shared group (retries, dead letters) and in every worker's
+broadcast consumer (views, cache). Events that still fail are dead-lettered
+again by the service.
+
+A local replay only updates the views and caches of the CLI process, which are
+gone when it exits, so it does not affect the service. It is meant for checking
+a file or timing the pipeline. ``--dead-letters`` therefore requires
+``--kafka``: moving the file aside and replaying it locally would lose the
+events.
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .consumer import ConsumerSettings
+from .dead_letter import _text, read_jsonl
+from .memory_broker import BrokerRecord
+from .workers import cdc_workers, dead_letters, record_key
+from .views import materialized_views
+
+logger = logging.getLogger(__name__)
+
+
+def _topic_of(event: Any) -> Optional[str]:
+    source = event.get("source") if isinstance(event, dict) else None
+    if isinstance(event, dict) and isinstance(event.get("payload"), dict):
+        source = event["payload"].get("source", source)
+    if isinstance(source, dict) and source.get("name") and source.get("db") and source.get("collection"):
+        return f"{source['name']}.{source['db']}.{source['collection']}"
+    return None
+
+
+def load_records(paths: Iterable[str], topic: Optional[str] = None) -> Iterator[BrokerRecord]:
+    """Records from JSONL files, numbered by their line order. Lines without a topic are skipped."""
+    offset = 0
+    for path in paths:
+        for entry in read_jsonl(path):
+            if isinstance(entry, dict) and "topic" in entry and "value" in entry:
+                record_topic, key, value = entry["topic"], entry.get("key"), entry["value"]
+                partition = entry.get("partition") or 0
+            else:
+                record_topic, key, value, partition = topic or _topic_of(entry), None, entry, 0
+            if not record_topic:
+                logger.warning(f"Skipping event without a topic in {path} (pass --topic)")
+                continue
+            yield BrokerRecord(record_topic, partition, offset, int(time.time() * 1000), key, value)
+            offset += 1
+
+
+def replay(
+    records: Iterable[Any],
+    batch_size: int = 500,
+    batch_handler: Callable[[List[Any]], None] = cdc_workers.process_batch,
+) -> Dict[str, Any]:
+    """Feed ``records`` to ``batch_handler`` in batches of ``batch_size``; returns counts and timing."""
+    events = batches = 0
+    batch: List[Any] = []
+    started = time.perf_counter()
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            batch_handler(batch)
+            events, batches, batch = events + len(batch), batches + 1, []
+    if batch:
+        batch_handler(batch)
+        events, batches = events + len(batch), batches + 1
+    elapsed = time.perf_counter() - started
+    return {
+        "events": events,
+        "batches": batches,
+        "seconds": round(elapsed, 3),
+        "events_per_sec": round(events / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def produce(records: Iterable[BrokerRecord], broker: str, topic: str) -> Dict[str, Any]:
+    """Publish ``records`` to the replay ``topic`` so the running consumers pick them up."""
+    from kafka import KafkaProducer
+
+    producer = KafkaProducer(
+        bootstrap_servers=broker,
+        key_serializer=lambda key: key if isinstance(key, bytes) or key is None else str(key).encode("utf-8"),
+        value_serializer=lambda value: json.dumps(value, default=str).encode("utf-8"),
+    )
+    events = 0
+    started = time.perf_counter()
+    try:
+        for record in records:
+            # Keyed by document so each document's events stay on one partition, in order
+            envelope = {"topic": record.topic, "key": _text(record.key), "value": record.value}
+            producer.send(topic, key=record_key(record), value=envelope)
+            events += 1
+        producer.flush()
+    finally:
+        producer.close()
+    elapsed = time.perf_counter() - started
+    return {"topic": topic, "events": events, "seconds": round(elapsed, 3), "events_per_sec": round(events / elapsed, 1) if elapsed else 0.0}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay CDC events from JSONL files through the pipeline")
+    parser.add_argument("files", nargs="*", help="JSONL files of Debezium events or dead letters")
+    parser.add_argument("--dead-letters", action="store_true", help="replay (and move aside) CDC_DEAD_LETTER_PATH; requires --kafka")
+    parser.add_argument("--topic", default=None, help="topic for bare events without a source block")
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv("CDC_MAX_RECORDS", "500")))
+    parser.add_argument("--kafka", action="store_true", help="publish the events to CDC_REPLAY_TOPIC for the running service")
+    args = parser.parse_args()
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING"))
+    if args.dead_letters and not args.kafka:
+        parser.error("--dead-letters requires --kafka; a local replay only updates this process and would lose the events")
+
+    files = list(args.files)
+    if args.dead_letters:
+        taken = dead_letters.store.take()
+        if taken is None:
+            print(json.dumps({"events": 0, "detail": f"no dead letters at {dead_letters.store.path}"}))
+            return
+        files.append(taken)
+    if not files:
+        parser.error("pass at least one file or --dead-letters")
+
+    records = load_records(files, args.topic)
+    try:
+        if args.kafka:
+            settings = ConsumerSettings()
+            if not settings.replay_topic:
+                parser.error("CDC_REPLAY_TOPIC is empty; the service is not reading a replay topic")
+            try:
+                result = produce(records, settings.broker, settings.replay_topic)
+            except Exception:
+                if args.dead_letters:
+                    logger.error(f"Replay failed; the dead letters are kept in {files[-1]}, retry with: replay {files[-1]} --kafka")
+                raise
+        else:
+            logger.warning("Local replay: only this process's views and caches are updated, not the running service")
+            result = replay(records, max(1, args.batch_size))
+            result["dead_letters"] = dead_letters.metrics()
+            result["views"] = materialized_views.metrics()
+    finally:
+        cdc_workers.shutdown()
+    result["files"] = files
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
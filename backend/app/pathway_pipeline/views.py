@@ -0,0 +1,357 @@
+"""
+Materialised Views
+
+Dashboard aggregates kept up to date from the Debezium change events instead
+of being recomputed from ``/fetch/all``:
+
+    applications  - counts by status, stage and industry
+    meetings      - meetings per VC
+    accept rate   - accepted / rejected decisions per day
+
+Every view keeps a small snapshot of the fields it counts for each document.
+An event subtracts the document's old snapshot and adds its new one, so each
+event costs O(1), and re-applying an event (the consumer is at-least-once)
+leaves the counts unchanged. Views start from ``seed_views`` at startup and
+are served by ``/api/views``.
+
+Debezium's MongoDB connector may deliver ``after``/``before`` as JSON strings,
+wrap the event in a ``{"schema", "payload"}`` envelope, and describe updates
+with ``patch`` / ``updateDescription`` instead of a full ``after``; all of
+these are normalised by ``ChangeEvent.from_message``.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..database.indexes import collection_name
+from ..database.mongo_client import mongo_registry
+from .dead_letter import MalformedEventError
+
+logger = logging.getLogger(__name__)
+
+APPLICATIONS_TOPIC = "fullCRM.Pathway.applications"
+MEETINGS_TOPIC = "fullCRM.Pathway.meetings"
+STARTUPS_TOPIC = "fullCRM.Pathway.startups"
+
+DECIDED_STATUSES = ("accepted", "rejected")
+
+
+def _plain(value: Any) -> Any:
+    """Unwrap MongoDB extended JSON scalars such as ``{"$oid": ...}`` and ``{"$date": ...}``."""
+    if isinstance(value, dict) and len(value) == 1:
+        (key, inner), = value.items()
+        if key in ("$oid", "$numberLong", "$numberInt", "$numberDouble"):
+            return inner
+        if key == "$date":
+            return _plain(inner)
+    return value
+
+
+def _parse_json(value: Any) -> Any:
+    if isinstance(value, (str, bytes)):
+        return json.loads(value)
+    return value
+
+
+def _day(value: Any) -> Optional[str]:
+    """Calendar day (UTC, ``YYYY-MM-DD``) of a datetime, ISO string or epoch milliseconds."""
+    value = _plain(value)
+    if isinstance(value, datetime):
+        moment = value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    elif isinstance(value, (int, float)):
+        moment = datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+    elif isinstance(value, str):
+        try:
+            moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+    else:
+        return None
+    return moment.astimezone(timezone.utc).date().isoformat()
+
+
+def _key_id(key: Any) -> Optional[str]:
+    """Document id from a Debezium record key (``{"id": ...}``, possibly in a payload envelope)."""
+    if key is None:
+        return None
+    try:
+        parsed = _parse_json(key)
+    except ValueError:
+        return key.decode("utf-8") if isinstance(key, bytes) else str(key)
+    if isinstance(parsed, dict):
+        parsed = parsed.get("payload", parsed)
+        parsed = parsed.get("id", parsed.get("_id")) if isinstance(parsed, dict) else parsed
+    try:
+        # the MongoDB connector JSON-encodes the id inside the key
+        parsed = _parse_json(parsed) if isinstance(parsed, str) else parsed
+    except ValueError:
+        pass
+    parsed = _plain(parsed)
+    return str(parsed) if parsed is not None else None
+
+
+class ChangeEvent:
+    """
+    A normalised Debezium change event.
+
+    Args:
+        topic (str): Kafka topic (one per collection)
+        op (str): c=create, r=snapshot read, u=update, d=delete
+        doc_id (str): Id of the changed document
+        document (dict): Full document after the change, when the event carries one
+        changes (dict): Fields set by an update that carries no full document
+        ts_ms (int): Event time in epoch milliseconds, if known
+    """
+    __slots__ = ("topic", "op", "doc_id", "document", "changes", "ts_ms")
+
+    def __init__(self, topic: str, op: str, doc_id: str, document: Optional[Dict[str, Any]], changes: Dict[str, Any], ts_ms: Optional[int]):
+        self.topic = topic
+        self.op = op
+        self.doc_id = doc_id
+        self.document = document
+        self.changes = changes
+        self.ts_ms = ts_ms
+
+    @classmethod
+    def from_message(cls, event: Dict[str, Any], topic: Optional[str] = None, key: Any = None) -> "ChangeEvent":
+        """
+        Raises:
+            MalformedEventError: If the event is not a JSON object, has no operation or no document id
+        """
+        if not isinstance(event, dict):
+            raise MalformedEventError(f"change event is not a JSON object ({type(event).__name__})")
+        if "payload" in event and "op" not in event and isinstance(event["payload"], dict):
+            event = event["payload"]
+        op = event.get("op")
+        if not op:
+            raise MalformedEventError("change event has no 'op'")
+
+        try:
+            after = _parse_json(event.get("after"))
+            before = _parse_json(event.get("before"))
+            patch = _parse_json(event.get("patch"))
+            filter_ = _parse_json(event.get("filter"))
+            update = event.get("updateDescription")
+            updated_fields = _parse_json(update.get("updatedFields")) if isinstance(update, dict) else None
+        except ValueError as e:
+            raise MalformedEventError(f"change event ({op}) has an unreadable document: {e}") from e
+
+        changes: Dict[str, Any] = {}
+        if isinstance(patch, dict):
+            changes.update(patch.get("$set", {}) if "$set" in patch else patch)
+        if isinstance(updated_fields, dict):
+            changes.update(updated_fields)
+
+        doc_id = None
+        for source in (after, before, filter_):
+            if isinstance(source, dict) and source.get("_id") is not None:
+                doc_id = str(_plain(source["_id"]))
+                break
+        if doc_id is None:
+            doc_id = _key_id(key)
+        if not doc_id:
+            raise MalformedEventError(f"change event ({op}) carries no document id")
+
+        ts_ms = event.get("ts_ms") or (event.get("source") or {}).get("ts_ms")
+        return cls(topic or "", op, doc_id, after if isinstance(after, dict) else None, changes, ts_ms)
+
+
+# Per-document snapshots of the fields the views count
+ApplicationSnapshot = Tuple[str, Optional[str], Optional[str], Optional[str]]  # status, stage, industry, decided day
+
+
+class MaterializedViews:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._applications: Dict[str, ApplicationSnapshot] = {}
+            self._by_status: Counter = Counter()
+            self._by_stage: Counter = Counter()
+            self._by_industry: Counter = Counter()
+            self._decisions: Dict[str, Counter] = {}
+            self._meetings: Dict[str, str] = {}
+            self._per_vc: Counter = Counter()
+            self.events = 0
+            self.skipped = 0
+            self.last_event_at: Optional[float] = None
+            self.seeded = False
+
+    # ----- applications -----
+
+    def _application_snapshot(self, fields: Dict[str, Any], old: Optional[ApplicationSnapshot], ts_ms: Optional[int]) -> ApplicationSnapshot:
+        status = fields.get("status") or "pending"
+        decided = None
+        if status in DECIDED_STATUSES:
+            if old is not None and old[0] == status and old[3]:
+                decided = old[3]
+            else:
+                decided = _day(fields.get("updatedAt")) or (_day(ts_ms) if ts_ms else None) or _day(datetime.now(timezone.utc))
+        return status, fields.get("stage"), fields.get("industry"), decided
+
+    def _count_application(self, snapshot: ApplicationSnapshot, delta: int) -> None:
+        status, stage, industry, decided = snapshot
+        for counter, value in ((self._by_status, status), (self._by_stage, stage or "unknown"), (self._by_industry, industry or "unknown")):
+            counter[value] += delta
+            if counter[value] <= 0:
+                del counter[value]
+        if decided:
+            day = self._decisions.setdefault(decided, Counter())
+            day[status] += delta
+            if day[status] <= 0:
+                del day[status]
+            if not day:
+                del self._decisions[decided]
+
+    def _set_application(self, doc_id: str, snapshot: Optional[ApplicationSnapshot]) -> None:
+        old = self._applications.pop(doc_id, None)
+        if old is not None:
+            self._count_application(old, -1)
+        if snapshot is not None:
+            self._applications[doc_id] = snapshot
+            self._count_application(snapshot, 1)
+
+    def _apply_application(self, event: ChangeEvent) -> bool:
+        old = self._applications.get(event.doc_id)
+        if event.op == "d":
+            self._set_application(event.doc_id, None)
+            return True
+        if event.document is not None:
+            fields = event.document
+        elif old is not None:
+            status, stage, industry, _ = old
+            fields = {"status": status, "stage": stage, "industry": industry, **event.changes}
+        else:
+            # A partial update of a document we never saw cannot be counted
+            return False
+        self._set_application(event.doc_id, self._application_snapshot(fields, old, event.ts_ms))
+        return True
+
+    # ----- meetings -----
+
+    def _set_meeting(self, doc_id: str, vc_id: Optional[str]) -> None:
+        old = self._meetings.pop(doc_id, None)
+        if old is not None:
+            self._per_vc[old] -= 1
+            if self._per_vc[old] <= 0:
+                del self._per_vc[old]
+        if vc_id is not None:
+            self._meetings[doc_id] = vc_id
+            self._per_vc[vc_id] += 1
+
+    def _apply_meeting(self, event: ChangeEvent) -> bool:
+        if event.op == "d":
+            self._set_meeting(event.doc_id, None)
+            return True
+        if event.document is not None:
+            vc_id = event.document.get("vc_id")
+        else:
+            vc_id = event.changes.get("vc_id", self._meetings.get(event.doc_id))
+        if vc_id is None:
+            return False
+        self._set_meeting(event.doc_id, str(vc_id))
+        return True
+
+    # ----- entry points -----
+
+    def apply(self, event: ChangeEvent) -> None:
+        with self._lock:
+            if event.topic == APPLICATIONS_TOPIC:
+                applied = self._apply_application(event)
+            elif event.topic == MEETINGS_TOPIC:
+                applied = self._apply_meeting(event)
+            else:
+                return
+            self.events += 1
+            self.skipped += int(not applied)
+            self.last_event_at = time.time()
+
+    def seed_application(self, document: Dict[str, Any]) -> None:
+        with self._lock:
+            doc_id = str(document["_id"])
+            self._set_application(doc_id, self._application_snapshot(document, None, None))
+
+    def seed_meeting(self, document: Dict[str, Any]) -> None:
+        with self._lock:
+            if document.get("vc_id") is not None:
+                self._set_meeting(str(document["_id"]), str(document["vc_id"]))
+
+    # ----- reads -----
+
+    def applications_view(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "total": len(self._applications),
+                "byStatus": dict(self._by_status),
+                "byStage": dict(self._by_stage),
+                "byIndustry": dict(self._by_industry),
+            }
+
+    def meetings_view(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"total": len(self._meetings), "byVC": dict(self._per_vc)}
+
+    def accept_rate_view(self, days: Optional[int] = None) -> Dict[str, Any]:
+        with self._lock:
+            series = sorted(self._decisions.items())
+        if days is not None:
+            series = series[-days:]
+        points: List[Dict[str, Any]] = []
+        accepted_total = decided_total = 0
+        for day, counts in series:
+            accepted, rejected = counts.get("accepted", 0), counts.get("rejected", 0)
+            accepted_total += accepted
+            decided_total += accepted + rejected
+            points.append({
+                "date": day,
+                "accepted": accepted,
+                "rejected": rejected,
+                "acceptRate": round(accepted / (accepted + rejected), 4) if accepted + rejected else None,
+            })
+        return {
+            "accepted": accepted_total,
+            "decided": decided_total,
+            "acceptRate": round(accepted_total / decided_total, 4) if decided_total else None,
+            "series": points,
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "seeded": self.seeded,
+            "events": self.events,
+            "skipped": self.skipped,
+            "last_event_at": self.last_event_at,
+            "applications": len(self._applications),
+            "meetings": len(self._meetings),
+        }
+
+
+materialized_views = MaterializedViews()
+
+
+async def seed_views() -> None:
+    """
+    Load the current applications and meetings into the views. Runs at startup,
+    before the CDC consumer, so events applied afterwards start from the stored state.
+    """
+    db = mongo_registry.get_database()
+    try:
+        applications = db[collection_name("applications")].find({}, {"status": 1, "stage": 1, "industry": 1, "updatedAt": 1})
+        async for document in applications:
+            materialized_views.seed_application(document)
+        meetings = db[collection_name("meetings")].find({}, {"vc_id": 1})
+        async for document in meetings:
+            materialized_views.seed_meeting(document)
+        materialized_views.seeded = True
+        logger.info(f"Materialised views seeded: {materialized_views.metrics()}")
+    except Exception as e:
+        logger.error(f"Failed to seed materialised views: {e}", exc_info=True)
@@ -0,0 +1,177 @@
+"""
+CDC Worker Pool
+
+Fans each polled batch out by topic and by document key, so a slow event on
+one document only delays later events of that same document.
+
+Every topic has ``N`` lanes (``CDC_TOPIC_CONCURRENCY``, falling back to
+``CDC_DEFAULT_CONCURRENCY``) backed by a thread pool of ``N`` threads. A
+record goes to lane ``crc32(key) % N``, where the key is the Kafka record key
+Debezium sets from the document id (or the payload ``_id`` when there is no
+key). A lane runs its records in offset order, so events for one document
+never overtake each other; different lanes and different topics run in
+parallel. Records go through ``DeadLetterGuard`` (see ``dead_letter.py``), so
+a failing event is retried and then dead-lettered instead of failing its lane.
+
+``process_batch`` returns once every lane of the batch is done and raises
+the first lane error, which keeps the consumer's commit-after-success
+contract: a batch is only committed when all of its events were processed.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .dead_letter import DeadLetterGuard
+from .pipeline import process_record
+from .views import _plain
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_concurrency(value: str) -> Dict[str, int]:
+    """Parse ``topic=n,topic=n`` into a dict."""
+    result: Dict[str, int] = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        topic, _, count = item.partition("=")
+        try:
+            result[topic.strip()] = max(1, int(count))
+        except ValueError:
+            logger.warning(f"Ignoring invalid CDC_TOPIC_CONCURRENCY entry '{item}'")
+    return result
+
+
+class WorkerPoolSettings:
+    def __init__(self):
+        self.default_concurrency = max(1, int(os.getenv("CDC_DEFAULT_CONCURRENCY", "2")))
+        self.topic_concurrency = _parse_concurrency(os.getenv("CDC_TOPIC_CONCURRENCY", ""))
+
+    def lanes_for(self, topic: str) -> int:
+        return self.topic_concurrency.get(topic, self.default_concurrency)
+
+
+def record_key(record: Any) -> bytes:
+    """Ordering key of a record: its Kafka key, or the document ``_id`` from the payload."""
+    key = getattr(record, "key", None)
+    if key is not None:
+        return key if isinstance(key, bytes) else str(key).encode("utf-8")
+    value = record.value if isinstance(record.value, dict) else {}
+    if "op" not in value and isinstance(value.get("payload"), dict):
+        value = value["payload"]
+    data = value.get("after") or value.get("before") or value.get("filter") or {}
+    if isinstance(data, (str, bytes)):
+        # Debezium's MongoDB connector sends documents as JSON strings
+        try:
+            data = json.loads(data)
+        except ValueError:
+            return data if isinstance(data, bytes) else data.encode("utf-8")
+    doc_id = _plain(data.get("_id")) if isinstance(data, dict) else None
+    return str(doc_id if doc_id is not None else "").encode("utf-8")
+
+
+class TopicStats:
+    def __init__(self, lanes: int):
+        self.lanes = lanes
+        self.events = 0
+        self.failures = 0
+        self.max_lane_events = 0
+        self.busy_ms = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "lanes": self.lanes,
+            "events": self.events,
+            "failures": self.failures,
+            "max_lane_events": self.max_lane_events,
+            "busy_ms": round(self.busy_ms, 3),
+        }
+
+
+class KeyedWorkerPool:
+    """
+    Args:
+        handler: Processes one record; raising fails the batch
+        settings (WorkerPoolSettings): Defaults to the environment
+    """
+    def __init__(self, handler: Callable[[Any], None] = process_record, settings: Optional[WorkerPoolSettings] = None):
+        self.handler = handler
+        self._settings = settings
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, TopicStats] = {}
+
+    @property
+    def settings(self) -> WorkerPoolSettings:
+        if self._settings is None:
+            self._settings = WorkerPoolSettings()
+        return self._settings
+
+    def _executor(self, topic: str) -> ThreadPoolExecutor:
+        with self._lock:
+            executor = self._executors.get(topic)
+            if executor is None:
+                lanes = self.settings.lanes_for(topic)
+                executor = ThreadPoolExecutor(max_workers=lanes, thread_name_prefix=f"cdc-{topic.rsplit('.', 1)[-1]}")
+                self._executors[topic] = executor
+                self.stats[topic] = TopicStats(lanes)
+            return executor
+
+    def _run_lane(self, topic: str, records: List[Any]) -> None:
+        stats = self.stats[topic]
+        started = time.perf_counter()
+        try:
+            for record in records:
+                self.handler(record)
+        except Exception:
+            stats.failures += 1
+            raise
+        finally:
+            stats.busy_ms += (time.perf_counter() - started) * 1000
+
+    def process_batch(self, records: List[Any]) -> None:
+        """Process a batch across the lanes and wait for all of them; raises the first lane error."""
+        lanes: Dict[Tuple[str, int], List[Any]] = {}
+        for record in records:
+            count = self.settings.lanes_for(record.topic)
+            lane = zlib.crc32(record_key(record)) % count
+            lanes.setdefault((record.topic, lane), []).append(record)
+
+        futures = []
+        for (topic, _), lane_records in lanes.items():
+            executor = self._executor(topic)
+            stats = self.stats[topic]
+            stats.events += len(lane_records)
+            stats.max_lane_events = max(stats.max_lane_events, len(lane_records))
+            futures.append(executor.submit(self._run_lane, topic, lane_records))
+
+        error: Optional[BaseException] = None
+        for future in futures:
+            # Wait for every lane, even after a failure, so no lane is still running when the batch is retried
+            exc = future.exception()
+            if exc is not None and error is None:
+                error = exc
+        if error is not None:
+            raise error
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "default_concurrency": self.settings.default_concurrency,
+            "topics": {topic: stats.as_dict() for topic, stats in self.stats.items()},
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for executor in self._executors.values():
+                executor.shutdown(wait=True)
+            self._executors.clear()
+
+
+dead_letters = DeadLetterGuard(process_record)
+cdc_workers = KeyedWorkerPool(handler=dead_letters)
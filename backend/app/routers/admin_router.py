@@ -0,0 +1,74 @@
+import logging
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, status, Header
+
+from ..container import container
+from ..database.cache import model_caches
+from ..database.indexes import index_report
+from ..pathway_pipeline.consumer import cdc_broadcast, cdc_consumer
+from ..pathway_pipeline.pipeline import broadcast_handler
+from ..pathway_pipeline.workers import cdc_workers, dead_letters
+from ..monitoring.tracing import TracedRoute
+
+router = APIRouter(
+    prefix="/admin",
+    route_class=TracedRoute,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def verify_internal_api_key(x_api_key: str = Header(...)):
+    if x_api_key != os.getenv("INTERNAL_API_KEY"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or missing API key"
+        )
+
+
+@router.get("/indexes")
+async def get_index_report_endpoint(
+    _: None = Depends(verify_internal_api_key)
+):
+    try:
+        report = await index_report()
+    except Exception as e:
+        logger.error(f"Failed to build index report: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Could not read indexes from the database"
+        )
+    return {"status": "success", "data": report}
+
+
+@router.get("/cdc")
+async def get_cdc_consumer_metrics_endpoint(
+    _: None = Depends(verify_internal_api_key)
+):
+    """CDC consumer metrics: batch sizes, processing time, commit time, lag per partition, worker lanes, dead letters and the broadcast consumer."""
+    return {
+        "status": "success",
+        "data": {
+            **cdc_consumer.metrics(),
+            "workers": cdc_workers.metrics(),
+            "dead_letters": dead_letters.metrics(),
+            "broadcast": {**cdc_broadcast.metrics(), **broadcast_handler.metrics()},
+        },
+    }
+
+
+@router.get("/cache")
+async def get_model_cache_metrics_endpoint(
+    _: None = Depends(verify_internal_api_key)
+):
+    """Model cache metrics per collection: entries, hits, misses, evictions and invalidations."""
+    return {"status": "success", "data": model_caches.metrics()}
+
+
+@router.get("/startup")
+async def get_startup_report_endpoint(
+    _: None = Depends(verify_internal_api_key)
+):
+    """Startup report of this worker: when each warm-up step started, how long it took and whether it failed."""
+    return {"status": "success", "data": {"ready": container.ready, **container.report.as_dict()}}
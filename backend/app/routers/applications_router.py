@@ -1,35 +1,48 @@
 import logging
 import os
-from typing import Optional
+from typing import Optional, List
 
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Body, Depends, HTTPException, status, Header, Query
 
-from ..models.application_model import ApplicationCreate, ApplicationUpdate
-from ..database.applications_handler import ApplicationsHandler
+from ..models.application_model import (
+    Application, ApplicationCreate, ApplicationUpdate, ApplicationFilter, ApplicationQuery,
+    ApplicationBulkUpdateItem, ApplicationBulkIds, BulkItemResult,
+)
+from ..models.projection import parse_fields
+from ..container import container
+from ..database.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from ..monitoring.tracing import TracedRoute
+from .responses import ndjson_response, success_response
 
 router = APIRouter(
     prefix="/api/applications",
+    route_class=TracedRoute,
 )
 
-applications_handler = ApplicationsHandler()
-INTERNAL_API_KEY = os.getenv("INTERNAL_API_KEY")
 logger = logging.getLogger(__name__)
 
 
 async def verify_internal_api_key(x_api_key: str = Header(...)):
-    if x_api_key != INTERNAL_API_KEY:
+    if x_api_key != os.getenv("INTERNAL_API_KEY"):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or missing API key"
         )
 
 
+def selected_fields(fields: Optional[str]):
+    try:
+        return parse_fields(Application, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.post("/create", status_code=status.HTTP_201_CREATED)
 async def create_application_endpoint(
     data: ApplicationCreate,
     _: None = Depends(verify_internal_api_key)
 ):
-    new_app = await applications_handler.create_application(data)
+    new_app = await container.applications_handler.create_application(data)
     if not new_app:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -38,12 +51,111 @@ async def create_application_endpoint(
     return {"application_id": new_app.id}
 
 
+def bulk_response(results: Optional[List[BulkItemResult]], operation: str):
+    if results is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Bulk {operation} failed"
+        )
+    succeeded = sum(1 for r in results if r.ok)
+    return {
+        "status": "success",
+        "data": {"succeeded": succeeded, "failed": len(results) - succeeded, "results": results}
+    }
+
+
+@router.post("/bulk/create")
+async def bulk_create_applications_endpoint(
+    data: List[ApplicationCreate] = Body(..., min_length=1, max_length=1000),
+    _: None = Depends(verify_internal_api_key)
+):
+    return bulk_response(await container.applications_handler.create_applications(data), "create")
+
+
+@router.put("/bulk/update")
+async def bulk_update_applications_endpoint(
+    data: List[ApplicationBulkUpdateItem] = Body(..., min_length=1, max_length=1000),
+    _: None = Depends(verify_internal_api_key)
+):
+    return bulk_response(await container.applications_handler.update_applications(data), "update")
+
+
+@router.post("/bulk/accept")
+async def bulk_accept_applications_endpoint(
+    data: ApplicationBulkIds,
+    _: None = Depends(verify_internal_api_key)
+):
+    return bulk_response(await container.applications_handler.accept_applications(data.ids), "accept")
+
+
+@router.post("/bulk/reject")
+async def bulk_reject_applications_endpoint(
+    data: ApplicationBulkIds,
+    _: None = Depends(verify_internal_api_key)
+):
+    return bulk_response(await container.applications_handler.reject_applications(data.ids), "reject")
+
+
+# Static /fetch/* routes are declared before /fetch/{application_id} so they are not shadowed
+@router.get("/fetch/all")
+async def get_all_applications_endpoint(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. companyName,stage,status"),
+    _: None = Depends(verify_internal_api_key)
+):
+    selection = selected_fields(fields)
+    # Without limit/cursor the legacy full listing is returned for existing clients
+    if limit is None and cursor is None:
+        apps = await container.applications_handler.get_all_applications(selection)
+        if apps is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No applications found"
+            )
+        return success_response(apps)
+
+    try:
+        page = await container.applications_handler.get_applications_page(limit or DEFAULT_PAGE_LIMIT, cursor, selection)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if page is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No applications found"
+        )
+    apps, next_cursor = page
+    return success_response(apps, next=next_cursor)
+
+
+@router.get("/fetch/all/stream")
+async def stream_all_applications_endpoint(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. companyName,stage,status"),
+    _: None = Depends(verify_internal_api_key)
+):
+    return ndjson_response(container.applications_handler.iter_applications(selected_fields(fields)))
+
+
+@router.get("/fetch/pending")
+async def get_pending_applications_endpoint(
+    _: None = Depends(verify_internal_api_key)
+):
+    apps = await container.applications_handler.get_pending_applications()
+    if apps is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No pending applications found"
+        )
+    return {"status": "success", "data": apps}
+
+
 @router.get("/fetch/{application_id}")
 async def get_application_endpoint(
     application_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. companyName,stage,status"),
     _: None = Depends(verify_internal_api_key)
 ):
-    app = await applications_handler.get_application_by_id(application_id)
+    app = await container.applications_handler.get_application_by_id(application_id, selected_fields(fields))
     if app is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -52,30 +164,33 @@ async def get_application_endpoint(
     return {"status": "success", "data": app}
 
 
-@router.get("/fetch/all")
-async def get_all_applications_endpoint(
+@router.get("/query")
+async def query_applications_endpoint(
+    query: ApplicationQuery = Depends(),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. companyName,stage,status"),
     _: None = Depends(verify_internal_api_key)
 ):
-    apps = await applications_handler.get_all_applications()
+    apps = await container.applications_handler.query_applications(query, selected_fields(fields))
     if apps is None:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No applications found"
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to query applications"
         )
     return {"status": "success", "data": apps}
 
 
-@router.get("/fetch/pending")
-async def get_pending_applications_endpoint(
+@router.get("/stats")
+async def get_application_stats_endpoint(
+    filters: ApplicationFilter = Depends(),
     _: None = Depends(verify_internal_api_key)
 ):
-    apps = await applications_handler.get_pending_applications()
-    if apps is None:
+    stats = await container.applications_handler.get_application_stats(filters)
+    if stats is None:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No pending applications found"
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to compute application stats"
         )
-    return {"status": "success", "data": apps}
+    return {"status": "success", "data": stats}
 
 
 @router.put("/update/{application_id}")
@@ -84,7 +199,7 @@ async def update_application_endpoint(
     data: ApplicationUpdate,
     _: None = Depends(verify_internal_api_key)
 ):
-    updated = await applications_handler.update_application(application_id, data)
+    updated = await container.applications_handler.update_application(application_id, data)
     if not updated:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -98,7 +213,7 @@ async def delete_application_endpoint(
     application_id: str,
     _: None = Depends(verify_internal_api_key)
 ):
-    ok = await applications_handler.delete_application(application_id)
+    ok = await container.applications_handler.delete_application(application_id)
     if not ok:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -112,7 +227,7 @@ async def accept_application_endpoint(
     application_id: str,
     _: None = Depends(verify_internal_api_key)
 ):
-    application, startup = await applications_handler.accept_application(application_id)
+    application, startup = await container.applications_handler.accept_application(application_id)
     if application is None or startup is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -133,7 +248,7 @@ async def reject_application_endpoint(
     application_id: str,
     _: None = Depends(verify_internal_api_key)
 ):
-    app = await applications_handler.reject_application(application_id)
+    app = await container.applications_handler.reject_application(application_id)
     if app is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -0,0 +1,190 @@
+"""
+Response serialisation benchmark.
+
+Times the body of a ``/fetch/all`` response, ``{"status": "success", "data":
+[model, ...]}``, through the two encoding paths and prints the result as JSON:
+
+    default  - what FastAPI does with a returned dict: ``jsonable_encoder``
+               over every model, then ``JSONResponse`` (``json.dumps``)
+    fast     - ``FastJSONResponse``: one pydantic-core pass over the body
+
+Models are generated from a seed, so runs with the same arguments encode the
+same documents. ``--fields`` uses the slim projection model, as ``?fields=``
+does. Each path is checked to produce the same JSON before it is timed; peak
+memory comes from one extra run per path under ``tracemalloc``.
+
+Usage:
+    python -m app.routers.benchmark --items 5000
+    python -m app.routers.benchmark --model startup --items 20000 --repeat 10
+    python -m app.routers.benchmark --fields companyName,stage,status --output fast.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from ..models.application_model import Application
+from ..models.meeting import MeetingMiniData
+from ..models.projection import parse_fields, slim_model
+from ..models.startup_model import Startup
+from .responses import FastJSONResponse
+
+MODELS = {"application": Application, "startup": Startup, "meeting": MeetingMiniData}
+STAGES = ("pre-seed", "seed", "series-a", "series-b")
+INDUSTRIES = ("fintech", "health", "climate", "ai", "consumer")
+STATUSES = ("pending", "accepted", "rejected")
+
+
+def _document(model: str, index: int, rng: random.Random, moment: datetime) -> Dict[str, Any]:
+    doc_id = f"{index:024x}"
+    if model == "application":
+        return {
+            "_id": doc_id,
+            "companyName": f"Company {index}",
+            "industry": rng.choice(INDUSTRIES),
+            "location": "Berlin",
+            "founderName": f"Founder {index}",
+            "founderContact": f"founder{index}@example.com",
+            "roundType": "equity",
+            "amountRaising": rng.randint(100, 5000) * 1000,
+            "valuation": rng.randint(1, 50) * 1_000_000,
+            "stage": rng.choice(STAGES),
+            "dateAdded": moment,
+            "source": "website",
+            "description": " ".join(rng.choice(INDUSTRIES) for _ in range(40)),
+            "keyInsight": "Strong founding team",
+            "reminders": ["follow up"],
+            "dueDiligenceSummary": {"team": rng.randint(1, 5), "market": rng.randint(1, 5), "checkedAt": moment},
+            "status": rng.choice(STATUSES),
+            "createdAt": moment,
+            "updatedAt": moment,
+        }
+    if model == "startup":
+        return {
+            "_id": doc_id,
+            "applicationId": f"{index + 1:024x}",
+            "companyName": f"Company {index}",
+            "dateAccepted": moment,
+            "context": {"industry": rng.choice(INDUSTRIES), "stage": rng.choice(STAGES)},
+        }
+    return {
+        "_id": doc_id,
+        "vc_id": f"vc-{rng.randint(1, 20)}",
+        "start_time": moment,
+        "end_time": moment + timedelta(minutes=rng.randint(15, 90)),
+        "status": "completed",
+    }
+
+
+def generate_models(model: str, count: int, seed: int = 0, fields: Optional[str] = None) -> List[BaseModel]:
+    """``count`` validated models, or their slim projection when ``fields`` is given."""
+    cls = MODELS[model]
+    selection = parse_fields(cls, fields)
+    target = slim_model(cls, selection) if selection is not None else cls
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        target.model_validate(_document(model, i, rng, start + timedelta(minutes=i)))
+        for i in range(count)
+    ]
+
+
+def encode_default(body: Dict[str, Any]) -> bytes:
+    return JSONResponse(jsonable_encoder(body)).body
+
+
+def encode_fast(body: Dict[str, Any]) -> bytes:
+    return FastJSONResponse(body).body
+
+
+PATHS: Dict[str, Callable[[Dict[str, Any]], bytes]] = {"default": encode_default, "fast": encode_fast}
+
+
+def run_once(encode: Callable[[Dict[str, Any]], bytes], body: Dict[str, Any]) -> float:
+    started = time.perf_counter()
+    encode(body)
+    return (time.perf_counter() - started) * 1000
+
+
+def peak_memory(encode: Callable[[Dict[str, Any]], bytes], body: Dict[str, Any]) -> int:
+    """Peak bytes allocated while encoding ``body`` (traced, so much slower than ``run_once``)."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        encode(body)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(models: List[BaseModel], repeat: int = 5, warmup: int = 1, memory: bool = True) -> Dict[str, Any]:
+    body = {"status": "success", "data": models}
+    outputs = {name: encode(body) for name, encode in PATHS.items()}
+    if json.loads(outputs["default"]) != json.loads(outputs["fast"]):
+        raise AssertionError("fast and default encodings differ")
+
+    result: Dict[str, Any] = {"items": len(models), "repeat": max(1, repeat), "paths": {}}
+    for name, encode in PATHS.items():
+        for _ in range(warmup):
+            run_once(encode, body)
+        timings = sorted(run_once(encode, body) for _ in range(max(1, repeat)))
+        median = statistics.median(timings)
+        size = len(outputs[name])
+        path = {
+            "median_ms": round(median, 3),
+            "min_ms": round(timings[0], 3),
+            "max_ms": round(timings[-1], 3),
+            "bytes": size,
+            "mb_per_sec": round(size / 1e6 / (median / 1000), 1) if median else 0.0,
+            "items_per_sec": round(len(models) / (median / 1000), 1) if median else 0.0,
+        }
+        if memory:
+            path["peak_memory_bytes"] = peak_memory(encode, body)
+        result["paths"][name] = path
+    fast_ms = result["paths"]["fast"]["median_ms"]
+    result["speedup"] = round(result["paths"]["default"]["median_ms"] / fast_ms, 2) if fast_ms else None
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the default and fast JSON response encoding")
+    parser.add_argument("--model", choices=sorted(MODELS), default="application")
+    parser.add_argument("--items", type=int, default=5000, help="models in the response")
+    parser.add_argument("--fields", default=None, help="encode the slim model for this ?fields= selection")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc runs")
+    parser.add_argument("--output", default=None, help="write the result to this file")
+    args = parser.parse_args()
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING"))
+
+    try:
+        models = generate_models(args.model, max(1, args.items), args.seed, args.fields)
+    except ValueError as e:
+        parser.error(str(e))
+    result = run(models, args.repeat, max(0, args.warmup), not args.no_memory)
+    result.update(model=args.model, fields=args.fields, seed=args.seed, python=platform.python_version())
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    print(json.dumps(result, indent=2))
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
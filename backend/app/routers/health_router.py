@@ -0,0 +1,41 @@
+import logging
+
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from ..container import container
+from ..monitoring.health import health_checker
+
+router = APIRouter(
+    prefix="/health",
+)
+
+logger = logging.getLogger(__name__)
+
+
+@router.get("/live")
+async def liveness_endpoint():
+    """The worker is up and serving; does not depend on the database or the warm-up."""
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def readiness_endpoint():
+    """
+    200 once the startup warm-up has succeeded and the required dependency
+    probes pass (Mongo ping, CDC consumer heartbeat, session registry), 503
+    otherwise. Probe results are cached for a short TTL.
+    """
+    if not container.ready:
+        failed = [step.name for step in container.report.steps if step.required and step.ok is False]
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "failed" if failed else "starting", "failed": failed},
+        )
+    result = await health_checker.check()
+    if not result["ready"]:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "not_ready", **result},
+        )
+    return {"status": "ready", **result}
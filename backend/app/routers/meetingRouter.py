@@ -6,20 +6,29 @@ update, deletion, and real-time WebSocket communication for audio transcription.
 
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, status, Header, WebSocket, WebSocketDisconnect
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, WebSocket, WebSocketDisconnect
 import os
 from ..models.meeting import MeetingCreationData
-from ..database.meetingHandler import MeetingHandler
+from ..container import container
+from ..database.transcript_handler import DEFAULT_TRANSCRIPT_LIMIT, MAX_TRANSCRIPT_LIMIT
+from ..database.transcript_buffer import transcript_buffers
+from ..asr.worker_pool import asr_pool
+from ..streaming.outbound import OutboundQueue, SlowConsumerError, SLOW_CONSUMER_CLOSE_CODE, outbound_queues
+from ..database.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from .responses import ndjson_response, success_response
 import asyncio
 import json
+import time
 from ..models.meeting import TranscriptChunk
+from ..monitoring.tracing import TracedRoute
 
 router = APIRouter(
     prefix="/api/meetings",
+    route_class=TracedRoute,
 )
 
-meeting_handler = MeetingHandler()
-INTERNAL_API_KEY = os.getenv("INTERNAL_API_KEY")
 logger = logging.getLogger(__name__)
 
 
@@ -34,7 +43,7 @@ async def verify_internal_api_key(x_api_key: str = Header(...)):
     Raises:
         HTTPException: 401 error if API key is invalid or missing
     """
-    if x_api_key != INTERNAL_API_KEY:
+    if x_api_key != os.getenv("INTERNAL_API_KEY"):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or missing API key"
@@ -51,7 +60,7 @@ async def create_meeting_endpoint(
     Requires INTERNAL_API_KEY in the request header: `x-api-key`.
     Returns the created meeting's ID.
     """
-    new_meeting = await meeting_handler.create_meeting(meeting_data)
+    new_meeting = await container.meeting_handler.create_meeting(meeting_data)
 
     if not new_meeting:
         raise HTTPException(
@@ -61,13 +70,61 @@ async def create_meeting_endpoint(
 
     return {"meeting_id": new_meeting.id, "vc_id": new_meeting.vc_id}
 
+# Static /fetch/* routes are declared before /fetch/{meeting_id} so they are not shadowed
+@router.get("/fetch/all")
+async def get_all_meetings_endpoint(
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+        cursor: Optional[str] = None,
+        _: None = Depends(verify_internal_api_key)
+):
+    """
+    List meetings (minimal data).
+    Without `limit`/`cursor` every meeting is returned (legacy behaviour).
+    With them, a keyset page is returned together with an opaque `next` cursor.
+    """
+    if limit is None and cursor is None:
+        logger.info("Fetching all meetings")
+        output = await container.meeting_handler.get_all_meetings()
+        if output is None:
+            logger.warning("No meetings found in database")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No meetings found"
+            )
+        logger.info(f"Successfully fetched {len(output)} meeting(s)")
+        return success_response(output)
+
+    try:
+        page = await container.meeting_handler.get_meetings_page(limit or DEFAULT_PAGE_LIMIT, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if page is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No meetings found"
+        )
+    output, next_cursor = page
+    logger.info(f"Successfully fetched page of {len(output)} meeting(s)")
+    return success_response(output, next=next_cursor)
+
+
+@router.get("/fetch/all/stream")
+async def stream_all_meetings_endpoint(
+        _: None = Depends(verify_internal_api_key)
+):
+    """
+    Stream minimal data for every meeting as NDJSON, straight from the database cursor.
+    """
+    return ndjson_response(container.meeting_handler.iter_meetings())
+
+
 @router.get("/fetch/{meeting_id}")
 async def get_meeting_endpoint(
         meeting_id: str,
         _: None = Depends(verify_internal_api_key)
 ):
 
-    output = await meeting_handler.get_meeting_by_id(meeting_id)
+    output = await container.meeting_handler.get_meeting_by_id(meeting_id)
 
     if output is None:
         raise HTTPException(
@@ -78,14 +135,70 @@ async def get_meeting_endpoint(
     return {"status": "success", "data": output}
 
 
+@router.get("/transcript/{meeting_id}")
+async def get_meeting_transcript_endpoint(
+        meeting_id: str,
+        since: Optional[float] = Query(None, description="Only chunks with a timestamp after this value"),
+        limit: int = Query(DEFAULT_TRANSCRIPT_LIMIT, ge=1, le=MAX_TRANSCRIPT_LIMIT),
+        cursor: Optional[str] = None,
+        _: None = Depends(verify_internal_api_key)
+):
+    """
+    Read a time range of a meeting's transcript.
+    Pass the returned opaque `next` as `cursor` (with the same `since`) to continue
+    reading; it is null once the stored transcript is exhausted.
+    """
+    try:
+        output = await container.transcript_handler.get_transcript(meeting_id, since, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if output is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch transcript"
+        )
+    chunks, next_cursor = output
+    return {"status": "success", "data": chunks, "next": next_cursor}
+
+@router.get("/transcript-buffers/metrics")
+async def get_transcript_buffer_metrics_endpoint(
+        _: None = Depends(verify_internal_api_key)
+):
+    """
+    Write-behind transcript buffer metrics for this worker: buffer depth and flush latency.
+    """
+    return {"status": "success", "data": transcript_buffers.metrics()}
+
+
+@router.get("/asr/metrics")
+async def get_asr_metrics_endpoint(
+        _: None = Depends(verify_internal_api_key)
+):
+    """
+    ASR worker pool metrics for this worker: queue depth, batch sizes and latency.
+    """
+    return {"status": "success", "data": asr_pool.metrics()}
+
+
+@router.get("/ws/metrics")
+async def get_ws_outbound_metrics_endpoint(
+        _: None = Depends(verify_internal_api_key)
+):
+    """
+    Outbound queue metrics of the meeting sockets on this worker: per-connection
+    queue depth, dropped/coalesced messages and send latency.
+    """
+    return {"status": "success", "data": outbound_queues.snapshot("meeting:")}
+
 
-# Placeholder ASR
+# ASR
 async def process_audio_chunk(chunk: bytes) -> str:
     """    
     Process audio chunk for speech recognition.
     
-    Placeholder function for ASR (Automatic Speech Recognition).
-    In production, integrate with services like Whisper, Google Speech-to-Text, etc.
+    Hands the chunk to the ASR worker pool, which batches chunks from all meetings
+    and runs the configured engine (ASR_ENGINE) off the event loop. Waits for
+    queue space when the pool is saturated, slowing down the calling socket.
     
     Args:
         chunk (bytes): Audio data chunk
@@ -93,8 +206,7 @@ async def process_audio_chunk(chunk: bytes) -> str:
     Returns:
         str: Transcribed text from audio
     """
-    await asyncio.sleep(0.05)  # simulate processing delay
-    return "transcribed text from audio chunk"
+    return await asr_pool.transcribe(chunk)
 
 # Placeholder chatbot
 async def process_chat_query(text: str) -> str:
@@ -121,25 +233,23 @@ async def meeting_ws(
     x_api_key: str
 ):
     # Auth check
-    if x_api_key != INTERNAL_API_KEY:
+    if x_api_key != os.getenv("INTERNAL_API_KEY"):
         await ws.close(code=1008)
         return
 
     await ws.accept()
     print(f"Client connected for meeting {meeting_id}")
 
-    send_queue = asyncio.Queue()
-
-    async def backend_push_task():
-        while True:
-            msg = await send_queue.get()
-            await ws.send_json(msg)
-
-    push_task = asyncio.create_task(backend_push_task())
+    # Bounded send queue; a slow client gets coalesced/dropped messages instead of unbounded memory
+    send_queue = OutboundQueue(ws, f"meeting:{meeting_id}").start()
+    # Transcript chunks are written behind the socket and flushed in batches
+    transcript_buffer = transcript_buffers.acquire(meeting_id, container.transcript_handler)
 
     try:
         while True:
             message = await ws.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
 
             if "text" in message:
                 try:
@@ -148,56 +258,60 @@ async def meeting_ws(
                     data = payload.get("data")
 
                     if msg_type == "control":
-                        await send_queue.put({
+                        send_queue.put({
                             "type": "control_ack",
                             "data": {"status": "ok", "received": data}
                         })
 
                     elif msg_type == "chat":
                         reply = await process_chat_query(data)
-                        await send_queue.put({
+                        send_queue.put({
                             "type": "chat_response",
                             "data": reply
                         })
 
                     else:
-                        await send_queue.put({"type": "error", "data": "Unknown text message type"})
+                        send_queue.put({"type": "error", "data": "Unknown text message type"})
                 except json.JSONDecodeError:
-                    await send_queue.put({"type": "error", "data": "Invalid JSON"})
+                    send_queue.put({"type": "error", "data": "Invalid JSON"})
 
             elif "bytes" in message:
                 audio_chunk = message["bytes"]
                 transcript_text = await process_audio_chunk(audio_chunk)
 
-                # Save transcript to MongoDB
+                # Queue transcript chunk; flushed to the transcripts collection by size or time
                 transcript_obj = TranscriptChunk(
-                    timestamp=asyncio.get_event_loop().time(),
+                    timestamp=time.time(),
                     text=transcript_text
                 )
-                await meeting_handler.meetings_collection.update_one(
-                    {"_id": meeting_id},
-                    {"$push": {"transcript": transcript_obj.model_dump()}}
-                )
+                await transcript_buffer.add(transcript_obj)
 
-                await send_queue.put({
+                send_queue.put({
                     "type": "transcript",
                     "data": transcript_text
                 })
 
     except WebSocketDisconnect:
         print(f"Client disconnected from meeting {meeting_id}")
+    except SlowConsumerError as e:
+        logger.warning(f"Closing meeting {meeting_id} socket: {e}")
     except Exception as e:
         print(f"WebSocket error: {e}")
     finally:
-        push_task.cancel()
-        await ws.close()
+        await send_queue.close()
+        await transcript_buffers.release(meeting_id)
+        try:
+            await ws.close(code=SLOW_CONSUMER_CLOSE_CODE if send_queue.overflowed else 1000)
+        except RuntimeError:
+            # Already closed by the client
+            pass
 
 @router.get("/fetch_by_vc/{vc_id}")
 async def get_meetings_by_vc_endpoint(
         vc_id: str,
         _: None = Depends(verify_internal_api_key)
 ):
-    output = await meeting_handler.get_meetings_by_vc_id(vc_id)
+    output = await container.meeting_handler.get_meetings_by_vc_id(vc_id)
 
     if output is None:
         raise HTTPException(
@@ -212,7 +326,7 @@ async def update_meeting_endpoint(
         meeting: MeetingCreationData,
         _: None = Depends(verify_internal_api_key)
 ):
-    success = await meeting_handler.update_meeting(meeting)
+    success = await container.meeting_handler.update_meeting(meeting)
 
     if not success:
         logger.error(f"Failed to update Meeting with ID: {meeting.id}")
@@ -230,7 +344,7 @@ async def delete_meeting_endpoint(
         meeting_id: str,
         _: None = Depends(verify_internal_api_key)
 ):
-    meeting = await meeting_handler.get_meeting_by_id(meeting_id)
+    meeting = await container.meeting_handler.get_meeting_by_id(meeting_id)
     logger.info(f"Deleting meeting with ID: {meeting.id}")
     if not meeting:
         logger.warning(f"Meeting with ID: {meeting.id} not found")
@@ -239,8 +353,7 @@ async def delete_meeting_endpoint(
             detail="Meeting not found"
         )
 
-    success = await meeting_handler.delete_meeting(meeting)
-
+    success = await container.meeting_handler.delete_meeting(meeting)
 
     if not success:
         logger.error(f"Meeting with ID: {meeting.id} not found")
@@ -249,20 +362,6 @@ async def delete_meeting_endpoint(
             detail="Failed to delete meeting"
         )
 
-    logger.info(f"Meeting with ID: {meeting.id} deleted successfully")
+    deleted_chunks = await container.transcript_handler.delete_transcript(meeting.id)
+    logger.info(f"Meeting with ID: {meeting.id} deleted successfully ({deleted_chunks} transcript chunk(s) removed)")
     return {"status": "success", "message": "Meeting deleted successfully"}
-
-@router.get("/fetch/all")
-async def get_all_meetings_endpoint(
-        _: None = Depends(verify_internal_api_key)
-):
-    logger.info("Fetching all meetings")
-    output = await meeting_handler.get_all_meetings()
-    if output is None:
-        logger.warning("No meetings found in database")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No meetings found"
-        )
-    logger.info(f"Successfully fetched {len(output)} meeting(s)")
-    return {"status": "success", "data": output}
\ No newline at end of file
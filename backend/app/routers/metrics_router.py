@@ -0,0 +1,23 @@
+import logging
+
+from fastapi import APIRouter, HTTPException, Response, status
+
+from ..monitoring.collectors import register_collectors
+from ..monitoring.metrics import CONTENT_TYPE, metrics_registry
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+register_collectors()
+
+
+@router.get("/metrics")
+async def get_metrics_endpoint():
+    """Prometheus text exposition of this worker's metrics (unauthenticated, for the scraper)."""
+    if not metrics_registry.enabled:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Metrics are disabled"
+        )
+    return Response(content=metrics_registry.render(), media_type=CONTENT_TYPE)
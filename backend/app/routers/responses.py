@@ -0,0 +1,74 @@
+"""
+Shared response helpers for the routers.
+"""
+
+import logging
+import os
+from typing import Any, AsyncIterator, Dict, Optional, Union
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class ResponseSettings:
+    def __init__(self):
+        self.fast_json = os.getenv("FAST_JSON_RESPONSES", "true").lower() in ("1", "true", "yes")
+
+
+_settings: Optional[ResponseSettings] = None
+
+
+def response_settings() -> ResponseSettings:
+    # Read lazily so values loaded from .env by load_config() are honoured
+    global _settings
+    if _settings is None:
+        _settings = ResponseSettings()
+    return _settings
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered by pydantic-core in one pass, models included, in the
+    manner of ``ORJSONResponse``. Return it from the endpoint so FastAPI skips
+    ``jsonable_encoder``. Models are written by alias with their own serializers
+    (``json_encoders`` included), so the body matches the default path; values
+    pydantic-core does not know fall back to ``jsonable_encoder``.
+    """
+    def render(self, content: Any) -> bytes:
+        return to_json(content, by_alias=True, inf_nan_mode="null", fallback=jsonable_encoder)
+
+
+async def _ndjson_lines(models: AsyncIterator[BaseModel]) -> AsyncIterator[bytes]:
+    count = 0
+    try:
+        async for model in models:
+            count += 1
+            yield model.model_dump_json(by_alias=True).encode("utf-8") + b"\n"
+    except Exception as e:
+        # Headers are already sent; log and end the stream early
+        logger.error(f"NDJSON stream aborted after {count} item(s): {e}", exc_info=True)
+    else:
+        logger.info(f"NDJSON stream completed with {count} item(s)")
+
+
+def ndjson_response(models: AsyncIterator[BaseModel]) -> StreamingResponse:
+    """Stream models as newline-delimited JSON, one document per line."""
+    return StreamingResponse(_ndjson_lines(models), media_type=NDJSON_MEDIA_TYPE)
+
+
+def success_response(data: Any, **extra: Any) -> Union[FastJSONResponse, Dict[str, Any]]:
+    """
+    ``{"status": "success", "data": ...}`` for endpoints that return large model
+    lists. Rendered by ``FastJSONResponse`` unless ``FAST_JSON_RESPONSES=false``,
+    in which case the dict goes through FastAPI's usual encoding.
+    """
+    body = {"status": "success", "data": data, **extra}
+    if not response_settings().fast_json:
+        return body
+    return FastJSONResponse(body)
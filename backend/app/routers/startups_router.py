@@ -1,34 +1,45 @@
 import logging
 import os
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
 
-from ..models.startup_model import StartupCreate, StartupUpdate
-from ..database.startups_handler import StartupsHandler
+from ..models.startup_model import Startup, StartupCreate, StartupUpdate
+from ..models.projection import parse_fields
+from ..container import container
+from ..database.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from ..monitoring.tracing import TracedRoute
+from .responses import ndjson_response, success_response
 
 router = APIRouter(
     prefix="/api/startups",
+    route_class=TracedRoute,
 )
 
-startups_handler = StartupsHandler()
-INTERNAL_API_KEY = os.getenv("INTERNAL_API_KEY")
 logger = logging.getLogger(__name__)
 
 
 async def verify_internal_api_key(x_api_key: str = Header(...)):
-    if x_api_key != INTERNAL_API_KEY:
+    if x_api_key != os.getenv("INTERNAL_API_KEY"):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or missing API key"
         )
 
 
+def selected_fields(fields: Optional[str]):
+    try:
+        return parse_fields(Startup, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.post("/create", status_code=status.HTTP_201_CREATED)
 async def create_startup_endpoint(
     data: StartupCreate,
     _: None = Depends(verify_internal_api_key)
 ):
-    new_startup = await startups_handler.create_startup(data)
+    new_startup = await container.startups_handler.create_startup(data)
     if not new_startup:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -37,31 +48,59 @@ async def create_startup_endpoint(
     return {"startup_id": new_startup.id}
 
 
-@router.get("/fetch/{startup_id}")
-async def get_startup_endpoint(
-    startup_id: str,
+# Static /fetch/* routes are declared before /fetch/{startup_id} so they are not shadowed
+@router.get("/fetch/all")
+async def get_all_startups_endpoint(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. companyName,dateAccepted"),
     _: None = Depends(verify_internal_api_key)
 ):
-    st = await startups_handler.get_startup_by_id(startup_id)
-    if st is None:
+    selection = selected_fields(fields)
+    # Without limit/cursor the legacy full listing is returned for existing clients
+    if limit is None and cursor is None:
+        sts = await container.startups_handler.get_all_startups(selection)
+        if sts is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No startups found"
+            )
+        return success_response(sts)
+
+    try:
+        page = await container.startups_handler.get_startups_page(limit or DEFAULT_PAGE_LIMIT, cursor, selection)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if page is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Startup not found"
+            detail="No startups found"
         )
-    return {"status": "success", "data": st}
+    sts, next_cursor = page
+    return success_response(sts, next=next_cursor)
 
 
-@router.get("/fetch/all")
-async def get_all_startups_endpoint(
+@router.get("/fetch/all/stream")
+async def stream_all_startups_endpoint(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. companyName,dateAccepted"),
+    _: None = Depends(verify_internal_api_key)
+):
+    return ndjson_response(container.startups_handler.iter_startups(selected_fields(fields)))
+
+
+@router.get("/fetch/{startup_id}")
+async def get_startup_endpoint(
+    startup_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. companyName,dateAccepted"),
     _: None = Depends(verify_internal_api_key)
 ):
-    sts = await startups_handler.get_all_startups()
-    if sts is None:
+    st = await container.startups_handler.get_startup_by_id(startup_id, selected_fields(fields))
+    if st is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="No startups found"
+            detail="Startup not found"
         )
-    return {"status": "success", "data": sts}
+    return {"status": "success", "data": st}
 
 
 @router.put("/update/{startup_id}")
@@ -70,7 +109,7 @@ async def update_startup_endpoint(
     data: StartupUpdate,
     _: None = Depends(verify_internal_api_key)
 ):
-    updated = await startups_handler.update_startup(startup_id, data)
+    updated = await container.startups_handler.update_startup(startup_id, data)
     if not updated:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -84,7 +123,7 @@ async def delete_startup_endpoint(
     startup_id: str,
     _: None = Depends(verify_internal_api_key)
 ):
-    ok = await startups_handler.delete_startup(startup_id)
+    ok = await container.startups_handler.delete_startup(startup_id)
     if not ok:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
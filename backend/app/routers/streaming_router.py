@@ -7,19 +7,19 @@ Supports three independent streams: Video, System Audio, and Microphone Audio.
 import logging
 import os
 import asyncio
-import json
-from datetime import datetime
-from typing import Dict, Optional
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Header, HTTPException, status, Depends
+from fastapi import APIRouter, WebSocket, Header, HTTPException, status, Depends
 
-logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/streaming")
+from ..streaming.ingestion import frame_transcriber, ingestion_engine
+from ..streaming.recording import recording_sink
+from ..streaming.alignment import alignment_stage
+from ..streaming.outbound import outbound_queues
+from ..streaming.sessions import session_registry
+from ..monitoring.tracing import TracedRoute
 
-# Store active streaming sessions
-active_sessions: Dict[str, dict] = {}
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/streaming", route_class=TracedRoute)
 
 # Get internal API key from environment
-INTERNAL_API_KEY = os.getenv("INTERNAL_API_KEY")
 
 
 def verify_internal_api_key(x_api_key: str = Header(...)):
@@ -32,7 +32,7 @@ def verify_internal_api_key(x_api_key: str = Header(...)):
     Raises:
         HTTPException: If API key is invalid or missing
     """
-    if x_api_key != INTERNAL_API_KEY:
+    if x_api_key != os.getenv("INTERNAL_API_KEY"):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or missing API key"
@@ -60,87 +60,7 @@ async def video_stream_websocket(websocket: WebSocket, session_id: str):
         - JSON status updates: {"type": "status", "message": "...", "received_bytes": int}
         - JSON errors: {"type": "error", "message": "..."}
     """
-    await websocket.accept()
-    logger.info(f"Video stream connected for session {session_id}")
-    
-    # Initialize session tracking
-    if session_id not in active_sessions:
-        active_sessions[session_id] = {
-            "video": {"connected": True, "bytes_received": 0, "chunks": 0},
-            "system_audio": {"connected": False, "bytes_received": 0, "chunks": 0},
-            "microphone": {"connected": False, "bytes_received": 0, "chunks": 0},
-            "start_time": datetime.now().isoformat()
-        }
-    else:
-        active_sessions[session_id]["video"]["connected"] = True
-    
-    total_bytes = 0
-    chunk_count = 0
-    
-    try:
-        while True:
-            # Receive data from client
-            message = await websocket.receive()
-            
-            if "bytes" in message:
-                # Binary video data
-                video_chunk = message["bytes"]
-                chunk_size = len(video_chunk)
-                total_bytes += chunk_size
-                chunk_count += 1
-                
-                # Update session stats
-                active_sessions[session_id]["video"]["bytes_received"] = total_bytes
-                active_sessions[session_id]["video"]["chunks"] = chunk_count
-                
-                # TODO: Process video chunk (e.g., save to file, analyze, compress)
-                # For now, just log receipt
-                if chunk_count % 10 == 0:  # Log every 10th chunk to avoid spam
-                    logger.debug(f"Session {session_id} - Video: {chunk_count} chunks, {total_bytes} bytes")
-                    await websocket.send_json({
-                        "type": "status",
-                        "message": "Video chunk received",
-                        "received_bytes": total_bytes,
-                        "chunk_count": chunk_count
-                    })
-                    
-            elif "text" in message:
-                # Control message
-                try:
-                    data = json.loads(message["text"])
-                    msg_type = data.get("type")
-                    
-                    if msg_type == "control":
-                        action = data.get("action")
-                        logger.info(f"Video stream control: {action} for session {session_id}")
-                        await websocket.send_json({
-                            "type": "control_ack",
-                            "action": action,
-                            "status": "ok"
-                        })
-                    elif msg_type == "end":
-                        logger.info(f"Video stream end signal for session {session_id}")
-                        break
-                except json.JSONDecodeError:
-                    await websocket.send_json({
-                        "type": "error",
-                        "message": "Invalid JSON in control message"
-                    })
-                    
-    except WebSocketDisconnect:
-        logger.info(f"Video stream disconnected for session {session_id}")
-    except Exception as e:
-        logger.error(f"Video stream error for session {session_id}: {e}")
-        try:
-            await websocket.send_json({"type": "error", "message": str(e)})
-        except:
-            pass
-    finally:
-        # Clean up
-        if session_id in active_sessions:
-            active_sessions[session_id]["video"]["connected"] = False
-        await websocket.close()
-        logger.info(f"Video stream closed for session {session_id}. Total: {total_bytes} bytes, {chunk_count} chunks")
+    await ingestion_engine.handle(websocket, session_id, "video")
 
 
 @router.websocket("/ws/system-audio/{session_id}")
@@ -164,83 +84,7 @@ async def system_audio_stream_websocket(websocket: WebSocket, session_id: str):
         - JSON status updates: {"type": "status", "message": "...", "received_bytes": int}
         - JSON errors: {"type": "error", "message": "..."}
     """
-    await websocket.accept()
-    logger.info(f"System audio stream connected for session {session_id}")
-    
-    # Initialize or update session tracking
-    if session_id not in active_sessions:
-        active_sessions[session_id] = {
-            "video": {"connected": False, "bytes_received": 0, "chunks": 0},
-            "system_audio": {"connected": True, "bytes_received": 0, "chunks": 0},
-            "microphone": {"connected": False, "bytes_received": 0, "chunks": 0},
-            "start_time": datetime.now().isoformat()
-        }
-    else:
-        active_sessions[session_id]["system_audio"]["connected"] = True
-    
-    total_bytes = 0
-    chunk_count = 0
-    
-    try:
-        while True:
-            message = await websocket.receive()
-            
-            if "bytes" in message:
-                # Binary audio data
-                audio_chunk = message["bytes"]
-                chunk_size = len(audio_chunk)
-                total_bytes += chunk_size
-                chunk_count += 1
-                
-                # Update session stats
-                active_sessions[session_id]["system_audio"]["bytes_received"] = total_bytes
-                active_sessions[session_id]["system_audio"]["chunks"] = chunk_count
-                
-                # TODO: Process system audio chunk (e.g., save, transcribe, analyze)
-                if chunk_count % 10 == 0:
-                    logger.debug(f"Session {session_id} - System Audio: {chunk_count} chunks, {total_bytes} bytes")
-                    await websocket.send_json({
-                        "type": "status",
-                        "message": "System audio chunk received",
-                        "received_bytes": total_bytes,
-                        "chunk_count": chunk_count
-                    })
-                    
-            elif "text" in message:
-                try:
-                    data = json.loads(message["text"])
-                    msg_type = data.get("type")
-                    
-                    if msg_type == "control":
-                        action = data.get("action")
-                        logger.info(f"System audio control: {action} for session {session_id}")
-                        await websocket.send_json({
-                            "type": "control_ack",
-                            "action": action,
-                            "status": "ok"
-                        })
-                    elif msg_type == "end":
-                        logger.info(f"System audio stream end for session {session_id}")
-                        break
-                except json.JSONDecodeError:
-                    await websocket.send_json({
-                        "type": "error",
-                        "message": "Invalid JSON"
-                    })
-                    
-    except WebSocketDisconnect:
-        logger.info(f"System audio disconnected for session {session_id}")
-    except Exception as e:
-        logger.error(f"System audio error for session {session_id}: {e}")
-        try:
-            await websocket.send_json({"type": "error", "message": str(e)})
-        except:
-            pass
-    finally:
-        if session_id in active_sessions:
-            active_sessions[session_id]["system_audio"]["connected"] = False
-        await websocket.close()
-        logger.info(f"System audio closed for session {session_id}. Total: {total_bytes} bytes, {chunk_count} chunks")
+    await ingestion_engine.handle(websocket, session_id, "system_audio")
 
 
 @router.websocket("/ws/microphone/{session_id}")
@@ -262,87 +106,11 @@ async def microphone_stream_websocket(websocket: WebSocket, session_id: str):
         
         Server sends:
         - JSON status updates: {"type": "status", "message": "...", "received_bytes": int}
-        - JSON transcripts (if ASR enabled): {"type": "transcript", "text": "..."}
+        - JSON transcripts of both audio streams (if ALIGNMENT_ENABLED):
+          {"type": "transcript", "stream": "microphone|system_audio", "text": "...", "start_ms": float, "end_ms": float}
         - JSON errors: {"type": "error", "message": "..."}
     """
-    await websocket.accept()
-    logger.info(f"Microphone stream connected for session {session_id}")
-    
-    # Initialize or update session tracking
-    if session_id not in active_sessions:
-        active_sessions[session_id] = {
-            "video": {"connected": False, "bytes_received": 0, "chunks": 0},
-            "system_audio": {"connected": False, "bytes_received": 0, "chunks": 0},
-            "microphone": {"connected": True, "bytes_received": 0, "chunks": 0},
-            "start_time": datetime.now().isoformat()
-        }
-    else:
-        active_sessions[session_id]["microphone"]["connected"] = True
-    
-    total_bytes = 0
-    chunk_count = 0
-    
-    try:
-        while True:
-            message = await websocket.receive()
-            
-            if "bytes" in message:
-                # Binary audio data
-                audio_chunk = message["bytes"]
-                chunk_size = len(audio_chunk)
-                total_bytes += chunk_size
-                chunk_count += 1
-                
-                # Update session stats
-                active_sessions[session_id]["microphone"]["bytes_received"] = total_bytes
-                active_sessions[session_id]["microphone"]["chunks"] = chunk_count
-                
-                # TODO: Process microphone audio (e.g., transcribe with ASR, save, analyze)
-                # TODO: Integrate with ASR service (Whisper, Google Speech-to-Text, etc.)
-                if chunk_count % 10 == 0:
-                    logger.debug(f"Session {session_id} - Microphone: {chunk_count} chunks, {total_bytes} bytes")
-                    await websocket.send_json({
-                        "type": "status",
-                        "message": "Microphone chunk received",
-                        "received_bytes": total_bytes,
-                        "chunk_count": chunk_count
-                    })
-                    
-            elif "text" in message:
-                try:
-                    data = json.loads(message["text"])
-                    msg_type = data.get("type")
-                    
-                    if msg_type == "control":
-                        action = data.get("action")
-                        logger.info(f"Microphone control: {action} for session {session_id}")
-                        await websocket.send_json({
-                            "type": "control_ack",
-                            "action": action,
-                            "status": "ok"
-                        })
-                    elif msg_type == "end":
-                        logger.info(f"Microphone stream end for session {session_id}")
-                        break
-                except json.JSONDecodeError:
-                    await websocket.send_json({
-                        "type": "error",
-                        "message": "Invalid JSON"
-                    })
-                    
-    except WebSocketDisconnect:
-        logger.info(f"Microphone disconnected for session {session_id}")
-    except Exception as e:
-        logger.error(f"Microphone error for session {session_id}: {e}")
-        try:
-            await websocket.send_json({"type": "error", "message": str(e)})
-        except:
-            pass
-    finally:
-        if session_id in active_sessions:
-            active_sessions[session_id]["microphone"]["connected"] = False
-        await websocket.close()
-        logger.info(f"Microphone closed for session {session_id}. Total: {total_bytes} bytes, {chunk_count} chunks")
+    await ingestion_engine.handle(websocket, session_id, "microphone")
 
 
 @router.get("/session/{session_id}/status")
@@ -362,7 +130,8 @@ async def get_session_status(session_id: str, _: None = Depends(verify_internal_
     Raises:
         HTTPException: If session not found
     """
-    if session_id not in active_sessions:
+    session_info = await session_registry.get(session_id)
+    if session_info is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Session {session_id} not found"
@@ -372,7 +141,65 @@ async def get_session_status(session_id: str, _: None = Depends(verify_internal_
         "status": "success",
         "data": {
             "session_id": session_id,
-            "session_info": active_sessions[session_id]
+            "session_info": session_info
+        }
+    }
+
+
+@router.get("/session/{session_id}/recording")
+async def get_session_recording(session_id: str, _: None = Depends(verify_internal_api_key)):
+    """
+    Get the recording manifest of a streaming session.
+    
+    The manifest lists, per stream, the segment files in order with their sizes,
+    so a recording can be replayed by concatenating each stream's segments.
+    
+    Args:
+        session_id: The session ID to query
+        
+    Returns:
+        dict: The session's recording manifest
+        
+    Raises:
+        HTTPException: If no recording exists for the session
+    """
+    manifest = await asyncio.to_thread(recording_sink.read_manifest, session_id)
+    if manifest is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No recording found for session {session_id}"
+        )
+    
+    return {
+        "status": "success",
+        "data": manifest
+    }
+
+
+@router.get("/metrics")
+async def get_streaming_metrics(_: None = Depends(verify_internal_api_key)):
+    """
+    Get ingestion counters for the streaming sockets of this worker.
+    
+    Returns, per stream type, connections, chunks and bytes received, chunks
+    processed, processor errors and the deepest per-stream queue seen so far.
+    Also reports the session registry backend, how many sessions it holds and
+    the outbound queue (depth, drops, send latency) of every connected stream,
+    the alignment stage's frame and buffer counters, the transcription of
+    aligned audio frames, and the recording sink's failed writes.
+    
+    Returns:
+        dict: Ingestion engine metrics
+    """
+    return {
+        "status": "success",
+        "data": {
+            **ingestion_engine.metrics(),
+            "sessions": await session_registry.metrics(),
+            "outbound": outbound_queues.snapshot("streaming:"),
+            "alignment": alignment_stage.metrics(),
+            "transcription": frame_transcriber.metrics(),
+            "recording": recording_sink.metrics(),
         }
     }
 
@@ -382,6 +209,9 @@ async def terminate_session(session_id: str, _: None = Depends(verify_internal_a
     """
     Terminate a streaming session and clean up resources.
     
+    Connected streams, on whichever worker they run, close at their next
+    status tick.
+    
     Args:
         session_id: The session ID to terminate
         
@@ -391,14 +221,12 @@ async def terminate_session(session_id: str, _: None = Depends(verify_internal_a
     Raises:
         HTTPException: If session not found
     """
-    if session_id not in active_sessions:
+    if not await session_registry.terminate(session_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Session {session_id} not found"
         )
     
-    # Remove session from active sessions
-    del active_sessions[session_id]
     logger.info(f"Session {session_id} terminated and cleaned up")
     
     return {
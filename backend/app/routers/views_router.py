@@ -0,0 +1,65 @@
+import logging
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
+
+from ..pathway_pipeline.views import materialized_views
+from ..monitoring.tracing import TracedRoute
+
+router = APIRouter(
+    prefix="/api/views",
+    route_class=TracedRoute,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def verify_internal_api_key(x_api_key: str = Header(...)):
+    if x_api_key != os.getenv("INTERNAL_API_KEY"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or missing API key"
+        )
+
+
+# Served from memory; kept current by the CDC pipeline (see pathway_pipeline/views.py)
+@router.get("/applications")
+async def get_applications_view_endpoint(
+    _: None = Depends(verify_internal_api_key)
+):
+    """Application counts by status, stage and industry."""
+    return {"status": "success", "data": materialized_views.applications_view()}
+
+
+@router.get("/meetings")
+async def get_meetings_view_endpoint(
+    _: None = Depends(verify_internal_api_key)
+):
+    """Meeting counts per VC."""
+    return {"status": "success", "data": materialized_views.meetings_view()}
+
+
+@router.get("/accept-rate")
+async def get_accept_rate_view_endpoint(
+    days: Optional[int] = Query(None, ge=1, description="Only the most recent N days with decisions"),
+    _: None = Depends(verify_internal_api_key)
+):
+    """Accepted and rejected decisions per day, with the accept rate per day and overall."""
+    return {"status": "success", "data": materialized_views.accept_rate_view(days)}
+
+
+@router.get("")
+async def get_all_views_endpoint(
+    _: None = Depends(verify_internal_api_key)
+):
+    """Every view in one response, plus how many events have been applied."""
+    return {
+        "status": "success",
+        "data": {
+            "applications": materialized_views.applications_view(),
+            "meetings": materialized_views.meetings_view(),
+            "acceptRate": materialized_views.accept_rate_view(),
+            "pipeline": materialized_views.metrics(),
+        }
+    }
@@ -0,0 +1,297 @@
+"""
+Stream Alignment Stage
+
+Puts the video, system-audio and microphone streams of a session on one
+timeline. Every chunk is stamped with its arrival time (``time.monotonic()``,
+taken when the socket received it) and buffered per track. Once a frame
+window of ``ALIGNMENT_FRAME_MS`` is older than the jitter window
+(``ALIGNMENT_JITTER_MS``), the chunks of every track that arrived inside it
+are cut out and emitted together as one ``AlignedFrame``:
+
+    frame 12  [1200ms, 1300ms)  video: 18 KiB  system_audio: 1 KiB  microphone: 1 KiB
+
+Frames are handed to subscribers (``alignment_stage.subscribe``), which is
+where diarisation or recording export plug in. Windows with no data on any
+track are skipped, so ``index`` may jump.
+
+The stage is off unless ``ALIGNMENT_ENABLED`` is set, and while nothing is
+subscribed chunks are counted as skipped instead of buffered, so an enabled
+stage without a consumer costs no memory.
+
+Track buffers are a ``bytearray`` plus ``array`` columns of chunk end offsets
+and arrival times, trimmed in place as frames are cut, so a session's memory
+stays bounded by the jitter window however long it runs. A chunk processed
+after its window was already emitted is counted as late and goes into the
+next frame.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from array import array
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AlignmentSettings:
+    def __init__(self):
+        self.enabled = os.getenv("ALIGNMENT_ENABLED", "false").lower() in ("1", "true", "yes")
+        self.frame = max(1.0, float(os.getenv("ALIGNMENT_FRAME_MS", "100"))) / 1000
+        self.jitter = max(0.0, float(os.getenv("ALIGNMENT_JITTER_MS", "250"))) / 1000
+
+
+class AlignedFrame:
+    """
+    One window of a session's timeline.
+
+    Args:
+        session_id (str): Session the frame belongs to
+        index (int): Window number since the session started
+        start_ms (float): Window start, relative to the session start
+        end_ms (float): Window end, relative to the session start
+        tracks (Dict[str, bytes]): Bytes each track received inside the window
+    """
+    __slots__ = ("session_id", "index", "start_ms", "end_ms", "tracks")
+
+    def __init__(self, session_id: str, index: int, start_ms: float, end_ms: float, tracks: Dict[str, bytes]):
+        self.session_id = session_id
+        self.index = index
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.tracks = tracks
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "start_ms": round(self.start_ms, 3),
+            "end_ms": round(self.end_ms, 3),
+            "tracks": {stream: len(data) for stream, data in self.tracks.items()},
+        }
+
+
+FrameSubscriber = Callable[[AlignedFrame], Awaitable[None]]
+
+
+class TrackBuffer:
+    """
+    Pending bytes of one track. ``ends`` holds the cumulative end offset of
+    each chunk (counted since the track started, hence ``base``) and
+    ``stamps`` its arrival time.
+    """
+    __slots__ = ("data", "ends", "stamps", "base")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.ends = array("q")
+        self.stamps = array("d")
+        self.base = 0
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def append(self, chunk: bytes, stamp: float) -> None:
+        self.data += chunk
+        self.ends.append(self.base + len(self.data))
+        self.stamps.append(stamp)
+
+    def first_stamp(self) -> Optional[float]:
+        return self.stamps[0] if self.stamps else None
+
+    def cut(self, until: float, materialise: bool) -> bytes:
+        """Remove the chunks that arrived before ``until``; return their bytes if ``materialise``."""
+        count = bisect_left(self.stamps, until)
+        if count == 0:
+            return b""
+        end = self.ends[count - 1] - self.base
+        out = b""
+        if materialise:
+            with memoryview(self.data) as view, view[:end] as part:
+                out = bytes(part)
+        del self.data[:end]
+        del self.ends[:count]
+        del self.stamps[:count]
+        self.base += end
+        return out
+
+
+class SessionAligner:
+    def __init__(self, session_id: str, settings: AlignmentSettings, stage: "AlignmentStage"):
+        self.session_id = session_id
+        self.settings = settings
+        self.stage = stage
+        self.origin = time.monotonic()
+        self.emitted_until = self.origin
+        self.tracks: Dict[str, TrackBuffer] = {}
+        self.open_tracks: set = set()
+        self._lock = asyncio.Lock()
+        self._ticker: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._ticker = asyncio.create_task(self._tick())
+
+    async def _tick(self) -> None:
+        # Keeps frames flowing when every track goes quiet at once
+        while True:
+            await asyncio.sleep(self.settings.frame)
+            try:
+                await self.advance(time.monotonic())
+            except Exception as e:
+                logger.error(f"Alignment tick failed for session {self.session_id}: {e}", exc_info=True)
+
+    def push(self, stream: str, chunk: bytes, stamp: float) -> None:
+        track = self.tracks.get(stream)
+        if track is None:
+            track = self.tracks[stream] = TrackBuffer()
+        if stamp < self.emitted_until:
+            # Its window is already out; keep it in order at the head of the next one
+            self.stage.late_chunks += 1
+            stamp = self.emitted_until
+        track.append(chunk, stamp)
+        self.stage.note_buffered(len(chunk))
+
+    def _due_frames(self, now: float, final: bool) -> List[AlignedFrame]:
+        frame, jitter = self.settings.frame, self.settings.jitter
+        materialise = bool(self.stage.subscribers)
+        frames: List[AlignedFrame] = []
+        while True:
+            end = self.emitted_until + frame
+            if not final and end + jitter > now:
+                break
+            stamps = [s for s in (track.first_stamp() for track in self.tracks.values()) if s is not None]
+            if not stamps:
+                if not final:
+                    # Nothing buffered: move along the frame grid without emitting empty frames
+                    self.emitted_until += int((now - jitter - self.emitted_until) // frame) * frame
+                break
+            first = min(stamps)
+            if first >= end:
+                self.emitted_until += int((first - self.emitted_until) // frame) * frame
+                continue
+            start = self.emitted_until
+            tracks = {stream: track.cut(end, materialise) for stream, track in self.tracks.items()}
+            frames.append(AlignedFrame(
+                self.session_id,
+                int(round((start - self.origin) / frame)),
+                (start - self.origin) * 1000,
+                (end - self.origin) * 1000,
+                tracks,
+            ))
+            self.emitted_until = end
+        return frames
+
+    async def advance(self, now: float, final: bool = False) -> None:
+        async with self._lock:
+            before = self.buffered_bytes
+            frames = self._due_frames(now, final)
+            self.stage.note_released(before - self.buffered_bytes)
+            for aligned in frames:
+                await self.stage.emit(aligned)
+
+    @property
+    def buffered_bytes(self) -> int:
+        return sum(len(track) for track in self.tracks.values())
+
+    async def close(self) -> None:
+        if self._ticker is not None:
+            self._ticker.cancel()
+            try:
+                await self._ticker
+            except asyncio.CancelledError:
+                pass
+            self._ticker = None
+        await self.advance(time.monotonic(), final=True)
+
+
+class AlignmentStage:
+    """Per-session aligners of this worker, fed by the ingestion engine's alignment processor."""
+    def __init__(self, settings: Optional[AlignmentSettings] = None):
+        self._settings = settings
+        self.sessions: Dict[str, SessionAligner] = {}
+        self.subscribers: List[FrameSubscriber] = []
+        self.frames = 0
+        self.frame_bytes = 0
+        self.late_chunks = 0
+        self.skipped_chunks = 0
+        self.buffered_bytes = 0
+        self.max_buffered_bytes = 0
+        self.last_frame: Optional[Dict[str, Any]] = None
+
+    @property
+    def settings(self) -> AlignmentSettings:
+        if self._settings is None:
+            self._settings = AlignmentSettings()
+        return self._settings
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.enabled
+
+    def subscribe(self, subscriber: FrameSubscriber) -> None:
+        self.subscribers.append(subscriber)
+
+    def note_buffered(self, size: int) -> None:
+        self.buffered_bytes += size
+        self.max_buffered_bytes = max(self.max_buffered_bytes, self.buffered_bytes)
+
+    def note_released(self, size: int) -> None:
+        self.buffered_bytes -= size
+        self.frame_bytes += size
+
+    async def emit(self, aligned: AlignedFrame) -> None:
+        self.frames += 1
+        self.last_frame = aligned.summary()
+        for subscriber in self.subscribers:
+            try:
+                await subscriber(aligned)
+            except Exception as e:
+                logger.error(f"Aligned frame subscriber failed for session {aligned.session_id}: {e}", exc_info=True)
+
+    def open_track(self, session_id: str, stream: str) -> None:
+        aligner = self.sessions.get(session_id)
+        if aligner is None:
+            aligner = self.sessions[session_id] = SessionAligner(session_id, self.settings, self)
+            aligner.start()
+        aligner.open_tracks.add(stream)
+
+    async def push(self, session_id: str, stream: str, chunk: bytes, stamp: float) -> None:
+        aligner = self.sessions.get(session_id)
+        if aligner is None:
+            return
+        if not self.subscribers:
+            # Nobody would receive the frames
+            self.skipped_chunks += 1
+            return
+        aligner.push(stream, chunk, stamp)
+        await aligner.advance(time.monotonic())
+
+    async def close_track(self, session_id: str, stream: str) -> None:
+        """Drop one track; the last one flushes every pending frame and ends the session."""
+        aligner = self.sessions.get(session_id)
+        if aligner is None:
+            return
+        aligner.open_tracks.discard(stream)
+        if not aligner.open_tracks:
+            self.sessions.pop(session_id, None)
+            await aligner.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "frame_ms": self.settings.frame * 1000,
+            "jitter_ms": self.settings.jitter * 1000,
+            "sessions": len(self.sessions),
+            "subscribers": len(self.subscribers),
+            "frames": self.frames,
+            "frame_bytes": self.frame_bytes,
+            "late_chunks": self.late_chunks,
+            "skipped_chunks": self.skipped_chunks,
+            "buffered_bytes": self.buffered_bytes,
+            "max_buffered_bytes": self.max_buffered_bytes,
+            "last_frame": self.last_frame,
+        }
+
+
+alignment_stage = AlignmentStage()
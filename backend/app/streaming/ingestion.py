@@ -0,0 +1,336 @@
+"""
+Stream Ingestion Engine
+
+One receive/process loop shared by the video, system-audio and microphone
+sockets of the streaming router.
+
+Each socket gets two tasks: the receiver reads frames and puts binary chunks on
+a bounded per-stream queue (``STREAM_QUEUE_SIZE`` chunks), and the processor
+drains that queue through the processors registered for the stream type.
+When processing falls behind, the receiver waits for queue space, so the
+client is slowed down instead of server memory growing.
+
+Adding an analysis stage means writing a ``StreamProcessor`` and registering
+it for the stream types it applies to:
+
+    ingestion_engine.register("microphone", MyProcessor())
+
+A status message is sent every ``STREAM_STATUS_EVERY`` received chunks. The
+same tick publishes the stream's counters to the session registry and closes
+the socket if the session has been terminated from any worker.
+
+Everything sent back to the client goes through an ``OutboundQueue``, so a
+client that stops reading its socket cannot stall the receive loop. Stages
+that produce messages for a socket other than their own (the alignment
+stage's ``FrameTranscriber``) reach it through ``send``.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from .alignment import alignment_stage
+from .outbound import OutboundQueue, SlowConsumerError, SLOW_CONSUMER_CLOSE_CODE
+from .recording import recording_sink
+from .sessions import session_registry
+from .transcription import FrameTranscriber
+
+logger = logging.getLogger(__name__)
+
+# Stream type -> label used in log lines and status messages
+STREAM_LABELS = {
+    "video": "Video",
+    "system_audio": "System audio",
+    "microphone": "Microphone",
+}
+
+
+class IngestionSettings:
+    def __init__(self):
+        self.queue_size = max(1, int(os.getenv("STREAM_QUEUE_SIZE", "32")))
+        self.status_every = max(1, int(os.getenv("STREAM_STATUS_EVERY", "10")))
+
+
+class StreamContext:
+    """State of one connected stream, handed to every processor call."""
+    def __init__(self, session_id: str, stream: str):
+        self.session_id = session_id
+        self.stream = stream
+        self.bytes_received = 0
+        self.chunks = 0
+        self.processed_chunks = 0
+        # time.monotonic() at which the chunk being processed was received
+        self.arrived_at = 0.0
+        # Per-connection scratch space for processors
+        self.state: Dict[str, Any] = {}
+
+
+class StreamProcessor:
+    """
+    One processing stage of a stream.
+
+    ``open`` and ``close`` run once per connection, ``process`` once per
+    binary chunk, always in arrival order and never concurrently for the same
+    connection. If ``open`` raises, the stream is ended and the stage is
+    neither fed nor closed; only the stages opened before it are closed.
+    """
+    name = "processor"
+
+    async def open(self, ctx: StreamContext) -> None:
+        pass
+
+    async def process(self, ctx: StreamContext, chunk: bytes) -> None:
+        raise NotImplementedError
+
+    async def close(self, ctx: StreamContext) -> None:
+        pass
+
+
+class RecordingProcessor(StreamProcessor):
+    """Persists the stream through the recording sink (no-op when RECORDINGS_ENABLED is off)."""
+    name = "recording"
+
+    async def open(self, ctx: StreamContext) -> None:
+        ctx.state["recorder"] = recording_sink.open_stream(ctx.session_id, ctx.stream)
+
+    async def process(self, ctx: StreamContext, chunk: bytes) -> None:
+        recorder = ctx.state.get("recorder")
+        if recorder is not None:
+            await recorder.write(chunk)
+
+    async def close(self, ctx: StreamContext) -> None:
+        await recording_sink.close_stream(ctx.session_id, ctx.stream)
+
+
+class AlignmentProcessor(StreamProcessor):
+    """Feeds the session's alignment stage (no-op when ALIGNMENT_ENABLED is off)."""
+    name = "alignment"
+
+    async def open(self, ctx: StreamContext) -> None:
+        ctx.state["aligned"] = alignment_stage.enabled
+        if ctx.state["aligned"]:
+            alignment_stage.open_track(ctx.session_id, ctx.stream)
+
+    async def process(self, ctx: StreamContext, chunk: bytes) -> None:
+        if ctx.state.get("aligned"):
+            await alignment_stage.push(ctx.session_id, ctx.stream, chunk, ctx.arrived_at)
+
+    async def close(self, ctx: StreamContext) -> None:
+        if ctx.state.get("aligned"):
+            await alignment_stage.close_track(ctx.session_id, ctx.stream)
+
+
+class StreamStats:
+    """Counters for one stream type, shared by every connection of that type."""
+    def __init__(self):
+        self.connections = 0
+        self.active = 0
+        self.chunks = 0
+        self.bytes = 0
+        self.processed_chunks = 0
+        self.processor_errors = 0
+        self.max_queue_depth = 0
+        self.total_process_ms = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "connections": self.connections,
+            "active": self.active,
+            "chunks": self.chunks,
+            "bytes": self.bytes,
+            "processed_chunks": self.processed_chunks,
+            "processor_errors": self.processor_errors,
+            "max_queue_depth": self.max_queue_depth,
+            "avg_process_ms": round(self.total_process_ms / self.processed_chunks, 3) if self.processed_chunks else 0.0,
+        }
+
+
+class StreamIngestionEngine:
+    def __init__(self, settings: Optional[IngestionSettings] = None):
+        self._settings = settings
+        self.processors: Dict[str, List[StreamProcessor]] = {stream: [] for stream in STREAM_LABELS}
+        self.stats: Dict[str, StreamStats] = {stream: StreamStats() for stream in STREAM_LABELS}
+        self._outbound: Dict[Tuple[str, str], OutboundQueue] = {}
+
+    @property
+    def settings(self) -> IngestionSettings:
+        if self._settings is None:
+            self._settings = IngestionSettings()
+        return self._settings
+
+    def register(self, stream: str, processor: StreamProcessor) -> None:
+        if stream not in self.processors:
+            raise ValueError(f"Unknown stream type '{stream}'")
+        self.processors[stream].append(processor)
+
+    async def handle(self, websocket: WebSocket, session_id: str, stream: str) -> None:
+        """Serve one stream socket until the client ends it or disconnects."""
+        label = STREAM_LABELS[stream]
+        await websocket.accept()
+        logger.info(f"{label} stream connected for session {session_id}")
+
+        ctx = StreamContext(session_id, stream)
+        stats = self.stats[stream]
+        stats.connections += 1
+        stats.active += 1
+
+        processors = list(self.processors[stream])
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.settings.queue_size)
+        outbound = OutboundQueue(websocket, f"streaming:{session_id}:{stream}").start()
+        # Only processors whose open() succeeded see chunks and get closed
+        active: List[StreamProcessor] = []
+        worker = asyncio.create_task(self._process_loop(ctx, active, queue, stats))
+        opened = False
+        try:
+            if not await session_registry.open_stream(session_id, stream):
+                # Its other streams are still closing; leave their state alone
+                logger.info(f"{label} stream rejected: session {session_id} was terminated")
+                outbound.put({"type": "terminated", "message": f"Session {session_id} terminated"})
+                return
+            opened = True
+            self._outbound[(session_id, stream)] = outbound
+            for processor in processors:
+                await processor.open(ctx)
+                active.append(processor)
+            await self._receive_loop(websocket, ctx, queue, outbound, stats, label)
+        except WebSocketDisconnect:
+            logger.info(f"{label} stream disconnected for session {session_id}")
+        except SlowConsumerError as e:
+            logger.warning(f"Closing {stream} stream for session {session_id}: {e}")
+        except Exception as e:
+            logger.error(f"{label} stream error for session {session_id}: {e}", exc_info=True)
+            try:
+                outbound.put({"type": "error", "message": str(e)})
+            except SlowConsumerError:
+                pass
+        finally:
+            # Let the processors finish what was already received
+            await queue.put(None)
+            await worker
+            for processor in active:
+                try:
+                    await processor.close(ctx)
+                except Exception as e:
+                    logger.error(f"{processor.name} failed to close {stream} for session {session_id}: {e}", exc_info=True)
+            stats.active -= 1
+            if self._outbound.get((session_id, stream)) is outbound:
+                del self._outbound[(session_id, stream)]
+            if opened:
+                try:
+                    await session_registry.close_stream(session_id, stream, ctx.bytes_received, ctx.chunks)
+                except Exception as e:
+                    logger.error(f"Failed to record {stream} close for session {session_id}: {e}", exc_info=True)
+            await outbound.close()
+            try:
+                await websocket.close(code=SLOW_CONSUMER_CLOSE_CODE if outbound.overflowed else 1000)
+            except Exception:
+                pass
+            logger.info(f"{label} stream closed for session {session_id}. Total: {ctx.bytes_received} bytes, {ctx.chunks} chunks")
+
+    async def _receive_loop(self, websocket: WebSocket, ctx: StreamContext, queue: asyncio.Queue, outbound: OutboundQueue, stats: StreamStats, label: str) -> None:
+        status_every = self.settings.status_every
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            chunk = message.get("bytes")
+            if chunk is not None:
+                ctx.bytes_received += len(chunk)
+                ctx.chunks += 1
+                stats.chunks += 1
+                stats.bytes += len(chunk)
+
+                await queue.put((chunk, time.monotonic()))
+                stats.max_queue_depth = max(stats.max_queue_depth, queue.qsize())
+
+                if ctx.chunks % status_every == 0:
+                    if await session_registry.update_stream(ctx.session_id, ctx.stream, ctx.bytes_received, ctx.chunks):
+                        logger.info(f"{label} stream closing: session {ctx.session_id} was terminated")
+                        outbound.put({"type": "terminated", "message": f"Session {ctx.session_id} terminated"})
+                        return
+                    logger.debug(f"Session {ctx.session_id} - {label}: {ctx.chunks} chunks, {ctx.bytes_received} bytes")
+                    outbound.put({
+                        "type": "status",
+                        "message": f"{label} chunk received",
+                        "received_bytes": ctx.bytes_received,
+                        "chunk_count": ctx.chunks,
+                        "processed_chunks": ctx.processed_chunks,
+                        "queue_depth": queue.qsize(),
+                    })
+
+            elif message.get("text") is not None:
+                try:
+                    data = json.loads(message["text"])
+                except json.JSONDecodeError:
+                    outbound.put({"type": "error", "message": "Invalid JSON in control message"})
+                    continue
+                msg_type = data.get("type")
+                if msg_type == "control":
+                    action = data.get("action")
+                    logger.info(f"{label} stream control: {action} for session {ctx.session_id}")
+                    outbound.put({"type": "control_ack", "action": action, "status": "ok"})
+                elif msg_type == "end":
+                    logger.info(f"{label} stream end signal for session {ctx.session_id}")
+                    return
+
+    async def _process_loop(self, ctx: StreamContext, processors: List[StreamProcessor], queue: asyncio.Queue, stats: StreamStats) -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            chunk, ctx.arrived_at = item
+            started = time.perf_counter()
+            for processor in processors:
+                try:
+                    await processor.process(ctx, chunk)
+                except Exception as e:
+                    # One failing stage must not stop the others or the socket
+                    stats.processor_errors += 1
+                    logger.error(f"{processor.name} failed on {ctx.stream} chunk for session {ctx.session_id}: {e}", exc_info=True)
+            ctx.processed_chunks += 1
+            stats.processed_chunks += 1
+            stats.total_process_ms += (time.perf_counter() - started) * 1000
+
+    def connected(self, session_id: str, stream: str) -> bool:
+        return (session_id, stream) in self._outbound
+
+    async def send(self, session_id: str, stream: str, message: Dict[str, Any]) -> bool:
+        """Queue a message on a connected stream socket of this worker; False if it was not queued."""
+        outbound = self._outbound.get((session_id, stream))
+        if outbound is None:
+            return False
+        try:
+            return outbound.put(message)
+        except SlowConsumerError as e:
+            logger.warning(f"Closing {stream} stream for session {session_id}: {e}")
+            # The socket's receive loop ends once the close reaches it
+            try:
+                await outbound.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+            except Exception:
+                pass
+            return False
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queue_capacity": self.settings.queue_size,
+            "status_every": self.settings.status_every,
+            "streams": {
+                stream: {**stats.as_dict(), "processors": [p.name for p in self.processors[stream]]}
+                for stream, stats in self.stats.items()
+            },
+        }
+
+
+ingestion_engine = StreamIngestionEngine()
+for _stream in STREAM_LABELS:
+    ingestion_engine.register(_stream, RecordingProcessor())
+    ingestion_engine.register(_stream, AlignmentProcessor())
+
+frame_transcriber = FrameTranscriber(ingestion_engine.connected, ingestion_engine.send)
+alignment_stage.subscribe(frame_transcriber)
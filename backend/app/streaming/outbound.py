@@ -0,0 +1,245 @@
+"""
+Outbound WebSocket Queues
+
+Bounded send queue for one WebSocket. Handlers ``put`` messages without
+waiting; a pump task sends them in order. When the client reads slower than
+the server produces, the queue applies its policy (``OUTBOUND_POLICY``)
+instead of letting memory grow:
+
+    drop_oldest - discard the oldest queued message to make room
+    coalesce    - fold a new message into the last queued one of the same
+                  kind (status replaces status, transcript text is appended),
+                  falling back to drop_oldest when nothing can be folded
+                  (default)
+    disconnect  - close the socket with code 1013 once the queue is full
+
+The queue holds at most ``OUTBOUND_QUEUE_SIZE`` messages. Every live queue is
+tracked in ``outbound_queues`` for per-connection depth and send-latency
+metrics.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+# WebSocket close code "Try Again Later", sent to consumers that fell too far behind
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class SlowConsumerError(Exception):
+    """Raised by ``put`` under the disconnect policy once the queue is full."""
+
+
+class OutboundSettings:
+    def __init__(self):
+        self.queue_size = max(1, int(os.getenv("OUTBOUND_QUEUE_SIZE", "64")))
+        self.policy = os.getenv("OUTBOUND_POLICY", "coalesce").lower()
+        if self.policy not in POLICIES:
+            logger.warning(f"Unknown OUTBOUND_POLICY '{self.policy}', using 'coalesce'")
+            self.policy = "coalesce"
+
+
+def _coalesce(queued: Dict[str, Any], message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Merge ``message`` into the queued message of the same kind, or return None."""
+    kind = message.get("type")
+    if kind != queued.get("type"):
+        return None
+    if kind == "status":
+        return message
+    if kind == "transcript":
+        if message.get("stream") != queued.get("stream"):
+            # Streaming transcripts of different audio tracks stay apart
+            return None
+        # meeting sockets carry the text in "data", streaming sockets in "text"
+        key = "data" if "data" in message else "text"
+        if isinstance(message.get(key), str) and isinstance(queued.get(key), str):
+            return {**message, key: f"{queued[key]} {message[key]}".strip()}
+    return None
+
+
+class OutboundQueue:
+    """
+    Args:
+        websocket (WebSocket): Socket the messages are sent on
+        name (str): Connection label used in logs and metrics
+        settings (OutboundSettings): Queue size and overflow policy
+    """
+    def __init__(self, websocket: WebSocket, name: str, settings: Optional[OutboundSettings] = None):
+        settings = settings or OutboundSettings()
+        self.websocket = websocket
+        self.name = name
+        self.policy = settings.policy
+        self.maxsize = settings.queue_size
+        self.overflowed = False
+        self._queue: Deque[Tuple[Dict[str, Any], float]] = deque()
+        self._ready = asyncio.Event()
+        self._pump: Optional[asyncio.Task] = None
+        self._closed = False
+        self._sending = False
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.total_send_ms = 0.0
+        self.max_send_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def start(self) -> "OutboundQueue":
+        self._pump = asyncio.create_task(self._pump_loop())
+        outbound_queues.register(self)
+        return self
+
+    def put(self, message: Dict[str, Any]) -> bool:
+        """
+        Queue a message without waiting. Returns False if it was not queued
+        because the socket is closing.
+
+        Raises:
+            SlowConsumerError: Under the disconnect policy, when the queue is full
+        """
+        if self._closed:
+            return False
+        if self.policy == "coalesce" and self._queue:
+            merged = _coalesce(self._queue[-1][0], message)
+            if merged is not None:
+                self._queue[-1] = (merged, self._queue[-1][1])
+                self.coalesced += 1
+                return True
+        if len(self._queue) >= self.maxsize:
+            if self.policy == "disconnect":
+                self.overflowed = True
+                self._closed = True
+                self._queue.clear()
+                logger.warning(f"Outbound queue {self.name} full; disconnecting slow consumer")
+                raise SlowConsumerError(f"Client of {self.name} is not keeping up")
+            self._queue.popleft()
+            self.dropped += 1
+        self._queue.append((message, time.perf_counter()))
+        self.max_depth = max(self.max_depth, len(self._queue))
+        self._ready.set()
+        return True
+
+    async def _pump_loop(self) -> None:
+        while True:
+            if not self._queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            message, queued_at = self._queue.popleft()
+            started = time.perf_counter()
+            self._sending = True
+            try:
+                await self.websocket.send_json(message)
+            except Exception as e:
+                # The client is gone; later puts are ignored
+                logger.debug(f"Outbound queue {self.name} stopped: {e}")
+                self._closed = True
+                self._queue.clear()
+                return
+            finally:
+                self._sending = False
+            finished = time.perf_counter()
+            send_ms = (finished - started) * 1000
+            self.sent += 1
+            self.total_send_ms += send_ms
+            self.max_send_ms = max(self.max_send_ms, send_ms)
+            self.max_wait_ms = max(self.max_wait_ms, (finished - queued_at) * 1000)
+
+    async def close(self, drain_timeout: float = 1.0) -> None:
+        """Stop accepting messages, give queued ones ``drain_timeout`` seconds to go out, then stop the pump."""
+        self._closed = True
+        if self._pump is not None:
+            deadline = time.monotonic() + drain_timeout
+            while (self._queue or self._sending) and not self._pump.done() and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            self._pump.cancel()
+            try:
+                await self._pump
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._pump = None
+        outbound_queues.unregister(self)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "policy": self.policy,
+            "depth": self.depth,
+            "capacity": self.maxsize,
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "overflowed": self.overflowed,
+            "avg_send_ms": round(self.total_send_ms / self.sent, 3) if self.sent else 0.0,
+            "max_send_ms": round(self.max_send_ms, 3),
+            "max_queue_wait_ms": round(self.max_wait_ms, 3),
+        }
+
+
+def _empty_totals() -> Dict[str, int]:
+    return {"connections": 0, "sent": 0, "dropped": 0, "coalesced": 0, "disconnected": 0}
+
+
+class OutboundQueueRegistry:
+    """
+    Live outbound queues of this worker, plus totals of the ones already
+    closed, kept per endpoint (the part of the queue name before ``:``).
+    """
+    def __init__(self):
+        self._queues: Dict[str, OutboundQueue] = {}
+        self._ids = itertools.count(1)
+        self._closed_totals: Dict[str, Dict[str, int]] = {}
+
+    def register(self, queue: OutboundQueue) -> None:
+        # Several sockets may share a label (e.g. two clients of one meeting)
+        queue.name = f"{queue.name}#{next(self._ids)}"
+        self._queues[queue.name] = queue
+
+    def unregister(self, queue: OutboundQueue) -> None:
+        if self._queues.pop(queue.name, None) is None:
+            return
+        endpoint = queue.name.split(":", 1)[0]
+        totals = self._closed_totals.setdefault(endpoint, _empty_totals())
+        totals["connections"] += 1
+        totals["sent"] += queue.sent
+        totals["dropped"] += queue.dropped
+        totals["coalesced"] += queue.coalesced
+        totals["disconnected"] += int(queue.overflowed)
+
+    def closed_totals(self, prefix: str = "") -> Dict[str, int]:
+        """Totals of the closed queues whose endpoint matches ``prefix``; all of them for an empty prefix."""
+        endpoint = prefix.split(":", 1)[0]
+        merged = _empty_totals()
+        for name, totals in self._closed_totals.items():
+            if endpoint and name != endpoint:
+                continue
+            for key, value in totals.items():
+                merged[key] += value
+        return merged
+
+    def snapshot(self, prefix: str = "") -> Dict[str, Any]:
+        return {
+            "connections": {
+                name: queue.metrics()
+                for name, queue in self._queues.items()
+                if name.startswith(prefix)
+            },
+            "closed": self.closed_totals(prefix),
+        }
+
+
+outbound_queues = OutboundQueueRegistry()
@@ -0,0 +1,409 @@
+"""
+Recording Sink
+
+Persists the video, system-audio and microphone streams of a streaming
+session to segmented files:
+
+    {RECORDINGS_DIR}/{session_id}/{stream}/{stream}-00001.webm
+    {RECORDINGS_DIR}/{session_id}/{stream}.manifest.json
+
+Chunks are queued as ``memoryview``s and written with ``writelines`` on a
+worker thread, so the event loop never blocks on disk. A writer starts a new
+segment once the current one reaches ``RECORDING_SEGMENT_BYTES``, always at a
+chunk boundary. The manifest lists every segment in order, so a recording can
+be replayed by concatenating the segments of each stream.
+
+Each stream keeps its own manifest file, so workers recording different
+streams of one session never overwrite each other; ``read_manifest`` merges
+them. A stream that reconnects after it was closed picks up its manifest and
+numbers new segments after the recorded ones; segment files are created
+exclusively, so an existing file is never appended to.
+Writes that fail are listed under the stream's ``failed_writes`` in the
+manifest and counted in ``RecordingSink.metrics``.
+
+fsync policy (``RECORDING_FSYNC``):
+    never   - leave flushing to the OS
+    segment - fsync when a segment is closed (default)
+    always  - fsync after every write batch
+"""
+
+import asyncio
+import datetime
+import json
+import logging
+import os
+import re
+from typing import Any, BinaryIO, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FSYNC_POLICIES = ("never", "segment", "always")
+MANIFEST_SUFFIX = ".manifest.json"
+LEGACY_MANIFEST = "manifest.json"
+
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def _safe_name(value: str) -> str:
+    # Session ids come from the URL; keep them from escaping the recordings directory
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", value).lstrip(".") or "_"
+
+
+def _load_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable recording manifest {path}: {e}")
+        return None
+
+
+def read_session_manifest(directory: str) -> Optional[Dict[str, Any]]:
+    """Merge the per-stream manifests of a session directory; None if there are none."""
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.endswith(MANIFEST_SUFFIX))
+    except FileNotFoundError:
+        return None
+    parts = [part for part in (_load_json(os.path.join(directory, name)) for name in names) if part]
+    # Manifests written before streams had their own file
+    legacy = _load_json(os.path.join(directory, LEGACY_MANIFEST))
+    if not parts and legacy is None:
+        return None
+    streams: Dict[str, Any] = dict((legacy or {}).get("streams") or {})
+    for part in parts:
+        streams[part["stream"]] = part["entry"]
+    dated = parts + ([legacy] if legacy else [])
+    return {
+        "session_id": dated[0].get("session_id"),
+        "created_at": min(part["created_at"] for part in dated),
+        "updated_at": max(part["updated_at"] for part in dated),
+        "complete": not any(part.get("open") for part in parts),
+        "fsync": dated[-1].get("fsync"),
+        "segment_bytes": dated[-1].get("segment_bytes"),
+        "streams": streams,
+    }
+
+
+class RecordingSettings:
+    def __init__(self):
+        self.enabled = os.getenv("RECORDINGS_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.root_dir = os.getenv("RECORDINGS_DIR", "recordings")
+        self.segment_bytes = max(1, int(os.getenv("RECORDING_SEGMENT_BYTES", str(64 * 1024 * 1024))))
+        self.max_pending_bytes = max(1, int(os.getenv("RECORDING_MAX_PENDING_BYTES", str(8 * 1024 * 1024))))
+        self.fsync = os.getenv("RECORDING_FSYNC", "segment").lower()
+        if self.fsync not in FSYNC_POLICIES:
+            logger.warning(f"Unknown RECORDING_FSYNC '{self.fsync}', using 'segment'")
+            self.fsync = "segment"
+
+
+class RecordingStats:
+    """Process-wide write failure counters; sessions come and go, these persist."""
+    def __init__(self):
+        self.failed_writes = 0
+        self.lost_bytes = 0
+        self.lost_chunks = 0
+        self.last_error: Optional[str] = None
+        self.last_failed_at: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "failed_writes": self.failed_writes,
+            "lost_bytes": self.lost_bytes,
+            "lost_chunks": self.lost_chunks,
+            "last_error": self.last_error,
+            "last_failed_at": self.last_failed_at,
+        }
+
+
+class SegmentWriter:
+    """
+    Appends one stream of a session to rotating segment files.
+
+    ``write`` only queues the chunk; the actual disk writes happen in ``flush``
+    on a worker thread, one flush at a time. When more than
+    ``max_pending_bytes`` are queued, ``write`` waits for the flush so a slow
+    disk pushes back on the socket instead of growing memory.
+    """
+    def __init__(self, session: "RecordingSession", stream: str, settings: RecordingSettings):
+        self.session = session
+        self.stream = stream
+        self.settings = settings
+        self.directory = os.path.join(session.directory, _safe_name(stream))
+        self.manifest_path = os.path.join(session.directory, _safe_name(stream) + MANIFEST_SUFFIX)
+        self.segments: List[Dict[str, Any]] = []
+        self.failed_writes: List[Dict[str, Any]] = []
+        self._file: Optional[BinaryIO] = None
+        self._batch_written = 0
+        self._pending: List[memoryview] = []
+        self._pending_bytes = 0
+        self._lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def write(self, data: bytes) -> None:
+        if not data:
+            return
+        self._pending.append(memoryview(data))
+        self._pending_bytes += len(data)
+        if self._pending_bytes >= self.settings.max_pending_bytes:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._background_flush())
+
+    async def _background_flush(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Recording write failed for {self.session.session_id}/{self.stream}: {e}", exc_info=True)
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending, self._pending_bytes = self._pending, [], 0
+            self._batch_written = 0
+            try:
+                rotated = await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                self._record_failure(batch, e)
+                await asyncio.to_thread(self._abandon_segment)
+                failure = e
+            else:
+                failure = None
+        if failure is not None:
+            try:
+                await self.session.save_manifest(self.stream)
+            except Exception as e:
+                logger.error(f"Could not record the failed write in the manifest of {self.session.session_id}: {e}")
+            raise failure
+        if rotated:
+            await self.session.save_manifest(self.stream)
+
+    def _record_failure(self, batch: List[memoryview], error: BaseException) -> None:
+        lost_bytes = sum(len(view) for view in batch) - self._batch_written
+        entry = {
+            "at": _now(),
+            "segment": self.segments[-1]["file"] if self._file is not None else None,
+            "lost_bytes": lost_bytes,
+            "error": f"{type(error).__name__}: {error}",
+        }
+        self.failed_writes.append(entry)
+        stats = self.session.stats
+        stats.failed_writes += 1
+        stats.lost_bytes += lost_bytes
+        stats.lost_chunks += len(batch)
+        stats.last_error = entry["error"]
+        stats.last_failed_at = entry["at"]
+
+    def _abandon_segment(self) -> None:
+        """After a failed write: drop the current file so the next write starts a new segment."""
+        try:
+            self._close_segment()
+        except Exception as e:
+            logger.warning(f"Could not close {self.stream} segment of {self.session.session_id}: {e}")
+            self._file = None
+
+    def _open_segment(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        index = len(self.segments) + 1
+        while True:
+            name = f"{_safe_name(self.stream)}-{index:05d}.webm"
+            try:
+                self._file = open(os.path.join(self.directory, name), "xb")
+                break
+            except FileExistsError:
+                # Not in the manifest (e.g. written before a crash); never append to it
+                index += 1
+        self.segments.append({
+            "file": os.path.join(_safe_name(self.stream), name),
+            "bytes": 0,
+            "chunks": 0,
+            "opened_at": _now(),
+            "closed_at": None,
+        })
+
+    def _close_segment(self) -> None:
+        if self._file is None:
+            return
+        self._file.flush()
+        if self.settings.fsync != "never":
+            os.fsync(self._file.fileno())
+        self._file, file = None, self._file
+        file.close()
+        self.segments[-1]["closed_at"] = _now()
+
+    def _write_batch(self, batch: List[memoryview]) -> bool:
+        """Runs on a worker thread. Returns True if a segment was opened or closed."""
+        rotated = False
+        run: List[memoryview] = []
+        run_bytes = 0
+        for view in batch:
+            if self._file is None or self.segments[-1]["bytes"] + run_bytes >= self.settings.segment_bytes:
+                if run:
+                    self._write_run(run, run_bytes)
+                    run, run_bytes = [], 0
+                self._close_segment()
+                self._open_segment()
+                rotated = True
+            run.append(view)
+            run_bytes += len(view)
+        if run:
+            self._write_run(run, run_bytes)
+        self._file.flush()
+        if self.settings.fsync == "always":
+            os.fsync(self._file.fileno())
+        return rotated
+
+    def _write_run(self, run: List[memoryview], size: int) -> None:
+        # Counted only once written, so the manifest never claims bytes a failed write lost
+        self._file.writelines(run)
+        self.segments[-1]["bytes"] += size
+        self.segments[-1]["chunks"] += len(run)
+        self._batch_written += size
+
+    async def close(self) -> None:
+        await self.flush()
+        async with self._lock:
+            await asyncio.to_thread(self._close_segment)
+
+    def manifest_entry(self) -> Dict[str, Any]:
+        return {
+            "segments": [dict(segment) for segment in self.segments],
+            "bytes": sum(segment["bytes"] for segment in self.segments),
+            "chunks": sum(segment["chunks"] for segment in self.segments),
+            "failed_writes": [dict(failure) for failure in self.failed_writes],
+        }
+
+
+class RecordingSession:
+    """All stream writers of one session; each stream resumes from its own manifest if one exists."""
+    def __init__(self, session_id: str, settings: RecordingSettings, stats: Optional[RecordingStats] = None):
+        self.session_id = session_id
+        self.settings = settings
+        self.stats = stats if stats is not None else RecordingStats()
+        self.directory = os.path.join(settings.root_dir, _safe_name(session_id))
+        self.created_at = _now()
+        self.writers: Dict[str, SegmentWriter] = {}
+        self.open_streams: set = set()
+        self._manifest_lock = asyncio.Lock()
+
+    def _resume(self, writer: SegmentWriter) -> None:
+        """Load the segments of an earlier connection so new ones are numbered after them."""
+        entry = None
+        part = _load_json(writer.manifest_path)
+        if part is not None:
+            self.created_at = part.get("created_at", self.created_at)
+            entry = part.get("entry")
+        else:
+            legacy = _load_json(os.path.join(self.directory, LEGACY_MANIFEST))
+            if legacy is not None:
+                self.created_at = legacy.get("created_at", self.created_at)
+                entry = (legacy.get("streams") or {}).get(writer.stream)
+        if not entry:
+            return
+        writer.segments = [dict(segment) for segment in entry.get("segments", [])]
+        writer.failed_writes = [dict(failure) for failure in entry.get("failed_writes", [])]
+        logger.info(f"Resuming {writer.stream} recording for session {self.session_id}")
+
+    def writer(self, stream: str) -> SegmentWriter:
+        writer = self.writers.get(stream)
+        if writer is None:
+            writer = SegmentWriter(self, stream, self.settings)
+            # Read when the stream opens, not with the session: another worker may have written it since
+            self._resume(writer)
+            self.writers[stream] = writer
+        self.open_streams.add(stream)
+        return writer
+
+    def manifest(self, stream: str) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "stream": stream,
+            "created_at": self.created_at,
+            "updated_at": _now(),
+            "open": stream in self.open_streams,
+            "fsync": self.settings.fsync,
+            "segment_bytes": self.settings.segment_bytes,
+            "entry": self.writers[stream].manifest_entry(),
+        }
+
+    def _write_manifest(self, path: str, manifest: Dict[str, Any]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        # Unique per process, so two workers never rename each other's half-written file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            if self.settings.fsync != "never":
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    async def save_manifest(self, stream: str) -> None:
+        async with self._manifest_lock:
+            # Snapshot under the lock so a late writer never overwrites a newer manifest
+            manifest = self.manifest(stream)
+            await asyncio.to_thread(self._write_manifest, self.writers[stream].manifest_path, manifest)
+
+
+class RecordingSink:
+    """Process-wide entry point used by the streaming router."""
+    def __init__(self):
+        self._settings: Optional[RecordingSettings] = None
+        self.sessions: Dict[str, RecordingSession] = {}
+        self.stats = RecordingStats()
+
+    @property
+    def settings(self) -> RecordingSettings:
+        if self._settings is None:
+            self._settings = RecordingSettings()
+        return self._settings
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.enabled
+
+    def open_stream(self, session_id: str, stream: str) -> Optional[SegmentWriter]:
+        if not self.enabled:
+            return None
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = RecordingSession(session_id, self.settings, self.stats)
+            self.sessions[session_id] = session
+        return session.writer(stream)
+
+    async def close_stream(self, session_id: str, stream: str) -> None:
+        """Flush and close one stream; the session is dropped once all its streams are closed."""
+        session = self.sessions.get(session_id)
+        if session is None or stream not in session.writers:
+            return
+        try:
+            await session.writers[stream].close()
+        except Exception as e:
+            logger.error(f"Failed to close {stream} recording for session {session_id}: {e}", exc_info=True)
+        session.open_streams.discard(stream)
+        await session.save_manifest(stream)
+        if not session.open_streams:
+            self.sessions.pop(session_id, None)
+            logger.info(f"Recording for session {session_id} complete in {session.directory}")
+
+    def read_manifest(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return read_session_manifest(os.path.join(self.settings.root_dir, _safe_name(session_id)))
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "sessions": len(self.sessions),
+            "open_streams": sum(len(session.open_streams) for session in self.sessions.values()),
+            **self.stats.as_dict(),
+        }
+
+    async def close_all(self) -> None:
+        for session_id, session in list(self.sessions.items()):
+            for stream in list(session.open_streams):
+                await self.close_stream(session_id, stream)
+
+
+recording_sink = RecordingSink()
@@ -0,0 +1,399 @@
+"""
+Streaming Session Registry
+
+Tracks which streams of a streaming session are connected and how much each
+one has received, in a store every uvicorn worker can see. A session's video,
+system-audio and microphone sockets may land on different workers, so each
+stream is its own row and is only ever written by the worker that owns its
+socket; the session row just holds start time, last activity and the
+terminated flag.
+
+Backends (``SESSION_REGISTRY_BACKEND``):
+    memory - per-process dict; fine for a single worker (default)
+    sqlite - SQLite file at ``SESSION_REGISTRY_PATH`` shared by the workers of
+             one host
+
+Sessions with no connected stream and no activity for ``SESSION_TTL_SECONDS``
+are evicted. A stream that stays connected keeps its session, however long it
+goes without sending, so its updates never land on a session that is gone.
+``terminate`` only flags a session; sockets
+notice at their next status tick and close, and the session is removed once
+its last stream is gone. Until then ``open_stream`` refuses new streams for
+it, so a reconnect can neither revive the session nor reset the streams that
+are still draining; once it is gone, the id starts a fresh session.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STREAM_NAMES = ("video", "system_audio", "microphone")
+
+
+def _empty_stream() -> Dict[str, Any]:
+    return {"connected": False, "bytes_received": 0, "chunks": 0}
+
+
+class SessionRegistrySettings:
+    def __init__(self):
+        self.backend = os.getenv("SESSION_REGISTRY_BACKEND", "memory").lower()
+        self.path = os.getenv("SESSION_REGISTRY_PATH", "streaming_sessions.db")
+        self.ttl = max(1.0, float(os.getenv("SESSION_TTL_SECONDS", "3600")))
+
+
+class SessionStore:
+    """
+    Storage backend interface. Methods are synchronous; ``blocking`` stores
+    are called from a worker thread by ``SessionRegistry``.
+    """
+    blocking = False
+
+    def open_stream(self, session_id: str, stream: str, now: float) -> bool:
+        """Register a connected stream; returns False (and changes nothing) if the session is terminated."""
+        raise NotImplementedError
+
+    def update_stream(self, session_id: str, stream: str, bytes_received: int, chunks: int, now: float) -> bool:
+        """Record progress of a stream; returns True if the session was terminated."""
+        raise NotImplementedError
+
+    def close_stream(self, session_id: str, stream: str, bytes_received: int, chunks: int, now: float) -> None:
+        raise NotImplementedError
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def terminate(self, session_id: str) -> bool:
+        raise NotImplementedError
+
+    def evict_idle(self, cutoff: float) -> List[str]:
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    def __init__(self):
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+
+    def _session(self, session_id: str, now: float) -> Dict[str, Any]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = {
+                "start_time": datetime.now().isoformat(),
+                "last_seen": now,
+                "terminated": False,
+                "streams": {},
+            }
+            self._sessions[session_id] = session
+        return session
+
+    def open_stream(self, session_id, stream, now):
+        existing = self._sessions.get(session_id)
+        if existing is not None and existing["terminated"]:
+            return False
+        session = self._session(session_id, now)
+        state = session["streams"].setdefault(stream, _empty_stream())
+        state.update(connected=True, bytes_received=0, chunks=0)
+        session["last_seen"] = now
+        return True
+
+    def update_stream(self, session_id, stream, bytes_received, chunks, now):
+        session = self._sessions.get(session_id)
+        if session is None:
+            return False
+        if session["terminated"]:
+            return True
+        state = session["streams"].setdefault(stream, _empty_stream())
+        state.update(connected=True, bytes_received=bytes_received, chunks=chunks)
+        session["last_seen"] = now
+        return False
+
+    def close_stream(self, session_id, stream, bytes_received, chunks, now):
+        session = self._sessions.get(session_id)
+        if session is None or stream not in session["streams"]:
+            return
+        session["streams"][stream].update(connected=False, bytes_received=bytes_received, chunks=chunks)
+        session["last_seen"] = now
+        if session["terminated"] and not any(s["connected"] for s in session["streams"].values()):
+            del self._sessions[session_id]
+
+    def get(self, session_id):
+        session = self._sessions.get(session_id)
+        if session is None or session["terminated"]:
+            return None
+        info = {name: dict(session["streams"].get(name) or _empty_stream()) for name in STREAM_NAMES}
+        info["start_time"] = session["start_time"]
+        return info
+
+    def terminate(self, session_id):
+        session = self._sessions.get(session_id)
+        if session is None or session["terminated"]:
+            return False
+        if any(s["connected"] for s in session["streams"].values()):
+            session["terminated"] = True
+        else:
+            del self._sessions[session_id]
+        return True
+
+    def evict_idle(self, cutoff):
+        evicted = [
+            sid for sid, session in self._sessions.items()
+            if session["last_seen"] < cutoff and not any(s["connected"] for s in session["streams"].values())
+        ]
+        for session_id in evicted:
+            del self._sessions[session_id]
+        return evicted
+
+    def count(self):
+        return sum(1 for session in self._sessions.values() if not session["terminated"])
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions in a SQLite file, shared by every worker process on the host.
+
+    Every method is one short transaction, so concurrent workers only ever
+    wait on each other for a few milliseconds.
+    """
+    blocking = True
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            start_time TEXT NOT NULL,
+            last_seen REAL NOT NULL,
+            terminated INTEGER NOT NULL DEFAULT 0
+        )""",
+        """CREATE TABLE IF NOT EXISTS streams (
+            session_id TEXT NOT NULL,
+            stream TEXT NOT NULL,
+            connected INTEGER NOT NULL,
+            bytes_received INTEGER NOT NULL,
+            chunks INTEGER NOT NULL,
+            PRIMARY KEY (session_id, stream)
+        )""",
+        "CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen)",
+    )
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in self.SCHEMA:
+            self._conn.execute(statement)
+
+    def _transaction(self, fn):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    @staticmethod
+    def _delete(conn, session_id: str) -> None:
+        conn.execute("DELETE FROM streams WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def open_stream(self, session_id, stream, now):
+        def run(conn):
+            row = conn.execute("SELECT terminated FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is not None and row[0]:
+                return False
+            if row is None:
+                conn.execute(
+                    "INSERT INTO sessions (session_id, start_time, last_seen) VALUES (?, ?, ?)",
+                    (session_id, datetime.now().isoformat(), now),
+                )
+            else:
+                conn.execute("UPDATE sessions SET last_seen = ? WHERE session_id = ?", (now, session_id))
+            conn.execute(
+                "INSERT OR REPLACE INTO streams (session_id, stream, connected, bytes_received, chunks) VALUES (?, ?, 1, 0, 0)",
+                (session_id, stream),
+            )
+            return True
+        return self._transaction(run)
+
+    def update_stream(self, session_id, stream, bytes_received, chunks, now):
+        def run(conn):
+            row = conn.execute("SELECT terminated FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return False
+            if row[0]:
+                return True
+            conn.execute("UPDATE sessions SET last_seen = ? WHERE session_id = ?", (now, session_id))
+            conn.execute(
+                "INSERT OR REPLACE INTO streams (session_id, stream, connected, bytes_received, chunks) VALUES (?, ?, 1, ?, ?)",
+                (session_id, stream, bytes_received, chunks),
+            )
+            return False
+        return self._transaction(run)
+
+    def close_stream(self, session_id, stream, bytes_received, chunks, now):
+        def run(conn):
+            conn.execute(
+                "UPDATE streams SET connected = 0, bytes_received = ?, chunks = ? WHERE session_id = ? AND stream = ?",
+                (bytes_received, chunks, session_id, stream),
+            )
+            conn.execute("UPDATE sessions SET last_seen = ? WHERE session_id = ?", (now, session_id))
+            row = conn.execute(
+                "SELECT s.terminated, (SELECT COUNT(*) FROM streams WHERE session_id = s.session_id AND connected = 1) "
+                "FROM sessions s WHERE s.session_id = ?",
+                (session_id,),
+            ).fetchone()
+            if row is not None and row[0] and not row[1]:
+                self._delete(conn, session_id)
+        self._transaction(run)
+
+    def get(self, session_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT start_time, terminated FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None or row[1]:
+                return None
+            streams = self._conn.execute(
+                "SELECT stream, connected, bytes_received, chunks FROM streams WHERE session_id = ?", (session_id,)
+            ).fetchall()
+        info = {name: _empty_stream() for name in STREAM_NAMES}
+        for stream, connected, bytes_received, chunks in streams:
+            info[stream] = {"connected": bool(connected), "bytes_received": bytes_received, "chunks": chunks}
+        info["start_time"] = row[0]
+        return info
+
+    def terminate(self, session_id):
+        def run(conn):
+            row = conn.execute("SELECT terminated FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None or row[0]:
+                return False
+            connected = conn.execute(
+                "SELECT COUNT(*) FROM streams WHERE session_id = ? AND connected = 1", (session_id,)
+            ).fetchone()[0]
+            if connected:
+                conn.execute("UPDATE sessions SET terminated = 1 WHERE session_id = ?", (session_id,))
+            else:
+                self._delete(conn, session_id)
+            return True
+        return self._transaction(run)
+
+    def evict_idle(self, cutoff):
+        def run(conn):
+            evicted = [row[0] for row in conn.execute(
+                "SELECT session_id FROM sessions s WHERE last_seen < ? AND NOT EXISTS "
+                "(SELECT 1 FROM streams WHERE session_id = s.session_id AND connected = 1)",
+                (cutoff,),
+            )]
+            for session_id in evicted:
+                self._delete(conn, session_id)
+            return evicted
+        return self._transaction(run)
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions WHERE terminated = 0").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SessionRegistry:
+    """
+    Async front-end for the configured store, used by the ingestion engine and
+    the streaming router. Idle sessions are swept lazily, at most once per
+    minute (or once per TTL when that is shorter).
+    """
+    def __init__(self, settings: Optional[SessionRegistrySettings] = None):
+        self._settings = settings
+        self._store: Optional[SessionStore] = None
+        self._last_sweep = 0.0
+        self.evicted = 0
+
+    @property
+    def settings(self) -> SessionRegistrySettings:
+        if self._settings is None:
+            self._settings = SessionRegistrySettings()
+        return self._settings
+
+    @property
+    def store(self) -> SessionStore:
+        if self._store is None:
+            backend = self.settings.backend
+            if backend == "memory":
+                self._store = MemorySessionStore()
+            elif backend == "sqlite":
+                self._store = SQLiteSessionStore(self.settings.path)
+            else:
+                raise ValueError(f"Unknown SESSION_REGISTRY_BACKEND '{backend}' (expected 'memory' or 'sqlite')")
+            logger.info(f"Streaming session registry using {backend} backend")
+        return self._store
+
+    async def _call(self, method: str, *args):
+        store = self.store
+        if store.blocking:
+            return await asyncio.to_thread(getattr(store, method), *args)
+        return getattr(store, method)(*args)
+
+    async def _maybe_sweep(self, now: float) -> None:
+        if now - self._last_sweep < min(60.0, self.settings.ttl):
+            return
+        self._last_sweep = now
+        evicted = await self._call("evict_idle", now - self.settings.ttl)
+        if evicted:
+            self.evicted += len(evicted)
+            logger.info(f"Evicted {len(evicted)} idle streaming session(s)")
+
+    async def open_stream(self, session_id: str, stream: str) -> bool:
+        """Register a connected stream; returns False if the session is terminated and still closing."""
+        now = time.time()
+        await self._maybe_sweep(now)
+        return await self._call("open_stream", session_id, stream, now)
+
+    async def update_stream(self, session_id: str, stream: str, bytes_received: int, chunks: int) -> bool:
+        """Record stream progress; returns True if the session has been terminated."""
+        return await self._call("update_stream", session_id, stream, bytes_received, chunks, time.time())
+
+    async def close_stream(self, session_id: str, stream: str, bytes_received: int, chunks: int) -> None:
+        await self._call("close_stream", session_id, stream, bytes_received, chunks, time.time())
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        await self._maybe_sweep(time.time())
+        return await self._call("get", session_id)
+
+    async def terminate(self, session_id: str) -> bool:
+        """Flag a session as terminated; returns False if it does not exist."""
+        return await self._call("terminate", session_id)
+
+    async def metrics(self) -> Dict[str, Any]:
+        return {
+            "backend": self.settings.backend,
+            "ttl_seconds": self.settings.ttl,
+            "sessions": await self._call("count"),
+            "evicted": self.evicted,
+        }
+
+    async def close(self) -> None:
+        if self._store is not None:
+            await self._call("close")
+            self._store = None
+
+
+session_registry = SessionRegistry()
@@ -0,0 +1,80 @@
+"""
+Aligned Frame Transcription
+
+Alignment stage subscriber that transcribes the audio tracks of each aligned
+frame with the ASR worker pool and sends the text to the session's microphone
+socket:
+
+    {"type": "transcript", "stream": "system_audio", "text": "...", "start_ms": 1200.0, "end_ms": 1300.0}
+
+Tracks are transcribed one after the other while the alignment stage waits,
+so a saturated ASR pool slows the audio sockets down the same way it slows
+meeting sockets. Frames of a session whose microphone socket is not connected
+to this worker are not transcribed.
+"""
+
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from ..asr.worker_pool import asr_pool
+from .alignment import AlignedFrame
+
+logger = logging.getLogger(__name__)
+
+AUDIO_TRACKS = ("system_audio", "microphone")
+# The socket transcripts are sent on
+TRANSCRIPT_STREAM = "microphone"
+
+
+class FrameTranscriber:
+    """
+    Args:
+        connected (Callable[[str, str], bool]): Whether a session's stream socket is connected here
+        send (Callable[[str, str, Dict[str, Any]], Awaitable[bool]]): Queues a message on a stream socket
+    """
+    def __init__(
+        self,
+        connected: Callable[[str, str], bool],
+        send: Callable[[str, str, Dict[str, Any]], Awaitable[bool]],
+    ):
+        self.connected = connected
+        self.send = send
+        self.frames = 0
+        self.transcripts = 0
+        self.failures = 0
+        self.undelivered_frames = 0
+
+    async def __call__(self, aligned: AlignedFrame) -> None:
+        if not any(aligned.tracks.get(track) for track in AUDIO_TRACKS):
+            return
+        if not self.connected(aligned.session_id, TRANSCRIPT_STREAM):
+            self.undelivered_frames += 1
+            return
+        self.frames += 1
+        for track in AUDIO_TRACKS:
+            data = aligned.tracks.get(track)
+            if not data:
+                continue
+            try:
+                text = await asr_pool.transcribe(data)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Transcription of {track} frame {aligned.index} failed for session {aligned.session_id}: {e}")
+                continue
+            sent = await self.send(aligned.session_id, TRANSCRIPT_STREAM, {
+                "type": "transcript",
+                "stream": track,
+                "text": text,
+                "start_ms": round(aligned.start_ms, 3),
+                "end_ms": round(aligned.end_ms, 3),
+            })
+            if sent:
+                self.transcripts += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "frames": self.frames,
+            "transcripts": self.transcripts,
+            "failures": self.failures,
+            "undelivered_frames": self.undelivered_frames,
+        }
@@ -0,0 +1,190 @@
+"""
+CDC consumer tests against the in-memory broker.
+
+Each test polls the consumer by hand (``poll_once``) instead of starting its
+thread, so batches, commits and rewinds happen in a known order. Events go
+through the real ``process_record``; ``apply_change`` is replaced with a list
+so no view or cache is touched.
+"""
+
+import json
+
+import pytest
+
+from app.pathway_pipeline import pipeline
+from app.pathway_pipeline.consumer import CDCConsumer, ConsumerSettings
+from app.pathway_pipeline.dead_letter import DeadLetterGuard, DeadLetterSettings, DeadLetterStore
+from app.pathway_pipeline.memory_broker import InMemoryBroker, TopicPartition
+from app.pathway_pipeline.workers import KeyedWorkerPool
+
+TOPIC = "fullCRM.Pathway.applications"
+GROUP = "test-group"
+
+
+def event(doc_id, op="c", status="pending"):
+    return {"op": op, "after": json.dumps({"_id": doc_id, "status": status})}
+
+
+@pytest.fixture
+def applied(monkeypatch):
+    changes = []
+    monkeypatch.setattr(pipeline, "apply_change", changes.append)
+    return changes
+
+
+@pytest.fixture
+def settings():
+    settings = ConsumerSettings()
+    settings.group_id = GROUP
+    settings.topics = (TOPIC,)
+    settings.poll_timeout_ms = 1
+    settings.retry_backoff = 0.0
+    return settings
+
+
+@pytest.fixture
+def broker():
+    return InMemoryBroker()
+
+
+@pytest.fixture
+def guard(tmp_path):
+    dead_letter_settings = DeadLetterSettings()
+    dead_letter_settings.max_attempts = 2
+    dead_letter_settings.retry_initial = 0.0
+    return DeadLetterGuard(
+        pipeline.process_record,
+        settings=dead_letter_settings,
+        store=DeadLetterStore(str(tmp_path / "dead_letters.jsonl")),
+    )
+
+
+@pytest.fixture
+def workers(guard):
+    pool = KeyedWorkerPool(handler=guard)
+    yield pool
+    pool.shutdown()
+
+
+def poll_once(cdc, consumer):
+    polled = consumer.poll(timeout_ms=cdc.settings.poll_timeout_ms, max_records=cdc.settings.max_records)
+    if polled:
+        cdc._handle(consumer, polled)
+    return polled
+
+
+def test_commits_after_successful_batch(broker, settings, workers, applied):
+    broker.produce(TOPIC, event("a1"), key="a1")
+    broker.produce(TOPIC, event("a2"), key="a2")
+    cdc = CDCConsumer(batch_handler=workers.process_batch, settings=settings)
+    consumer = broker.consumer(settings.topics, settings.group_id)
+
+    poll_once(cdc, consumer)
+
+    assert sorted(change.doc_id for change in applied) == ["a1", "a2"]
+    assert broker.committed(GROUP) == {TopicPartition(TOPIC, 0): 2}
+    assert cdc.stats.batches == 1 and cdc.stats.events == 2
+
+    # A new member of the group resumes after the committed offset
+    broker.produce(TOPIC, event("a3"), key="a3")
+    applied.clear()
+    poll_once(cdc, broker.consumer(settings.topics, settings.group_id))
+    assert [change.doc_id for change in applied] == ["a3"]
+
+
+def test_failed_batch_is_not_committed_and_is_retried(broker, settings, applied):
+    broker.produce(TOPIC, event("a1"), key="a1")
+    broker.produce(TOPIC, event("a2"), key="a2")
+    calls = []
+
+    def flaky(records):
+        calls.append([record.offset for record in records])
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+        pipeline.process_batch(records)
+
+    cdc = CDCConsumer(batch_handler=flaky, settings=settings)
+    consumer = broker.consumer(settings.topics, settings.group_id)
+
+    poll_once(cdc, consumer)
+    assert broker.committed(GROUP) == {}
+    assert consumer.position(TopicPartition(TOPIC, 0)) == 0
+    assert cdc.stats.failed_batches == 1
+
+    poll_once(cdc, consumer)
+    assert calls == [[0, 1], [0, 1]]
+    assert [change.doc_id for change in applied] == ["a1", "a2"]
+    assert broker.committed(GROUP) == {TopicPartition(TOPIC, 0): 2}
+
+
+def test_malformed_event_is_dead_lettered_and_batch_committed(broker, settings, workers, guard, applied):
+    broker.produce(TOPIC, {"after": json.dumps({"_id": "a1"})}, key="a1")  # no op
+    broker.produce(TOPIC, "not json", key="a2")
+    broker.produce(TOPIC, event("a3"), key="a3")
+    cdc = CDCConsumer(batch_handler=workers.process_batch, settings=settings)
+
+    poll_once(cdc, broker.consumer(settings.topics, settings.group_id))
+
+    assert [change.doc_id for change in applied] == ["a3"]
+    dead = list(guard.store)
+    assert sorted(entry["offset"] for entry in dead) == [0, 1]
+    assert {entry["error_type"] for entry in dead} == {"MalformedEventError"}
+    assert all(entry["topic"] == TOPIC and entry["attempts"] == 1 for entry in dead)
+    assert guard.malformed == 2 and guard.retries == 0
+    assert broker.committed(GROUP) == {TopicPartition(TOPIC, 0): 3}
+
+
+def test_tombstones_are_skipped(broker, settings, workers, guard, applied):
+    broker.produce(TOPIC, {"op": "d", "before": json.dumps({"_id": "a1"})}, key="a1")
+    broker.produce(TOPIC, None, key="a1")  # Debezium tombstone after the delete
+    cdc = CDCConsumer(batch_handler=workers.process_batch, settings=settings)
+
+    poll_once(cdc, broker.consumer(settings.topics, settings.group_id))
+
+    assert [(change.op, change.doc_id) for change in applied] == [("d", "a1")]
+    assert guard.store.count() == 0
+    assert broker.committed(GROUP) == {TopicPartition(TOPIC, 0): 2}
+
+
+def test_broadcast_handler_skips_tombstones(applied):
+    handler = pipeline.BroadcastHandler()
+    broker = InMemoryBroker()
+    records = [
+        broker.produce(TOPIC, event("a1"), key="a1"),
+        broker.produce(TOPIC, None, key="a1"),
+    ]
+
+    handler(records)
+
+    assert [change.doc_id for change in applied] == ["a1"]
+    assert handler.metrics() == {"applied": 1, "skipped": 0}
+
+
+def test_group_consumer_only_checks_while_broadcast_applies(broker, settings, applied, tmp_path):
+    dead_letter_settings = DeadLetterSettings()
+    dead_letter_settings.max_attempts = 1
+    checker = DeadLetterGuard(
+        pipeline.check_record,
+        settings=dead_letter_settings,
+        store=DeadLetterStore(str(tmp_path / "checked.jsonl")),
+    )
+    pool = KeyedWorkerPool(handler=checker)
+    broker.produce(TOPIC, event("a1"), key="a1")
+    broker.produce(TOPIC, "not json", key="a2")
+    try:
+        cdc = CDCConsumer(batch_handler=pool.process_batch, settings=settings)
+        poll_once(cdc, broker.consumer(settings.topics, settings.group_id))
+    finally:
+        pool.shutdown()
+
+    # The group commits and dead-letters, but leaves the views and cache alone
+    assert applied == []
+    assert [entry["offset"] for entry in checker.store] == [1]
+    assert broker.committed(GROUP) == {TopicPartition(TOPIC, 0): 2}
+
+    handler = pipeline.BroadcastHandler()
+    # A broadcast consumer reads the same log under its own group
+    polled = broker.consumer(settings.topics, "broadcast-worker-1").poll(timeout_ms=1, max_records=10)
+    handler([record for records in polled.values() for record in records])
+    assert [change.doc_id for change in applied] == ["a1"]
+    assert handler.metrics() == {"applied": 1, "skipped": 1}
@@ -0,0 +1,84 @@
+"""
+Model cache tests, mostly the guard that keeps a fetch which raced with an
+invalidation from putting the old document back.
+"""
+
+from app.database.cache import ModelCache
+
+
+def cache(max_entries=10, ttl=0.0):
+    return ModelCache(max_entries, ttl)
+
+
+def test_set_and_get_by_read_shape():
+    models = cache()
+    models.set("a1", None, "full", models.token())
+    models.set("a1", ("status",), "slim", models.token())
+
+    assert models.get("a1") == "full"
+    assert models.get("a1", ("status",)) == "slim"
+    assert models.get("a2") is None
+    assert models.stats.hits == 2 and models.stats.misses == 1
+
+
+def test_invalidate_drops_every_read_shape():
+    models = cache()
+    models.set("a1", None, "full", models.token())
+    models.set("a1", ("status",), "slim", models.token())
+
+    models.invalidate("a1")
+
+    assert models.get("a1") is None and models.get("a1", ("status",)) is None
+    assert len(models) == 0
+
+
+def test_fetch_that_raced_with_an_invalidation_is_not_stored():
+    models = cache()
+    token = models.token()  # fetch starts reading the old document
+    models.invalidate("a1")  # a write lands meanwhile
+
+    assert models.set("a1", None, "old", token) is False
+    assert models.get("a1") is None
+    assert models.stats.stale_skips == 1
+
+    # A fetch started after the invalidation is stored
+    assert models.set("a1", None, "new", models.token()) is True
+    assert models.get("a1") == "new"
+
+
+def test_invalidating_another_document_does_not_block_the_fetch():
+    models = cache()
+    token = models.token()
+    models.invalidate("a2")
+
+    assert models.set("a1", None, "doc", token) is True
+
+
+def test_forgotten_invalidations_still_guard_older_fetches():
+    models = cache(max_entries=2)
+    token = models.token()
+    for doc_id in ("a1", "a2", "a3"):  # a1's invalidation falls out of the window
+        models.invalidate(doc_id)
+
+    assert models.set("a1", None, "old", token) is False
+    assert models.set("a1", None, "new", models.token()) is True
+
+
+def test_clear_blocks_fetches_started_before_it():
+    models = cache()
+    token = models.token()
+    models.clear()
+
+    assert models.set("a1", None, "old", token) is False
+
+
+def test_least_recently_used_entry_is_evicted():
+    models = cache(max_entries=2)
+    for doc_id in ("a1", "a2"):
+        models.set(doc_id, None, doc_id, models.token())
+    models.get("a1")
+    models.set("a3", None, "a3", models.token())
+
+    assert models.get("a2") is None
+    assert models.get("a1") == "a1" and models.get("a3") == "a3"
+    assert models.stats.evictions == 1
@@ -0,0 +1,104 @@
+"""
+Outbound queue tests.
+
+Queues are filled with ``put`` and never started, so no pump drains them and
+each overflow policy can be checked message by message; the registry tests
+start the queues against a socket that records what it was sent.
+"""
+
+import asyncio
+
+import pytest
+
+from app.streaming import outbound
+from app.streaming.outbound import OutboundQueue, OutboundQueueRegistry, OutboundSettings, SlowConsumerError
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+
+def queue_with(policy, size=2, name="meeting:m1"):
+    settings = OutboundSettings()
+    settings.policy = policy
+    settings.queue_size = size
+    return OutboundQueue(RecordingSocket(), name, settings)
+
+
+def queued(queue):
+    return [message for message, _ in queue._queue]
+
+
+def test_drop_oldest_discards_the_oldest_message():
+    queue = queue_with("drop_oldest")
+    for i in range(4):
+        assert queue.put({"type": "status", "n": i}) is True
+
+    assert [message["n"] for message in queued(queue)] == [2, 3]
+    assert queue.dropped == 2 and queue.max_depth == 2
+
+
+def test_coalesce_folds_messages_of_the_same_kind():
+    queue = queue_with("coalesce")
+    queue.put({"type": "transcript", "data": "hello"})
+    queue.put({"type": "transcript", "data": "world"})
+    queue.put({"type": "status", "n": 1})
+    queue.put({"type": "status", "n": 2})
+
+    assert queued(queue) == [{"type": "transcript", "data": "hello world"}, {"type": "status", "n": 2}]
+    assert queue.coalesced == 2 and queue.dropped == 0
+
+
+def test_coalesce_falls_back_to_drop_oldest():
+    queue = queue_with("coalesce")
+    queue.put({"type": "transcript", "text": "a"})
+    queue.put({"type": "status", "n": 1})
+    queue.put({"type": "error", "message": "x"})  # nothing to fold into
+
+    assert [message["type"] for message in queued(queue)] == ["status", "error"]
+    assert queue.dropped == 1
+
+
+def test_disconnect_closes_a_full_queue():
+    queue = queue_with("disconnect")
+    queue.put({"type": "status", "n": 1})
+    queue.put({"type": "status", "n": 2})
+
+    with pytest.raises(SlowConsumerError):
+        queue.put({"type": "status", "n": 3})
+    assert queue.overflowed and queue.depth == 0
+    assert queue.put({"type": "status", "n": 4}) is False
+
+
+def test_closed_totals_are_kept_per_endpoint(monkeypatch):
+    registry = OutboundQueueRegistry()
+    monkeypatch.setattr(outbound, "outbound_queues", registry)
+
+    async def run():
+        meeting = queue_with("drop_oldest", size=1, name="meeting:m1")
+        streaming = queue_with("disconnect", size=1, name="streaming:s1:video")
+        meeting.put({"type": "status", "n": 1})
+        meeting.put({"type": "status", "n": 2})
+        streaming.put({"type": "status", "n": 1})
+        with pytest.raises(SlowConsumerError):
+            streaming.put({"type": "status", "n": 2})
+        meeting.start()
+        streaming.start()
+        assert set(registry.snapshot("meeting:")["connections"]) == {meeting.name}
+        await meeting.close()
+        await streaming.close()
+        return meeting
+
+    meeting = asyncio.run(run())
+
+    assert meeting.websocket.sent == [{"type": "status", "n": 2}]
+    assert registry.snapshot("meeting:")["closed"] == {
+        "connections": 1, "sent": 1, "dropped": 1, "coalesced": 0, "disconnected": 0,
+    }
+    assert registry.snapshot("streaming:")["closed"]["disconnected"] == 1
+    assert registry.snapshot("streaming:")["closed"]["dropped"] == 0
+    assert registry.closed_totals()["connections"] == 2
@@ -0,0 +1,113 @@
+"""
+Keyset pagination tests.
+
+``fetch_page`` runs against a small in-memory collection that supports the
+filters ``keyset_filter`` builds and sorts null keys first, as MongoDB does.
+"""
+
+import asyncio
+import datetime
+
+import pytest
+
+from app.database.pagination import decode_cursor, encode_cursor, fetch_page, keyset_filter
+
+
+def matches(doc, query):
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, part) for part in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, part) for part in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = doc.get(key)
+            if "$gt" in condition and (value is None or not value > condition["$gt"]):
+                return False
+            if "$ne" in condition and value == condition["$ne"]:
+                return False
+        elif doc.get(key) != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, keys):
+        for field, _ in reversed(keys):
+            self.docs.sort(key=lambda doc: (doc.get(field) is not None, doc.get(field)))
+        return self
+
+    def limit(self, count):
+        self.docs = self.docs[:count]
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection=None):
+        return FakeCursor([dict(doc) for doc in self.docs if matches(doc, query)])
+
+
+def read_all(collection, limit, query=None):
+    async def run():
+        ids, cursor = [], None
+        while True:
+            docs, cursor = await fetch_page(collection, "score", limit, cursor, query)
+            ids.extend(doc["_id"] for doc in docs)
+            if cursor is None:
+                return ids
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("value", [None, 0, 2.5, "b", datetime.datetime(2024, 5, 1, 12, 30)])
+def test_cursor_round_trip(value):
+    assert decode_cursor(encode_cursor(value, "a1")) == (value, "a1")
+
+
+@pytest.mark.parametrize("token", ["", "not-a-cursor", encode_cursor(1, "a1")[:-3]])
+def test_malformed_cursor_raises_value_error(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+def test_null_cursor_continues_with_nulls_then_keyed_documents():
+    assert keyset_filter("score", encode_cursor(None, "a1")) == {
+        "$or": [
+            {"score": None, "_id": {"$gt": "a1"}},
+            {"score": {"$ne": None}},
+        ]
+    }
+    assert keyset_filter("score", None) == {}
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 10])
+def test_pages_cover_every_document_once(limit):
+    docs = [
+        {"_id": "a3", "score": None},
+        {"_id": "a1", "score": None},
+        {"_id": "a2", "score": 1},
+        {"_id": "a5", "score": 1},
+        {"_id": "a4", "score": 0},
+        {"_id": "a6"},  # missing sorts with null
+    ]
+    assert read_all(FakeCollection(docs), limit) == ["a1", "a3", "a6", "a4", "a2", "a5"]
+
+
+def test_last_page_has_no_cursor():
+    docs = [{"_id": f"a{i}", "score": i} for i in range(4)]
+
+    async def run():
+        return await fetch_page(FakeCollection(docs), "score", 4, None, {"score": {"$gt": 0}})
+
+    page, cursor = asyncio.run(run())
+    assert [doc["_id"] for doc in page] == ["a1", "a2", "a3"]
+    assert cursor is None
@@ -0,0 +1,45 @@
+"""
+``?fields=`` projection tests: parsing the selection, the Mongo projection it
+becomes and the slim response model built for it.
+"""
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.application_model import Application
+from app.models.projection import build_projection, parse_fields, slim_model
+from app.routers.applications_router import selected_fields
+
+
+def test_no_selection_returns_none():
+    assert parse_fields(Application, None) is None
+
+
+def test_fields_are_trimmed_sorted_and_deduplicated():
+    assert parse_fields(Application, " status, companyName ,status,,") == ("companyName", "status")
+
+
+def test_id_is_implied():
+    assert parse_fields(Application, "id,_id,stage") == ("stage",)
+    assert build_projection(("stage",)) == {"stage": 1, "_id": 1}
+
+
+def test_unknown_field_is_rejected():
+    with pytest.raises(ValueError, match="founderEmail, password"):
+        parse_fields(Application, "companyName,password,founderEmail")
+
+
+def test_router_maps_unknown_field_to_400():
+    with pytest.raises(HTTPException) as raised:
+        selected_fields("nope")
+    assert raised.value.status_code == 400
+
+
+def test_slim_model_holds_only_the_selection():
+    model = slim_model(Application, ("companyName", "dateAdded"))
+
+    item = model.model_validate({"_id": "a1", "companyName": "Acme"})
+
+    assert set(model.model_fields) == {"id", "companyName", "dateAdded"}
+    assert item.id == "a1" and item.companyName == "Acme" and item.dateAdded is None
+    assert slim_model(Application, ("companyName", "dateAdded")) is model
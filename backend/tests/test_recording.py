@@ -0,0 +1,102 @@
+"""
+Recording sink tests against a ``tmp_path`` recordings directory.
+
+Two ``RecordingSink`` instances stand in for two workers recording different
+streams of the same session.
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+from app.streaming.recording import RecordingSettings, RecordingSink
+
+SESSION = "s1"
+
+
+@pytest.fixture
+def settings(tmp_path):
+    settings = RecordingSettings()
+    settings.enabled = True
+    settings.root_dir = str(tmp_path)
+    settings.segment_bytes = 8
+    settings.fsync = "never"
+    return settings
+
+
+def sink_for(settings):
+    sink = RecordingSink()
+    sink._settings = settings
+    return sink
+
+
+async def record(sink, stream, *chunks, close=True):
+    writer = sink.open_stream(SESSION, stream)
+    for data in chunks:
+        await writer.write(data)
+    await writer.flush()
+    if close:
+        await sink.close_stream(SESSION, stream)
+
+
+def test_workers_keep_their_own_stream_manifests(settings, tmp_path):
+    async def run():
+        video, audio = sink_for(settings), sink_for(settings)
+        await record(video, "video", b"v" * 8, b"v" * 8)
+        await record(audio, "microphone", b"m" * 4, close=False)
+        return audio
+
+    audio = asyncio.run(run())
+    manifest = audio.read_manifest(SESSION)
+
+    assert sorted(manifest["streams"]) == ["microphone", "video"]
+    assert manifest["streams"]["video"]["bytes"] == 16
+    assert len(manifest["streams"]["video"]["segments"]) == 2
+    assert manifest["complete"] is False  # microphone is still open
+    assert not [name for name in os.listdir(tmp_path / SESSION) if name.endswith(".tmp")]
+
+    asyncio.run(audio.close_stream(SESSION, "microphone"))
+    assert audio.read_manifest(SESSION)["complete"] is True
+
+
+def test_reconnected_stream_numbers_segments_after_recorded_ones(settings, tmp_path):
+    asyncio.run(record(sink_for(settings), "video", b"a" * 8))
+    asyncio.run(record(sink_for(settings), "video", b"b" * 8))
+
+    manifest = sink_for(settings).read_manifest(SESSION)
+    files = [segment["file"] for segment in manifest["streams"]["video"]["segments"]]
+    assert files == [os.path.join("video", "video-00001.webm"), os.path.join("video", "video-00002.webm")]
+    assert (tmp_path / SESSION / "video" / "video-00001.webm").read_bytes() == b"a" * 8
+    assert (tmp_path / SESSION / "video" / "video-00002.webm").read_bytes() == b"b" * 8
+
+
+def test_resumes_from_legacy_session_manifest(settings, tmp_path):
+    directory = tmp_path / SESSION
+    (directory / "video").mkdir(parents=True)
+    (directory / "video" / "video-00001.webm").write_bytes(b"old")
+    legacy = {
+        "session_id": SESSION,
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "updated_at": "2024-01-01T00:00:00+00:00",
+        "complete": True,
+        "streams": {"video": {
+            "segments": [{"file": os.path.join("video", "video-00001.webm"), "bytes": 3, "chunks": 1}],
+            "bytes": 3,
+            "chunks": 1,
+            "failed_writes": [],
+        }},
+    }
+    (directory / "manifest.json").write_text(json.dumps(legacy))
+
+    asyncio.run(record(sink_for(settings), "video", b"new"))
+
+    manifest = sink_for(settings).read_manifest(SESSION)
+    assert manifest["created_at"] == legacy["created_at"]
+    assert [segment["bytes"] for segment in manifest["streams"]["video"]["segments"]] == [3, 3]
+    assert manifest["complete"] is True
+
+
+def test_missing_session_has_no_manifest(settings):
+    assert sink_for(settings).read_manifest("unknown") is None
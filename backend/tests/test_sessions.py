@@ -0,0 +1,73 @@
+"""
+Streaming session store tests.
+
+Every test runs against both backends; the SQLite store uses a file under
+``tmp_path``. Times are passed in explicitly, so eviction needs no sleeping.
+"""
+
+import pytest
+
+from app.streaming.sessions import MemorySessionStore, SQLiteSessionStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield MemorySessionStore()
+        return
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    yield store
+    store.close()
+
+
+def test_idle_session_without_connected_streams_is_evicted(store):
+    store.open_stream("s1", "video", now=0.0)
+    store.close_stream("s1", "video", 10, 1, now=1.0)
+
+    assert store.evict_idle(cutoff=2.0) == ["s1"]
+    assert store.get("s1") is None
+    assert store.count() == 0
+
+
+def test_connected_stream_keeps_its_session(store):
+    store.open_stream("s1", "video", now=0.0)
+
+    assert store.evict_idle(cutoff=100.0) == []
+    assert store.update_stream("s1", "video", 20, 2, now=101.0) is False
+    assert store.get("s1")["video"] == {"connected": True, "bytes_received": 20, "chunks": 2}
+
+
+def test_recent_session_is_kept(store):
+    store.open_stream("s1", "video", now=0.0)
+    store.close_stream("s1", "video", 0, 0, now=5.0)
+
+    assert store.evict_idle(cutoff=5.0) == []
+    assert store.count() == 1
+
+
+def test_reconnect_to_terminated_session_is_refused_until_it_drains(store):
+    store.open_stream("s1", "video", now=0.0)
+    store.open_stream("s1", "microphone", now=0.0)
+    store.update_stream("s1", "video", 30, 3, now=1.0)
+
+    assert store.terminate("s1") is True
+    assert store.get("s1") is None
+    assert store.open_stream("s1", "system_audio", now=2.0) is False
+    assert store.update_stream("s1", "microphone", 5, 1, now=2.0) is True
+
+    store.close_stream("s1", "video", 30, 3, now=3.0)
+    assert store.open_stream("s1", "video", now=3.0) is False  # microphone still draining
+    store.close_stream("s1", "microphone", 5, 1, now=4.0)
+
+    # The last stream is gone: the id starts a fresh session
+    assert store.open_stream("s1", "video", now=5.0) is True
+    assert store.get("s1")["video"] == {"connected": True, "bytes_received": 0, "chunks": 0}
+
+
+def test_terminate_without_connected_streams_removes_session(store):
+    store.open_stream("s1", "video", now=0.0)
+    store.close_stream("s1", "video", 0, 0, now=1.0)
+
+    assert store.terminate("s1") is True
+    assert store.terminate("s1") is False
+    assert store.open_stream("s1", "video", now=2.0) is True
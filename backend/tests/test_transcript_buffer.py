@@ -0,0 +1,122 @@
+"""
+Transcript write-behind buffer tests.
+
+The buffer runs against a fake ``TranscriptHandler`` whose appends can be made
+to fail, and ``append_chunks`` against a fake collection that behaves like an
+unordered ``insert_many`` on a unique ``_id``.
+"""
+
+import asyncio
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from app.database.transcript_buffer import FlushStats, TranscriptWriteBuffer
+from app.database.transcript_handler import TranscriptHandler, transcript_record
+from app.models.meeting import TranscriptChunk
+
+
+def chunk(i):
+    return TranscriptChunk(timestamp=float(i), text=f"chunk {i}")
+
+
+class FlakyHandler:
+    def __init__(self):
+        self.ok = False
+        self.attempts = []
+
+    async def append_chunks(self, meeting_id, chunks):
+        self.attempts.append([record.id for record in chunks])
+        return self.ok
+
+
+class FakeCollection:
+    """Unordered insert_many on a unique _id; ``fail_after`` writes that many documents, then times out."""
+    def __init__(self):
+        self.docs = {}
+        self.fail_after = None
+
+    async def insert_many(self, docs, ordered=True):
+        assert ordered is False
+        errors = []
+        for index, doc in enumerate(docs):
+            if self.fail_after is not None and len(self.docs) >= self.fail_after:
+                self.fail_after = None
+                raise TimeoutError("server selection timed out")
+            if doc["_id"] in self.docs:
+                errors.append({"index": index, "code": 11000, "errmsg": "duplicate key"})
+                continue
+            self.docs[doc["_id"]] = doc
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(docs) - len(errors)})
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    monkeypatch.setenv("MONGO_URI", "mongodb://localhost")
+    monkeypatch.setenv("MONGO_DB_NAME", "test")
+    collection = FakeCollection()
+    monkeypatch.setattr(TranscriptHandler, "transcripts_collection", collection)
+    return TranscriptHandler()
+
+
+def buffer_for(handler, **kwargs):
+    options = dict(max_chunks=2, max_delay=10.0, stats=FlushStats(), max_pending=4, retry_initial=0.05, retry_max=0.1)
+    options.update(kwargs)
+    return TranscriptWriteBuffer(handler, "m1", **options)
+
+
+def test_failed_flush_keeps_ids_and_backs_off():
+    async def run():
+        handler = FlakyHandler()
+        buffer = buffer_for(handler)
+        await buffer.add(chunk(1))
+        await buffer.add(chunk(2))  # reaches max_chunks: flushes, fails
+        await buffer.add(chunk(3))  # backing off: queued, not flushed
+        assert len(handler.attempts) == 1
+        handler.ok = True
+        await asyncio.sleep(0.1)  # the scheduled retry
+        return handler, buffer
+
+    handler, buffer = asyncio.run(run())
+    assert len(handler.attempts) == 2
+    first, retry = handler.attempts
+    assert retry[:2] == first
+    assert buffer.depth == 0
+    assert buffer.stats.failures == 1 and buffer.stats.chunks_flushed == 3
+
+
+def test_pending_chunks_are_capped():
+    async def run():
+        buffer = buffer_for(FlakyHandler())
+        for i in range(10):
+            await buffer.add(chunk(i))
+        return buffer
+
+    buffer = asyncio.run(run())
+    assert buffer.depth == 4
+    assert buffer.stats.dropped_chunks == 6
+
+
+def test_retry_after_partial_insert_does_not_duplicate(handler):
+    async def run():
+        buffer = buffer_for(handler, max_chunks=3)
+        handler.transcripts_collection.fail_after = 2
+        for i in range(3):
+            await buffer.add(chunk(i))  # third add flushes; two chunks land, then the write times out
+        assert buffer.depth == 3
+        return await buffer.flush()
+
+    assert asyncio.run(run()) is True
+    stored = handler.transcripts_collection.docs
+    assert sorted(doc["text"] for doc in stored.values()) == ["chunk 0", "chunk 1", "chunk 2"]
+
+
+def test_append_treats_duplicate_keys_as_written(handler):
+    async def run():
+        records = [transcript_record("m1", chunk(i)) for i in range(2)]
+        assert await handler.append_chunks("m1", records[:1]) is True
+        return await handler.append_chunks("m1", records)
+
+    assert asyncio.run(run()) is True
+    assert len(handler.transcripts_collection.docs) == 2
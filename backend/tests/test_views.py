@@ -0,0 +1,78 @@
+"""
+Materialized view tests: events replayed in log order rebuild the same counts
+as the live stream, and the broadcast handler applies them in that order.
+"""
+
+import json
+
+from app.pathway_pipeline import pipeline
+from app.pathway_pipeline.memory_broker import InMemoryBroker
+from app.pathway_pipeline.views import APPLICATIONS_TOPIC, MEETINGS_TOPIC, ChangeEvent, MaterializedViews
+
+
+def change(op, doc_id, topic=APPLICATIONS_TOPIC, full=False, **fields):
+    """A (topic, Debezium event) pair; updates carry only a patch unless ``full``."""
+    if op == "d":
+        return topic, {"op": "d", "before": json.dumps({"_id": doc_id})}
+    if op == "u" and not full:
+        return topic, {"op": "u", "patch": json.dumps({"$set": fields}), "filter": json.dumps({"_id": doc_id})}
+    return topic, {"op": op, "after": json.dumps({"_id": doc_id, **fields})}
+
+
+LOG = [
+    change("c", "a1", status="pending", stage="seed", industry="fintech"),
+    change("c", "a2", status="pending", stage="seed", industry="health"),
+    change("u", "a1", status="accepted", updatedAt="2024-05-01T10:00:00"),
+    change("u", "a2", stage="series_a"),
+    change("c", "a3", status="pending", industry="fintech"),
+    change("d", "a3"),
+    change("c", "m1", topic=MEETINGS_TOPIC, vc_id="vc1"),
+    change("u", "m1", topic=MEETINGS_TOPIC, vc_id="vc2"),
+]
+
+
+def replay(events):
+    views = MaterializedViews()
+    for topic, event in events:
+        views.apply(ChangeEvent.from_message(event, topic))
+    return views
+
+
+def test_replay_in_log_order():
+    views = replay(LOG)
+
+    assert views.applications_view() == {
+        "total": 2,
+        "byStatus": {"accepted": 1, "pending": 1},
+        "byStage": {"seed": 1, "series_a": 1},
+        "byIndustry": {"fintech": 1, "health": 1},
+    }
+    assert views.meetings_view() == {"total": 1, "byVC": {"vc2": 1}}
+    assert views.skipped == 0
+
+
+def test_older_event_applied_last_rolls_the_view_back():
+    # Why only one consumer may apply events to a worker's views
+    views = replay([LOG[0], LOG[2], change("u", "a1", full=True, status="pending", stage="seed")])
+
+    assert views.applications_view()["byStatus"] == {"pending": 1}
+
+
+def test_partial_update_of_unknown_document_is_skipped():
+    views = replay([change("u", "a9", status="accepted")])
+
+    assert views.applications_view()["total"] == 0
+    assert views.skipped == 1
+
+
+def test_broadcast_handler_applies_in_offset_order(monkeypatch):
+    views = MaterializedViews()
+    monkeypatch.setattr(pipeline, "materialized_views", views)
+    broker = InMemoryBroker()
+    records = [broker.produce(topic, event) for topic, event in LOG]
+
+    pipeline.BroadcastHandler()(records)
+
+    expected = replay(LOG)
+    assert views.applications_view() == expected.applications_view()
+    assert views.meetings_view() == expected.meetings_view()